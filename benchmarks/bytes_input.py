@@ -0,0 +1,82 @@
+"""
+Compare the peak memory & time of checking decoded lines & raw source bytes, by file size.
+
+Usage:
+    python -m benchmarks.bytes_input [--sizes 64,1024,16384] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+import typing as t
+
+from flake8_annotations.source import analyze_lines, analyze_source, decode_source
+
+FUNCTION_SOURCE = '''\
+def function_{0}(a, b: int, *args, **kwargs) -> None:
+    """Docstring of function {0}, padding the source like real-world code does."""
+    value = a + b  # Comment
+    return None
+
+
+'''
+
+
+def generate_source(kib: int) -> bytes:
+    """Generate a module of roughly the provided size, in KiB, with a function every few lines."""
+    chunks = []
+    total = 0
+    while total < kib * 1024:
+        chunk = FUNCTION_SOURCE.format(len(chunks)).encode()
+        chunks.append(chunk)
+        total += len(chunk)
+
+    return b"".join(chunks)
+
+
+def check_lines(data: bytes) -> None:
+    """Check the source as previously done: decoded into a list of lines & joined for parsing."""
+    analyze_lines(decode_source(data))
+
+
+def check_bytes(data: bytes) -> None:
+    """Check the source bytes directly, decoding lines on access."""
+    analyze_source(data)
+
+
+def measure(check: t.Callable[[bytes], None], data: bytes, repeat: int) -> t.Tuple[float, float]:
+    """Return the peak memory allocated by a check, in MiB, & its best time, in seconds."""
+    tracemalloc.start()
+    check(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        check(data)
+        best = min(best, time.perf_counter() - start)
+
+    return peak / 2**20, best
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> None:
+    """Compare checking decoded lines & raw source bytes across a range of file sizes."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="64,1024,16384", help="Comma separated sizes, in KiB")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    checks = (("lines", check_lines), ("bytes", check_bytes))
+    print(f"{'KiB':>8}{'input':>7}{'peak MiB':>10}{'seconds':>9}")
+    for kib in (int(value) for value in args.sizes.split(",")):
+        data = generate_source(kib)
+        for name, check in checks:
+            peak, best = measure(check, data, args.repeat)
+            print(f"{kib:>8}{name:>7}{peak:>10.1f}{best:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
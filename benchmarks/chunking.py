@@ -0,0 +1,78 @@
+"""
+Measure the per-file overhead of the standalone runner's work units on a corpus of tiny files.
+
+Usage:
+    python -m benchmarks.chunking [--n-files 100000] [--jobs auto] [--chunk-bytes 0 16384 ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import typing as t
+from functools import partial
+from pathlib import Path
+
+from flake8_annotations.pipeline import CheckPipeline
+from flake8_annotations.runner import build_runner_parser, requested_jobs, run_checks
+from flake8_annotations.source import iter_source_files
+
+TINY_SOURCES = (
+    "",
+    '"""Package docstring."""\n',
+    "def stub(a):\n    ...\n",
+    "from . import stub\n\n__all__ = ['stub']\n",
+)
+
+
+def write_corpus(root: Path, n_files: int, files_per_dir: int = 100) -> None:
+    """Write a corpus of tiny source files, in the style of `__init__.py` files & test stubs."""
+    for idx in range(n_files):
+        directory = root / f"pkg_{idx // files_per_dir:05}"
+        directory.mkdir(exist_ok=True)
+        (directory / f"mod_{idx:06}.py").write_text(TINY_SOURCES[idx % len(TINY_SOURCES)])
+
+
+def _time(fn: t.Callable[[], t.Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> None:
+    """Time both runner modes over a generated corpus for each of the provided chunk sizes."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n-files", type=int, default=100_000)
+    parser.add_argument("--jobs", default="auto")
+    parser.add_argument(
+        "--chunk-bytes", type=int, nargs="+", default=[0, 4096, 16384, 65536, 262144]
+    )
+    args = parser.parse_args(argv)
+
+    options = build_runner_parser().parse_args(["--isolated"])
+    jobs = requested_jobs(args.jobs)
+    with tempfile.TemporaryDirectory() as corpus:
+        write_corpus(Path(corpus), args.n_files)
+        paths = list(iter_source_files([corpus]))
+
+        print(f"{len(paths)} files, {jobs} jobs")
+        print(f"{'mode':<10}{'chunk bytes':>12}{'seconds':>10}{'us/file':>10}")
+        for chunk_bytes in args.chunk_bytes:
+            pipeline = CheckPipeline(options, jobs, chunk_bytes=chunk_bytes)
+            for mode, run in (
+                ("pool", partial(run_checks, paths, options, jobs, chunk_bytes)),
+                ("pipeline", partial(_consume, pipeline.run(paths))),
+            ):
+                elapsed = _time(run)
+                per_file = elapsed / len(paths) * 1e6
+                print(f"{mode:<10}{chunk_bytes:>12}{elapsed:>10.2f}{per_file:>10.1f}")
+
+
+def _consume(iterator: t.Iterator[t.Any]) -> None:
+    for _ in iterator:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Compare the executor backends of the standalone runner on small & large corpora.
+
+Each run includes the startup of its pool, which dominates for small corpora. Subinterpreters
+require Python 3.14+; elsewhere the interpreter backend falls back to worker processes.
+
+Usage:
+    python -m benchmarks.executors [--jobs auto] [--small 200] [--large 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import typing as t
+from pathlib import Path
+
+from benchmarks.threads import write_corpus
+from flake8_annotations.runner import build_runner_parser, requested_jobs, run_checks
+from flake8_annotations.source import iter_source_files
+from flake8_annotations.worker import executor_backend
+
+EXECUTORS = ("process", "interpreter", "thread")
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> None:
+    """Time each executor backend over generated small & large corpora."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", default="auto")
+    parser.add_argument(
+        "--small", type=int, default=200, help="Number of files in the small corpus"
+    )
+    parser.add_argument(
+        "--large", type=int, default=2000, help="Number of files in the large corpus"
+    )
+    args = parser.parse_args(argv)
+
+    jobs = max(2, requested_jobs(args.jobs))
+    print(f"{jobs} jobs")
+    print(f"{'corpus':<8}{'executor':<13}{'backend':<13}{'seconds':>10}{'files/s':>10}")
+    for corpus_name, n_files in (("small", args.small), ("large", args.large)):
+        with tempfile.TemporaryDirectory() as corpus:
+            write_corpus(Path(corpus), n_files, repeat=2)
+            paths = list(iter_source_files([corpus]))
+            for executor in EXECUTORS:
+                options = build_runner_parser().parse_args(["--isolated", f"--executor={executor}"])
+                start = time.perf_counter()
+                run_checks(paths, options, jobs)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{corpus_name:<8}{executor:<13}{executor_backend(executor):<13}"
+                    f"{elapsed:>10.2f}{len(paths) / elapsed:>10.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
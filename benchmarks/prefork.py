@@ -0,0 +1,136 @@
+"""
+Measure the memory use & time to first file of flake8's --jobs workers, with & without prefork.
+
+Each configuration runs flake8 in its own process. Workers report their time to first file,
+measured from the start of the flake8 run, & their memory use after their last file, read from
+`/proc/self/smaps_rollup`: private memory is what each worker doesn't share with the parent.
+Without prefork, the checker's warm-up & `gc.freeze` are skipped (see: `prepare_for_fork`).
+
+Usage:
+    python -m benchmarks.prefork [--jobs 1,2,4,8,16,32,64] [--files 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import typing as t
+from pathlib import Path
+
+import flake8.checker
+from flake8.main import cli
+
+from benchmarks.threads import write_corpus
+from flake8_annotations import prefork
+
+MODES = ("cold", "prefork")
+SMAPS_FIELDS = ("Rss", "Pss", "Private_Clean", "Private_Dirty")
+
+
+def read_smaps_rollup() -> t.Dict[str, int]:
+    """Read the memory use of the current process from `/proc/self/smaps_rollup`, in kB."""
+    usage = dict.fromkeys(SMAPS_FIELDS, 0)
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in usage:
+                    usage[name] = int(value.split()[0])
+    except OSError:
+        pass
+
+    return usage
+
+
+def run_child(jobs: int, mode: str, corpus: str, report_dir: str) -> None:
+    """Run flake8 in the current process, recording the time to first file & memory of each job."""
+    start = time.monotonic()
+    if mode == "cold":
+        prefork.prepare_for_fork = lambda config=None: None
+
+    run_checks = flake8.checker.FileChecker.run_checks
+    first_file: t.Dict[str, float] = {}
+
+    def timed_run_checks(self: flake8.checker.FileChecker) -> t.Any:
+        result = run_checks(self)
+        first_file.setdefault("seconds", time.monotonic() - start)
+        report = {"first_file": first_file["seconds"], **read_smaps_rollup()}
+        Path(report_dir, f"{os.getpid()}.json").write_text(json.dumps(report))
+        return result
+
+    flake8.checker.FileChecker.run_checks = timed_run_checks
+    try:
+        cli.main(["--isolated", "--select=ANN", "--exit-zero", f"--jobs={jobs}", corpus])
+    except SystemExit:
+        pass
+
+
+def measure(jobs: int, mode: str, corpus: str) -> t.Tuple[float, t.List[t.Dict[str, float]]]:
+    """Run a configuration in a fresh process, returning its wall time & its workers' reports."""
+    with tempfile.TemporaryDirectory() as report_dir:
+        start = time.perf_counter()
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.prefork",
+                "--child",
+                mode,
+                str(jobs),
+                corpus,
+                report_dir,
+            ],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        elapsed = time.perf_counter() - start
+        reports = [json.loads(path.read_text()) for path in Path(report_dir).glob("*.json")]
+
+    return elapsed, reports
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> None:
+    """Compare flake8's workers with & without prefork across a range of --jobs."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", default="1,2,4,8,16,32,64", help="Comma separated --jobs values")
+    parser.add_argument("--files", type=int, default=200, help="Number of files in the corpus")
+    parser.add_argument("--child", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        mode, jobs, corpus, report_dir = args.child
+        run_child(int(jobs), mode, corpus, report_dir)
+        return
+
+    print(
+        f"{'jobs':>5}{'mode':>9}{'workers':>9}{'seconds':>9}{'first file ms':>15}"
+        f"{'RSS MiB':>9}{'PSS MiB':>9}{'private MiB':>13}"
+    )
+    with tempfile.TemporaryDirectory() as corpus:
+        write_corpus(Path(corpus), args.files, repeat=2)
+        for jobs in (int(value) for value in args.jobs.split(",")):
+            for mode in MODES:
+                elapsed, reports = measure(jobs, mode, corpus)
+                if not reports:
+                    continue
+
+                mean = {
+                    field: statistics.fmean(report[field] for report in reports)
+                    for field in ("first_file", *SMAPS_FIELDS)
+                }
+                private = mean["Private_Clean"] + mean["Private_Dirty"]
+                print(
+                    f"{jobs:>5}{mode:>9}{len(reports):>9}{elapsed:>9.2f}"
+                    f"{mean['first_file'] * 1000:>15.1f}{mean['Rss'] / 1024:>9.1f}"
+                    f"{mean['Pss'] / 1024:>9.1f}{private / 1024:>13.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
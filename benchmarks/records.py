@@ -0,0 +1,76 @@
+"""
+Compare the cost of transporting a large number of results as pickled tuples & as binary records.
+
+Usage:
+    python -m benchmarks.records [--n-files 3000] [--errors-per-file 100]
+"""
+
+from __future__ import annotations
+
+import argparse
+import pickle
+import time
+import typing as t
+
+from flake8_annotations.records import ResultRecords, TEMPLATES
+from flake8_annotations.source import RESULT
+
+ARGNAMES = ("a", "b", "value", "key", "self_", "kwargs")
+
+
+def generate_batch(n_files: int, errors_per_file: int) -> t.List[t.List[RESULT]]:
+    """Generate the results of a work unit where every file reports many errors."""
+    codes = sorted(TEMPLATES)
+    return [
+        [
+            (
+                lineno,
+                4,
+                TEMPLATES[codes[lineno % len(codes)]].format(ARGNAMES[lineno % len(ARGNAMES)]),
+            )
+            for lineno in range(1, errors_per_file + 1)
+        ]
+        for _ in range(n_files)
+    ]
+
+
+def _interned(batch: t.List[t.List[RESULT]]) -> t.List[t.List[RESULT]]:
+    # Share identical message strings, so pickle memoizes each distinct message
+    messages: t.Dict[str, str] = {}
+    return [[(ln, col, messages.setdefault(msg, msg)) for ln, col, msg in res] for res in batch]
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> None:
+    """Time encoding (in the worker), decoding (in the parent), and output of each format."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n-files", type=int, default=3000)
+    parser.add_argument("--errors-per-file", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    batch = generate_batch(args.n_files, args.errors_per_file)
+    print(f"{args.n_files * args.errors_per_file} results")
+    print(f"{'format':<10}{'bytes':>12}{'encode s':>10}{'receive s':>11}{'output s':>10}")
+
+    formats: t.Tuple[t.Tuple[str, t.Callable[[], t.Any]], ...] = (
+        ("tuples", lambda: _interned(batch)),
+        ("records", lambda: ResultRecords.from_results(batch)),
+    )
+    for name, encode in formats:
+        start = time.perf_counter()
+        payload = pickle.dumps(encode(), protocol=pickle.HIGHEST_PROTOCOL)
+        encoded = time.perf_counter()
+        received = pickle.loads(payload)
+        decoded = time.perf_counter()
+        for results in received:
+            for _ in results:
+                pass
+
+        output = time.perf_counter()
+        print(
+            f"{name:<10}{len(payload):>12}{encoded - start:>10.3f}"
+            f"{decoded - encoded:>11.3f}{output - decoded:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
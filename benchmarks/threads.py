@@ -0,0 +1,85 @@
+"""
+Measure how the throughput of the thread executor scales with the number of threads.
+
+Near-linear scaling is only possible on free-threaded builds of CPython (e.g. 3.13t & 3.14t); with
+the GIL enabled, threads check files one at a time.
+
+Usage:
+    python -m benchmarks.threads [--n-files 500] [--threads 1 2 4 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+import typing as t
+from pathlib import Path
+
+from flake8_annotations.runner import build_runner_parser, run_checks
+from flake8_annotations.source import iter_source_files
+
+MODULE_TEMPLATE = """\
+import typing as t
+
+
+class Model{idx}:
+    def __init__(self, name, value=None):
+        self.name = name
+        self.value = value
+
+    def update(self, *args, **kwargs):
+        return self.value
+
+    @classmethod
+    def build(cls, data):
+        return cls(**data)
+
+
+def helper_{idx}(a, b: int, *, c=1) -> t.Any:
+    def nested(x):
+        return x
+
+    return nested(a) + b + c
+"""
+
+
+def write_corpus(root: Path, n_files: int, repeat: int = 20) -> None:
+    """Write a corpus of moderately sized modules, each reporting a mix of errors."""
+    for idx in range(n_files):
+        source = "\n\n".join(MODULE_TEMPLATE.format(idx=f"{idx}_{rep}") for rep in range(repeat))
+        (root / f"mod_{idx:05}.py").write_text(source)
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> None:
+    """Time the thread executor over a generated corpus for each of the provided thread counts."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n-files", type=int, default=500)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    is_gil_enabled: t.Callable[[], bool] = getattr(sys, "_is_gil_enabled", lambda: True)
+    options = build_runner_parser().parse_args(["--isolated", "--executor=thread"])
+    with tempfile.TemporaryDirectory() as corpus:
+        write_corpus(Path(corpus), args.n_files)
+        paths = list(iter_source_files([corpus]))
+
+        print(f"{len(paths)} files, GIL {'enabled' if is_gil_enabled() else 'disabled'}")
+        print(f"{'threads':>8}{'seconds':>10}{'files/s':>10}{'speedup':>10}")
+        baseline = None
+        for n_threads in args.threads:
+            start = time.perf_counter()
+            # One file per work unit, so the work is spread evenly over the threads
+            run_checks(paths, options, n_threads, chunk_bytes=0)
+            elapsed = time.perf_counter() - start
+
+            baseline = baseline or elapsed
+            print(
+                f"{n_threads:>8}{elapsed:>10.2f}{len(paths) / elapsed:>10.0f}"
+                f"{baseline / elapsed:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from flake8_annotations.runner import main
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import collections
+import typing as t
+import weakref
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from flake8_annotations.pipeline import UNITS_PER_JOB
+from flake8_annotations.runner import build_runner_parser, requested_jobs
+from flake8_annotations.source import RESULT, iter_source_files, read_source
+from flake8_annotations.style_guide import StyleGuide
+from flake8_annotations.worker import (
+    FILE_RESULTS,
+    check_sources,
+    init_worker,
+    read_error_results,
+    try_create_worker_pool,
+)
+
+# Files read & checked ahead of the consumer of `AsyncChecker.check_paths`, per worker
+PATHS_PER_JOB = 8
+
+
+class AsyncChecker:
+    """
+    Check source code from asyncio code without blocking the event loop.
+
+    CPU bound checks are run on a pool of `jobs` workers, created on first use & shared by every
+    request made through the checker, so concurrent requests reuse the same warm pool. At most
+    `UNITS_PER_JOB` checks per worker are submitted to the pool at once; further requests wait their
+    turn without occupying the pool's queue. Files are discovered & read on a pool of reader
+    threads.
+
+    Requests may be cancelled or time out: their queued checks are cancelled & any running check's
+    result is discarded.
+
+    Options are parsed by the standalone runner's parser (see: `build_runner_parser`), so the same
+    options (including `--executor` & the worker recycling limits) apply; if no options are
+    provided, the defaults are used.
+    """
+
+    def __init__(
+        self,
+        options: t.Optional[argparse.Namespace] = None,
+        jobs: t.Optional[int] = None,
+        read_threads: int = 4,
+    ):
+        self.options = options if options is not None else build_runner_parser().parse_args([])
+        self.jobs = jobs if jobs is not None else requested_jobs(self.options.jobs)
+        self.read_threads = read_threads
+        self.style_guide = StyleGuide(self.options)
+
+        self._pool: t.Optional[Executor] = None
+        self._readers: t.Optional[ThreadPoolExecutor] = None
+        self._slots: t.MutableMapping[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def __aenter__(self) -> AsyncChecker:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the checker's pools, cancelling any queued work."""
+        for executor in (self._pool, self._readers):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        self._pool = self._readers = None
+
+    async def check_source(
+        self, source: t.Union[str, bytes], path: str = "stdin", timeout: t.Optional[float] = None
+    ) -> t.List[RESULT]:
+        """
+        Check the provided source code, reported under the provided path.
+
+        `asyncio.TimeoutError` is raised if the check doesn't complete within `timeout` seconds.
+        """
+        data = source.encode() if isinstance(source, str) else source
+        return await asyncio.wait_for(self._check(path, data), timeout)
+
+    async def check_paths(
+        self, paths: t.Iterable[str], timeout: t.Optional[float] = None
+    ) -> t.AsyncIterator[FILE_RESULTS]:
+        """
+        Check the provided files & directories, yielding their `(path, results)` tuples.
+
+        Directories are expanded in the same manner as the standalone runner & results are yielded
+        in path order. Up to `PATHS_PER_JOB` files per worker are read & checked ahead of the
+        consumer.
+
+        `asyncio.TimeoutError` is raised if the paths aren't all checked within `timeout` seconds.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        files = await _wait_until(
+            loop.run_in_executor(self._get_readers(), self._expand_paths, list(paths)), deadline
+        )
+
+        pending: t.Deque[t.Tuple[str, asyncio.Future[t.List[RESULT]]]] = collections.deque()
+        try:
+            for path in files:
+                if len(pending) >= max(1, self.jobs) * PATHS_PER_JOB:
+                    done_path, check = pending.popleft()
+                    yield done_path, await _wait_until(check, deadline)
+
+                pending.append((path, asyncio.ensure_future(self._check_path(path))))
+
+            while pending:
+                done_path, check = pending.popleft()
+                yield done_path, await _wait_until(check, deadline)
+        finally:
+            # Don't leave orphaned checks running if the consumer stops early or the request fails
+            for _, check in pending:
+                check.cancel()
+
+    def _expand_paths(self, paths: t.List[str]) -> t.List[str]:
+        exclude = [*self.options.exclude, *self.options.extend_exclude]
+        return sorted(iter_source_files(paths, exclude, self.options.filename))
+
+    async def _check_path(self, path: str) -> t.List[RESULT]:
+        loop = asyncio.get_running_loop()
+        try:
+            data = await loop.run_in_executor(self._get_readers(), read_source, path)
+        except OSError as e:
+            return read_error_results(e, self.style_guide, path)
+
+        return await self._check(path, data)
+
+    async def _check(self, path: str, data: bytes) -> t.List[RESULT]:
+        # Semaphores are bound to their event loop, but the pool may be shared by several loops
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(max(1, self.jobs) * UNITS_PER_JOB)
+
+        async with slots:
+            records = await asyncio.wrap_future(
+                self._get_pool().submit(check_sources, [(path, data)])
+            )
+
+        return list(next(iter(records)))
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            self._pool = try_create_worker_pool(self.options, max(1, self.jobs))
+            if self._pool is None:
+                init_worker(self.options)
+                self._pool = ThreadPoolExecutor(1, "flake8-annotations-checker")
+
+        return self._pool
+
+    def _get_readers(self) -> ThreadPoolExecutor:
+        if self._readers is None:
+            self._readers = ThreadPoolExecutor(self.read_threads, "flake8-annotations-reader")
+
+        return self._readers
+
+
+async def _wait_until(awaitable: t.Awaitable[t.Any], deadline: t.Optional[float]) -> t.Any:
+    """Await the provided awaitable, raising `asyncio.TimeoutError` if the deadline has passed."""
+    if deadline is None:
+        return await awaitable
+
+    remaining = max(0.0, deadline - asyncio.get_running_loop().time())
+    return await asyncio.wait_for(awaitable, remaining)
+
+
+# Checker shared by the module level API, so all of its requests share the same worker pool
+_default_checker: t.Optional[AsyncChecker] = None
+
+
+def default_checker() -> AsyncChecker:
+    """Provide the checker shared by the module level API, using the default options."""
+    global _default_checker
+
+    if _default_checker is None:
+        _default_checker = AsyncChecker()
+
+    return _default_checker
+
+
+async def check_source(
+    source: t.Union[str, bytes], path: str = "stdin", timeout: t.Optional[float] = None
+) -> t.List[RESULT]:
+    """Check the provided source using the shared checker (see: `AsyncChecker.check_source`)."""
+    return await default_checker().check_source(source, path, timeout)
+
+
+async def check_paths(
+    paths: t.Iterable[str], timeout: t.Optional[float] = None
+) -> t.AsyncIterator[FILE_RESULTS]:
+    """Check the provided paths using the shared checker (see: `AsyncChecker.check_paths`)."""
+    async for file_results in default_checker().check_paths(paths, timeout):
+        yield file_results
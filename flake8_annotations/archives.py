@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import fnmatch
+import tarfile
+import typing as t
+import zipfile
+import zlib
+
+from flake8.defaults import EXCLUDE
+
+# Archives whose members can be checked, found while walking directories with `--archives`
+ARCHIVE_PATTERNS = ("*.whl", "*.zip", "*.tar.gz", "*.tgz")
+
+# Archive members checked as Python source
+MEMBER_PATTERNS = ("*.py", "*.pyi")
+
+# Errors raised while reading a missing, corrupt or truncated archive
+ARCHIVE_ERRORS = (OSError, EOFError, zipfile.BadZipFile, tarfile.TarError, zlib.error)
+
+
+def member_path(archive: str, member: str) -> str:
+    """Provide the path used to report errors for the provided member of an archive."""
+    return f"{archive}!{member}"
+
+
+def is_zip_archive(path: str) -> bool:
+    """Determine whether the archive is read as a zip file (e.g. a wheel), rather than a tarball."""
+    return path.endswith((".whl", ".zip"))
+
+
+def is_source_member(name: str, exclude: t.Sequence[str] = EXCLUDE) -> bool:
+    """
+    Determine whether the named archive member is checked as Python source.
+
+    Like files found while walking directories, members within excluded directories, or whose own
+    name is excluded, are skipped.
+    """
+    if not any(fnmatch.fnmatch(name, pattern) for pattern in MEMBER_PATTERNS):
+        return False
+
+    return not any(
+        fnmatch.fnmatch(part, pattern) for part in name.split("/") for pattern in exclude
+    )
+
+
+def iter_archive_sources(
+    path: str, exclude: t.Sequence[str] = EXCLUDE
+) -> t.Iterator[t.Tuple[str, bytes]]:
+    """
+    Lazily yield the `(member name, contents)` pairs of the Python sources inside an archive.
+
+    Members are read one at a time, in the order they're stored, so the archive is never unpacked
+    to disk & only a single member's contents are held in memory. Tarballs are read as a stream, in
+    a single pass, with their compression detected from their contents.
+
+    NOTE: Any of `ARCHIVE_ERRORS` may be raised if the archive is missing, corrupt or truncated.
+    """
+    if is_zip_archive(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and is_source_member(info.filename, exclude):
+                    yield info.filename, archive.read(info)
+    else:
+        with tarfile.open(path, "r|*") as tarball:
+            for member in tarball:
+                if not member.isfile() or not is_source_member(member.name, exclude):
+                    continue
+
+                f = tarball.extractfile(member)
+                if f is not None:
+                    yield member.name, f.read()
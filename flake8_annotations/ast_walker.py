@@ -73,50 +73,14 @@ class Argument:
         return False
 
 
-@dataclass(slots=True)
-class Function:
-    """
-    Represent a function and its relevant metadata.
+class _DecoratedDefinition:
+    """Provide decorator matching for function definition representations."""
 
-    Note: while Python differentiates between a function and a method, for the purposes of this
-    tool, both will be referred to as functions outside of any class-specific context. This also
-    aligns with ast's naming convention.
-    """
+    __slots__ = ()
 
-    name: str
-    lineno: int
-    col_offset: int
     decorator_list: t.List[AST_DECORATOR_NODES]
-    args: t.List[Argument]
-    function_type: FunctionType = FunctionType.PUBLIC
-    is_class_method: bool = False
-    class_decorator_type: t.Union[ClassDecoratorType, None] = None
-    is_return_annotated: bool = False
-    has_type_comment: bool = False
-    has_only_none_returns: bool = True
-    is_nested: bool = False
-
-    def is_fully_annotated(self) -> bool:
-        """
-        Check that all of the function's inputs are type annotated.
-
-        Note that self.args will always include an Argument object for return
-        """
-        return all(arg.has_type_annotation for arg in self.args)
 
-    def is_dynamically_typed(self) -> bool:
-        """Determine if the function is dynamically typed, defined as completely lacking hints."""
-        return not any(arg.has_type_annotation for arg in self.args)
-
-    def get_missed_annotations(self) -> t.List[Argument]:
-        """Provide a list of arguments with missing type annotations."""
-        return [arg for arg in self.args if not arg.has_type_annotation]
-
-    def get_annotated_arguments(self) -> t.List[Argument]:
-        """Provide a list of arguments with type annotations."""
-        return [arg for arg in self.args if arg.has_type_annotation]
-
-    def has_decorator(self, check_decorators: t.Set[str]) -> bool:
+    def has_decorator(self, check_decorators: t.AbstractSet[str]) -> bool:
         """
         Determine whether the function node is decorated by any of the provided decorators.
 
@@ -135,7 +99,7 @@ class Function:
             return False
 
     def _decorator_checker(
-        self, decorator: AST_DECORATOR_NODES, check_decorators: t.Set[str]
+        self, decorator: AST_DECORATOR_NODES, check_decorators: t.AbstractSet[str]
     ) -> bool:
         """
         Check the provided decorator for a match against the provided set of check names.
@@ -163,6 +127,51 @@ class Function:
         # There shouldn't be any possible way to get here
         return False  # pragma: no cover
 
+
+@dataclass(slots=True)
+class Function(_DecoratedDefinition):
+    """
+    Represent a function and its relevant metadata.
+
+    Note: while Python differentiates between a function and a method, for the purposes of this
+    tool, both will be referred to as functions outside of any class-specific context. This also
+    aligns with ast's naming convention.
+    """
+
+    name: str
+    lineno: int
+    col_offset: int
+    decorator_list: t.List[AST_DECORATOR_NODES]
+    args: t.List[Argument]
+    function_type: FunctionType = FunctionType.PUBLIC
+    is_class_method: bool = False
+    class_decorator_type: t.Union[ClassDecoratorType, None] = None
+    is_return_annotated: bool = False
+    has_type_comment: bool = False
+    has_only_none_returns: bool = True
+    is_nested: bool = False
+    qualname: str = ""
+
+    def is_fully_annotated(self) -> bool:
+        """
+        Check that all of the function's inputs are type annotated.
+
+        Note that self.args will always include an Argument object for return
+        """
+        return all(arg.has_type_annotation for arg in self.args)
+
+    def is_dynamically_typed(self) -> bool:
+        """Determine if the function is dynamically typed, defined as completely lacking hints."""
+        return not any(arg.has_type_annotation for arg in self.args)
+
+    def get_missed_annotations(self) -> t.List[Argument]:
+        """Provide a list of arguments with missing type annotations."""
+        return [arg for arg in self.args if not arg.has_type_annotation]
+
+    def get_annotated_arguments(self) -> t.List[Argument]:
+        """Provide a list of arguments with type annotations."""
+        return [arg for arg in self.args if arg.has_type_annotation]
+
     def __str__(self) -> str:
         """
         Format the Function object into a readable representation.
@@ -178,7 +187,7 @@ class Function:
 
     @classmethod
     def from_function_node(
-        cls, node: AST_FUNCTION_TYPES, lines: t.List[str], **kwargs: t.Any
+        cls, node: AST_FUNCTION_TYPES, lines: t.Sequence[str], **kwargs: t.Any
     ) -> Function:
         """
         Create an Function object from ast.FunctionDef or ast.AsyncFunctionDef nodes.
@@ -241,14 +250,14 @@ class Function:
         return new_function
 
     @staticmethod
-    def colon_seeker(node: AST_FUNCTION_TYPES, lines: t.List[str]) -> t.Tuple[int, int]:
+    def colon_seeker(node: AST_FUNCTION_TYPES, lines: t.Sequence[str]) -> t.Tuple[int, int]:
         """
         Find the line & column indices of the function definition's closing colon.
 
         For Python >= 3.8, docstrings are contained in the body of the function node.
 
         NOTE: AST's line numbers are 1-indexed, column offsets are 0-indexed. Since `lines` is a
-        list, it will be 0-indexed.
+        sequence, it will be 0-indexed.
         """
         # Special case single line function definitions
         if node.lineno == node.body[0].lineno:
@@ -322,14 +331,60 @@ class Function:
             return None
 
 
+@dataclass(slots=True)
+class FunctionStub(_DecoratedDefinition):
+    """
+    Represent a function definition outside of the line range(s) being checked.
+
+    Only the metadata needed to track state across a series of function definitions, e.g. a series
+    of `typing.overload` decorated functions, is kept; no arguments are parsed.
+    """
+
+    name: str
+    lineno: int
+    decorator_list: t.List[AST_DECORATOR_NODES]
+    has_annotations: bool
+    is_nested: bool = False
+
+    def is_dynamically_typed(self) -> bool:
+        """Determine if the function is dynamically typed, defined as completely lacking hints."""
+        return not self.has_annotations
+
+    @classmethod
+    def from_function_node(cls, node: AST_FUNCTION_TYPES, is_nested: bool = False) -> FunctionStub:
+        """Create a FunctionStub object from ast.FunctionDef or ast.AsyncFunctionDef nodes."""
+        arguments = node.args
+        all_args = [*arguments.posonlyargs, *arguments.args, *arguments.kwonlyargs]
+        all_args.extend(arg for arg in (arguments.vararg, arguments.kwarg) if arg is not None)
+        has_annotations = node.returns is not None or any(arg.annotation for arg in all_args)
+
+        return cls(
+            node.name,
+            node.lineno,
+            node.decorator_list,  # type: ignore[arg-type]
+            has_annotations,
+            is_nested,
+        )
+
+
+def _overlaps(node: AST_FUNCTION_TYPES, line_ranges: t.Sequence[t.Tuple[int, int]]) -> bool:
+    """Determine whether the function definition, including its decorators, overlaps any range."""
+    start = min([node.lineno, *(decorator.lineno for decorator in node.decorator_list)])
+    end = node.end_lineno or node.lineno
+    return any(start <= range_end and range_start <= end for range_start, range_end in line_ranges)
+
+
 class FunctionVisitor(ast.NodeVisitor):
     """An ast.NodeVisitor instance for walking the AST and describing all contained functions."""
 
     AST_FUNC_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
 
-    def __init__(self, lines: t.List[str]):
+    def __init__(
+        self, lines: t.Sequence[str], line_ranges: t.Optional[t.Sequence[t.Tuple[int, int]]] = None
+    ):
         self.lines = lines
-        self.function_definitions: t.List[Function] = []
+        self.line_ranges = line_ranges
+        self.function_definitions: t.List[t.Union[Function, FunctionStub]] = []
         self._context: t.List[AST_DEF_NODES] = []
 
     def switch_context(self, node: AST_DEF_NODES) -> None:
@@ -339,28 +394,56 @@ class FunctionVisitor(ast.NodeVisitor):
         Without keeping track of context, it's challenging to reliably differentiate class methods
         from "regular" functions, especially in the case of nested classes.
 
+        If line ranges are provided, only definitions that overlap at least one of the (1-indexed,
+        inclusive) ranges are fully parsed; the remaining definitions are stored as `FunctionStub`
+        objects.
+
         Thank you for the inspiration @isidentical :)
         """
-        if isinstance(node, self.AST_FUNC_TYPES):
+        if (
+            isinstance(node, self.AST_FUNC_TYPES)
+            and self.line_ranges is not None
+            and not _overlaps(node, self.line_ranges)
+        ):
+            is_nested = bool(self._context) and isinstance(self._context[-1], self.AST_FUNC_TYPES)
+            self.function_definitions.append(FunctionStub.from_function_node(node, is_nested))
+        elif isinstance(node, self.AST_FUNC_TYPES):
             # Check for non-empty context first to prevent IndexErrors for non-nested nodes
             if self._context:
                 if isinstance(self._context[-1], ast.ClassDef):
                     # Check if current context is a ClassDef node & pass the appropriate flag
                     self.function_definitions.append(
-                        Function.from_function_node(node, self.lines, is_class_method=True)
+                        Function.from_function_node(
+                            node, self.lines, is_class_method=True, qualname=self._qualname(node)
+                        )
                     )
                 elif isinstance(self._context[-1], self.AST_FUNC_TYPES):  # pragma: no branch
                     # Check for nested function & pass the appropriate flag
                     self.function_definitions.append(
-                        Function.from_function_node(node, self.lines, is_nested=True)
+                        Function.from_function_node(
+                            node, self.lines, is_nested=True, qualname=self._qualname(node)
+                        )
                     )
             else:
-                self.function_definitions.append(Function.from_function_node(node, self.lines))
+                self.function_definitions.append(
+                    Function.from_function_node(node, self.lines, qualname=node.name)
+                )
 
         self._context.append(node)
         self.generic_visit(node)
         self._context.pop()
 
+    def _qualname(self, node: AST_FUNCTION_TYPES) -> str:
+        """Build the qualified name of the function node from the current context."""
+        parts = []
+        for context_node in self._context:
+            parts.append(context_node.name)
+            if isinstance(context_node, self.AST_FUNC_TYPES):
+                parts.append("<locals>")
+
+        parts.append(node.name)
+        return ".".join(parts)
+
     visit_FunctionDef = switch_context
     visit_AsyncFunctionDef = switch_context
     visit_ClassDef = switch_context
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import os
+import typing as t
+from pathlib import Path
+
+from flake8.defaults import EXCLUDE
+
+from flake8_annotations.checker import (
+    TypeHintChecker,
+    baseline_fingerprint,
+    iter_baseline_entries,
+    normalize_path,
+)
+from flake8_annotations.options import (
+    add_config_options,
+    add_discovery_options,
+    build_parser,
+    parse_args_with_config,
+)
+from flake8_annotations.source import (
+    SourceChecker,
+    error_code,
+    iter_source_files,
+    read_source,
+)
+from flake8_annotations.style_guide import StyleGuide
+
+BASELINE_HEADER = "# flake8-annotations baseline: one error fingerprint & its file path per line"
+
+# Baseline entries, mapping each error fingerprint to the path of its file, if known
+BASELINE_ENTRIES = t.Dict[str, t.Optional[str]]
+
+
+def iter_fingerprints(path: str, source_checker: SourceChecker) -> t.Iterator[str]:
+    """
+    Yield the fingerprint of each error reported for the provided source file.
+
+    Errors are filtered by the source checker's style guide, so errors that wouldn't be reported
+    aren't baselined. Files that can't be parsed yield no fingerprints.
+    """
+    normalized_path = normalize_path(path)
+    style_guide = source_checker.style_guide
+    if style_guide is not None:
+        style_guide = style_guide.for_path(path)
+
+    for result, error_key in source_checker.analyze(read_source(path)):
+        if error_key and (style_guide is None or style_guide.is_selected(error_code(result))):
+            yield baseline_fingerprint(normalized_path, error_key)
+
+
+def collect_fingerprints(
+    paths: t.Iterable[str],
+    source_checker: SourceChecker,
+    exclude: t.Sequence[str] = EXCLUDE,
+    filename_patterns: t.Sequence[str] = ("*.py",),
+) -> t.Dict[str, t.Set[str]]:
+    """
+    Collect the fingerprints of all errors currently reported for the provided paths, by file.
+
+    Files are discovered as done by flake8 (see: `iter_source_files`), using the provided exclude &
+    filename patterns, & keyed by their normalized path. Every checked file is included, even if no
+    errors are reported for it.
+    """
+    return {
+        normalize_path(path): set(iter_fingerprints(path, source_checker))
+        for path in iter_source_files(paths, exclude, filename_patterns)
+    }
+
+
+def prune_baseline(
+    existing: BASELINE_ENTRIES, checked: t.Mapping[str, t.Set[str]], paths: t.Iterable[str]
+) -> BASELINE_ENTRIES:
+    """
+    Drop the baseline entries of the checked files that are no longer reported.
+
+    Only the entries of the checked files, & of files within the checked paths that no longer exist,
+    are dropped, so a baseline can be pruned using a subset of its paths. Entries without a path are
+    always kept.
+    """
+    roots = [normalize_path(path) for path in paths]
+
+    def is_stale(path: str) -> bool:
+        if path in checked:
+            return True
+
+        return not os.path.exists(path) and any(
+            root == "." or path == root or path.startswith(f"{root}/") for root in roots
+        )
+
+    return {
+        fingerprint: path
+        for fingerprint, path in existing.items()
+        if path is None or fingerprint in checked.get(path, ()) or not is_stale(path)
+    }
+
+
+def save_baseline(
+    baseline_file: t.Union[str, Path], entries: t.Mapping[str, t.Optional[str]]
+) -> None:
+    """Save the provided entries to a baseline file, sorted by path & fingerprint."""
+    with open(baseline_file, "w", encoding="utf-8", newline="\n") as f:
+        f.write(f"{BASELINE_HEADER}\n")
+        for fingerprint, path in sorted(entries.items(), key=lambda item: (item[1] or "", item[0])):
+            f.write(f"{fingerprint} {path}\n" if path is not None else f"{fingerprint}\n")
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    """Create or prune a baseline of accepted error fingerprints."""
+    parser = build_parser(
+        prog="python -m flake8_annotations.baseline",
+        description=(
+            "Create a baseline of the currently reported errors, or prune the entries of an "
+            "existing baseline that are no longer reported."
+        ),
+    )
+    parser.add_argument("command", choices=("create", "prune"), help="Baseline command to run.")
+    parser.add_argument("paths", nargs="*", default=["."], help="Paths to check. (Default: .)")
+    add_discovery_options(parser)
+    add_config_options(parser)
+    options = parse_args_with_config(parser, argv)
+    if options.baseline is None:
+        parser.error("the --baseline option is required")
+
+    # Fingerprints are collected for all errors, so don't let an existing baseline suppress any
+    baseline_file = options.baseline
+    options.baseline = None
+    TypeHintChecker.parse_options(options)
+
+    source_checker = SourceChecker(StyleGuide(options), error_keys=True)
+    checked = collect_fingerprints(
+        options.paths,
+        source_checker,
+        [*options.exclude, *options.extend_exclude],
+        options.filename,
+    )
+    if options.command == "create":
+        current = {
+            fingerprint: path
+            for path, fingerprints in checked.items()
+            for fingerprint in fingerprints
+        }
+        save_baseline(baseline_file, current)
+        print(f"{len(current)} fingerprints written to {baseline_file}")
+    else:
+        existing = dict(iter_baseline_entries(baseline_file))
+        pruned = prune_baseline(existing, checked, options.paths)
+        save_baseline(baseline_file, pruned)
+        print(
+            f"{len(existing) - len(pruned)} of {len(existing)} fingerprints pruned from "
+            f"{baseline_file}"
+        )
+
+    print(source_checker.stats.describe())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
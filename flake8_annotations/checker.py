@@ -1,13 +1,27 @@
 from __future__ import annotations
 
+import functools
+import hashlib
+import io
+import itertools
+import os
+import re
+import tokenize
 import typing as t
 from argparse import Namespace
-from functools import lru_cache
+from dataclasses import dataclass
+from pathlib import Path
 
 from flake8.options.manager import OptionManager
 
 from flake8_annotations import __version__, enums, error_codes
-from flake8_annotations.ast_walker import Argument, Function, FunctionVisitor, ast
+from flake8_annotations.ast_walker import (
+    Argument,
+    Function,
+    FunctionStub,
+    FunctionVisitor,
+    ast,
+)
 
 FORMATTED_ERROR = t.Tuple[int, int, str, t.Type[t.Any]]
 
@@ -20,6 +34,9 @@ _DEFAULT_OVERLOAD_DECORATORS = [
     "overload",
 ]
 
+# Size of the header searched for generated file markers, so only a small prefix of a file is read
+GENERATED_HEADER_BYTES = 1024
+
 # Disable opinionated warnings by default
 _DISABLED_BY_DEFAULT = (
     "ANN401",
@@ -27,34 +44,152 @@ _DISABLED_BY_DEFAULT = (
 )
 
 
+@dataclass(frozen=True, slots=True)
+class CheckerConfig:
+    """
+    Immutable configuration of `TypeHintChecker`.
+
+    Since a configuration can't be modified once created, it can be shared by checkers running
+    concurrently in many threads, and checkers with different configurations can run side by side.
+    """
+
+    suppress_none_returning: bool = False
+    suppress_dummy_args: bool = False
+    allow_untyped_defs: bool = False
+    allow_untyped_nested: bool = False
+    mypy_init_return: bool = False
+    allow_star_arg_any: bool = False
+    respect_type_ignore: bool = False
+    dispatch_decorators: t.FrozenSet[str] = frozenset(_DEFAULT_DISPATCH_DECORATORS)
+    overload_decorators: t.FrozenSet[str] = frozenset(_DEFAULT_OVERLOAD_DECORATORS)
+    generated_markers: t.FrozenSet[str] = frozenset()
+    max_file_bytes: t.Optional[int] = None
+
+    # Fingerprints of accepted errors
+    baseline: t.FrozenSet[str] = frozenset()
+
+    @classmethod
+    def from_options(cls, options: Namespace) -> CheckerConfig:
+        """Build the configuration from the parsed command line or flake8 options."""
+        return cls(
+            suppress_none_returning=options.suppress_none_returning,
+            suppress_dummy_args=options.suppress_dummy_args,
+            allow_untyped_defs=options.allow_untyped_defs,
+            allow_untyped_nested=options.allow_untyped_nested,
+            mypy_init_return=options.mypy_init_return,
+            allow_star_arg_any=options.allow_star_arg_any,
+            respect_type_ignore=options.respect_type_ignore,
+            dispatch_decorators=frozenset(options.dispatch_decorators),
+            overload_decorators=frozenset(options.overload_decorators),
+            generated_markers=frozenset(options.generated_markers),
+            max_file_bytes=options.max_file_bytes,
+            baseline=load_baseline(options.baseline) if options.baseline else frozenset(),
+        )
+
+
 class TypeHintChecker:
     """Top level checker for linting the presence of type hints in function definitions."""
 
     name = "flake8-annotations"
     version = __version__
 
-    def __init__(self, tree: t.Optional[ast.Module], lines: t.List[str]):
+    # Configuration of checkers that aren't given their own, set by flake8's config parser
+    default_config: t.ClassVar[CheckerConfig] = CheckerConfig()
+
+    def __init__(
+        self,
+        tree: t.Optional[ast.Module],
+        lines: t.Sequence[str],
+        filename: str = "stdin",
+        *,
+        source: t.Optional[bytes] = None,
+        config: t.Optional[CheckerConfig] = None,
+        triage: bool = True,
+    ):
         # Request `tree` in order to ensure flake8 will run the plugin, even though we don't use it
         # Request `lines` here and join to allow for correct handling of input from stdin
         self.lines = lines
+        self.filename = filename
+        self._fingerprint_path: t.Optional[str] = None
+
+        # May be replaced to check with a configuration other than the one parsed by flake8
+        self.config = self.default_config if config is None else config
 
-        self.tree = ast.parse("".join(lines), type_comments=True)  # flake8 doesn't strip newlines
+        # The raw source bytes, if provided, are parsed directly (letting the parser detect their
+        # encoding) rather than joining the lines back together; flake8 doesn't strip newlines
+        parsed: t.Union[str, bytes] = "".join(lines) if source is None else source
+
+        # Files that can't, or shouldn't, report any errors are triaged before they're parsed &
+        # checked as an empty module, unless the caller has already triaged them
+        self.skip_reason = self.triage(parsed, self.config) if triage else None
+        if self.skip_reason is None:
+            self.tree = ast.parse(parsed, type_comments=True)
+        else:
+            if self.skip_reason == enums.SkipReason.NO_FUNCTIONS and tree is None:
+                # flake8 only runs the plugin on source it has parsed, otherwise reporting `E999`;
+                # other sources are still parsed, for the caller to report any syntax error
+                ast.parse(parsed)
+
+            self.tree = ast.Module(body=[], type_ignores=[])
 
         # Type ignores are provided by ast at the module level & we'll need them later when deciding
         # whether or not to emit errors for a given function
         self._type_ignore_lineno = {ti.lineno for ti in self.tree.type_ignores}
-        self._has_mypy_ignore_errors = "# mypy: ignore-errors" in lines[0] if lines else False
-
-        # Set by flake8's config parser
-        self.suppress_none_returning: bool
-        self.suppress_dummy_args: bool
-        self.allow_untyped_defs: bool
-        self.allow_untyped_nested: bool
-        self.mypy_init_return: bool
-        self.allow_star_arg_any: bool
-        self.respect_type_ignore: bool
-        self.dispatch_decorators: t.Set[str]
-        self.overload_decorators: t.Set[str]
+
+        # Module-level ignores are found on the first line; when checking part of a module, they
+        # may instead be provided by the caller
+        self.has_module_level_ignore = (1 in self._type_ignore_lineno) or (
+            "# mypy: ignore-errors" in lines[0] if lines else False
+        )
+
+        # Keep track of the last encountered function decorated by `typing.overload`, if any.
+        # Per the `typing` module documentation, a series of overload-decorated definitions must be
+        # followed by exactly one non-overload-decorated definition of the same function.
+        # When checking consecutive parts of a module, this is carried from one part to the next
+        self.last_overload_decorated_function_name: t.Optional[str] = None
+
+        # Optionally restrict errors to functions overlapping these (1-indexed, inclusive) ranges
+        self.line_ranges: t.Optional[t.Sequence[t.Tuple[int, int]]] = None
+
+    @staticmethod
+    def triage(
+        source: t.Union[str, bytes], config: t.Optional[CheckerConfig] = None
+    ) -> t.Optional[enums.SkipReason]:
+        """
+        Determine the reason, if any, the provided source should be skipped without being parsed.
+
+        Using the provided configuration, if any, otherwise the currently parsed options, sources
+        are skipped if they're larger than `max_file_bytes`, if any of the generated file markers
+        are found in a comment within their first `GENERATED_HEADER_BYTES` (see:
+        `is_generated_header`), or if they don't contain any function definitions, since no errors
+        can be reported without one. Each check first scans the source for a substring, cheapest
+        first.
+
+        NOTE: Sources without function definitions may still not parse, which flake8 reports as
+        `E999`; the checker only skips parsing them if flake8 has already parsed them.
+
+        NOTE: The size of decoded source is measured as UTF-8 encoded bytes.
+        """
+        if config is None:
+            config = TypeHintChecker.default_config
+
+        if config.max_file_bytes is not None and source_size(source) > config.max_file_bytes:
+            return enums.SkipReason.OVERSIZED
+
+        if config.generated_markers:
+            header = source[:GENERATED_HEADER_BYTES]
+            if isinstance(header, bytes):
+                header = header.decode("utf-8", errors="replace")
+
+            if is_generated_header(header, config.generated_markers):
+                return enums.SkipReason.GENERATED
+
+        # Keywords can't be split across lines, so every function definition contains `def`
+        has_def = b"def" in source if isinstance(source, bytes) else "def" in source
+        if not has_def:
+            return enums.SkipReason.NO_FUNCTIONS
+
+        return None
 
     def run(self) -> t.Generator[FORMATTED_ERROR, None, None]:
         """
@@ -62,66 +197,74 @@ class TypeHintChecker:
 
         This should yield tuples with the following information:
           (line number, column number, message, checker type)
+
+        Errors whose fingerprint is present in the configured baseline are not yielded.
         """
-        visitor = FunctionVisitor(self.lines)
-        visitor.visit(self.tree)
+        baseline = self.config.baseline
+        for function, error in self.iter_errors():
+            if baseline and self.fingerprint(function, error) in baseline:
+                continue
 
-        # Keep track of the last encountered function decorated by `typing.overload`, if any.
-        # Per the `typing` module documentation, a series of overload-decorated definitions must be
-        # followed by exactly one non-overload-decorated definition of the same function.
-        last_overload_decorated_function_name: t.Optional[str] = None
+            yield error.to_flake8()
+
+    def iter_errors(self) -> t.Generator[t.Tuple[Function, error_codes.Error], None, None]:
+        """Yield `(function, error)` tuples for each linting error found in the source code."""
+        config = self.config
+        visitor = FunctionVisitor(self.lines, self.line_ranges)
+        visitor.visit(self.tree)
 
         # Iterate over the arguments with missing type hints, by function, and yield linting errors
         # to flake8
         #
         # Flake8 handles all noqa and error code ignore configurations after the error is yielded
         for function in visitor.function_definitions:
-            if function.has_type_comment:
-                yield error_codes.ANN402.from_function(function).to_flake8()
-
-            if function.is_dynamically_typed():
-                if self.allow_untyped_defs:
-                    # Skip yielding errors from dynamically typed functions
-                    continue
-                elif function.is_nested and self.allow_untyped_nested:
-                    # Skip yielding errors from dynamically typed nested functions
+            if isinstance(function, FunctionStub):
+                # Functions outside of the checked line range(s) don't yield errors, but they still
+                # need to be tracked in case they're part of a series of overload-decorated defs
+                if self._is_skipped(function) or self.last_overload_decorated_function_name == (
+                    function.name
+                ):
                     continue
 
-            # Skip yielding errors for configured dispatch functions, such as (by default)
-            # `functools.singledispatch` and `functools.singledispatchmethod`
-            if function.has_decorator(self.dispatch_decorators):
+                if function.has_decorator(config.overload_decorators):
+                    self.last_overload_decorated_function_name = function.name
+
+                continue
+
+            if function.has_type_comment:
+                yield function, error_codes.ANN402.from_function(function)
+
+            if self._is_skipped(function):
                 continue
 
             # Iterate over the annotated args to look for opinionated warnings
             annotated_args = function.get_annotated_arguments()
             for arg in annotated_args:
                 if arg.is_dynamically_typed:
-                    if self.allow_star_arg_any and arg.annotation_type in {
+                    if config.allow_star_arg_any and arg.annotation_type in {
                         enums.AnnotationType.VARARG,
                         enums.AnnotationType.KWARG,
                     }:
                         continue
 
-                    yield error_codes.ANN401.from_argument(arg).to_flake8()
+                    yield function, error_codes.ANN401.from_argument(arg)
 
             # Before we iterate over the function's missing annotations, check to see if it's the
             # closing function def in a series of `typing.overload` decorated functions.
-            if last_overload_decorated_function_name == function.name:
+            if self.last_overload_decorated_function_name == function.name:
                 continue
 
             # If it's not, and it is overload decorated, store it for the next iteration
-            if function.has_decorator(self.overload_decorators):
-                last_overload_decorated_function_name = function.name
+            if function.has_decorator(config.overload_decorators):
+                self.last_overload_decorated_function_name = function.name
 
             # Optionally respect a type: ignore comment
             # These are considered at the function level & tags are not considered
-            if self.respect_type_ignore:
+            if config.respect_type_ignore:
                 if function.lineno in self._type_ignore_lineno:
                     # function-level ignore
                     continue
-                elif (1 in self._type_ignore_lineno) or (
-                    self._has_mypy_ignore_errors
-                ):  # pragma: no branch
+                elif self.has_module_level_ignore:  # pragma: no branch
                     # module-level ignore
                     # lineno from ast is 1-indexed
                     continue
@@ -130,16 +273,16 @@ class TypeHintChecker:
             for arg in function.get_missed_annotations():
                 # Check for type comments here since we're not considering them as typed args
                 if arg.has_type_comment:
-                    yield error_codes.ANN402.from_argument(arg).to_flake8()
+                    yield function, error_codes.ANN402.from_argument(arg)
 
                 if arg.argname == "return":
                     # return annotations have multiple possible short-circuit paths
-                    if self.suppress_none_returning:
+                    if config.suppress_none_returning:
                         # Skip yielding return errors if the function has only `None` returns
                         # This includes the case of no returns.
                         if function.has_only_none_returns:
                             continue
-                    if self.mypy_init_return:
+                    if config.mypy_init_return:
                         # Skip yielding return errors for `__init__` if at least one argument is
                         # annotated
                         if function.is_class_method and function.name == "__init__":
@@ -151,10 +294,51 @@ class TypeHintChecker:
 
                 # If the `--suppress-dummy-args` flag is `True`, skip yielding errors for any
                 # arguments named `_`
-                if arg.argname == "_" and self.suppress_dummy_args:
+                if arg.argname == "_" and config.suppress_dummy_args:
                     continue
 
-                yield classify_error(function, arg).to_flake8()
+                yield function, classify_error(function, arg)
+
+    def fingerprint(self, function: Function, error: error_codes.Error) -> str:
+        """
+        Calculate a line number independent fingerprint for the provided error.
+
+        Fingerprints are built from the file path, relative to the working directory, & the error's
+        path independent key (see: `error_key`).
+        """
+        if self._fingerprint_path is None:
+            self._fingerprint_path = normalize_path(self.filename)
+
+        return baseline_fingerprint(self._fingerprint_path, self.error_key(function, error))
+
+    @staticmethod
+    def error_key(function: Function, error: error_codes.Error) -> str:
+        """
+        Build the path independent part of the error's fingerprint.
+
+        Keys are built from the error code, the function's qualified name, the argument name, and a
+        hash of the function's normalized signature (argument names & kinds, ignoring formatting &
+        annotations), so accepted errors remain matched as unrelated code is added or removed around
+        them.
+        """
+        signature = ",".join(f"{arg.argname}:{arg.annotation_type.name}" for arg in function.args)
+        signature_hash = hashlib.blake2b(signature.encode(), digest_size=8).hexdigest()
+        return "\0".join((type(error).__name__, function.qualname, error.argname, signature_hash))
+
+    def _is_skipped(self, function: t.Union[Function, FunctionStub]) -> bool:
+        """Determine whether all errors for the provided function should be skipped."""
+        config = self.config
+        if function.is_dynamically_typed():
+            if config.allow_untyped_defs:
+                # Skip yielding errors from dynamically typed functions
+                return True
+            elif function.is_nested and config.allow_untyped_nested:
+                # Skip yielding errors from dynamically typed nested functions
+                return True
+
+        # Skip yielding errors for configured dispatch functions, such as (by default)
+        # `functools.singledispatch` and `functools.singledispatchmethod`
+        return function.has_decorator(config.dispatch_decorators)
 
     @classmethod
     def add_options(cls, parser: OptionManager) -> None:  # pragma: no cover
@@ -241,6 +425,18 @@ class TypeHintChecker:
             help="Suppress ANN401 for dynamically typed *args and **kwargs. (Default: %(default)s)",
         )
 
+        parser.add_option(
+            "--baseline",
+            default=None,
+            action="store",
+            type=str,
+            parse_from_config=True,
+            help=(
+                "Path to a baseline file of accepted error fingerprints, which will not be "
+                "reported. (Default: %(default)s)"
+            ),
+        )
+
         parser.add_option(
             "--respect-type-ignore",
             default=False,
@@ -252,20 +448,118 @@ class TypeHintChecker:
             ),
         )
 
+        parser.add_option(
+            "--generated-markers",
+            default=[],
+            action="store",
+            type=str,
+            parse_from_config=True,
+            comma_separated_list=True,
+            help=(
+                "Comma-separated list of markers identifying generated files, which are skipped "
+                f"if any marker is found in a comment within their first {GENERATED_HEADER_BYTES} "
+                "bytes, e.g. '@generated,DO NOT EDIT'. (Default: no markers)"
+            ),
+        )
+
+        parser.add_option(
+            "--max-file-bytes",
+            default=None,
+            action="store",
+            type=int,
+            parse_from_config=True,
+            help="Skip files larger than this many bytes. (Default: %(default)s)",
+        )
+
     @classmethod
     def parse_options(cls, options: Namespace) -> None:  # pragma: no cover
-        """Parse the custom configuration options given to flake8."""
-        cls.suppress_none_returning = options.suppress_none_returning
-        cls.suppress_dummy_args = options.suppress_dummy_args
-        cls.allow_untyped_defs = options.allow_untyped_defs
-        cls.allow_untyped_nested = options.allow_untyped_nested
-        cls.mypy_init_return = options.mypy_init_return
-        cls.allow_star_arg_any = options.allow_star_arg_any
-        cls.respect_type_ignore = options.respect_type_ignore
+        """
+        Parse the custom configuration options given to flake8.
+
+        flake8 parses options before forking its `--jobs` worker processes, so the checker is also
+        prepared for sharing its memory with the workers here (see: `prefork.prepare_for_fork`).
+        """
+        # Imported here since the prefork module depends on the checker
+        from flake8_annotations import prefork
 
-        # Store decorator lists as sets for easier lookup
-        cls.dispatch_decorators = set(options.dispatch_decorators)
-        cls.overload_decorators = set(options.overload_decorators)
+        cls.default_config = CheckerConfig.from_options(options)
+        if prefork.flake8_forks_workers(options):
+            prefork.prepare_for_fork(cls.default_config)
+
+
+def baseline_fingerprint(normalized_path: str, error_key: str) -> str:
+    """Calculate the baseline fingerprint of the error key for the normalized file path."""
+    return hashlib.blake2b(f"{normalized_path}\0{error_key}".encode(), digest_size=8).hexdigest()
+
+
+def normalize_path(filename: str) -> str:
+    """Normalize the provided file path to a POSIX path relative to the working directory."""
+    try:
+        return Path(os.path.relpath(filename)).as_posix()
+    except ValueError:
+        # On Windows, paths on a different drive can't be made relative
+        return Path(filename).as_posix()
+
+
+def iter_baseline_entries(
+    baseline_file: t.Union[str, Path],
+) -> t.Iterator[t.Tuple[str, t.Optional[str]]]:
+    """
+    Yield the `(fingerprint, path)` entries of the provided baseline file.
+
+    Baseline files contain one fingerprint per line, followed by the normalized path of the file its
+    error was reported for (see: `normalize_path`); the path is `None` for entries without one.
+    Blank lines & lines starting with `#` are ignored.
+    """
+    with open(baseline_file, encoding="utf-8") as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped and not stripped.startswith("#"):
+                fingerprint, *path = stripped.split(maxsplit=1)
+                yield fingerprint, path[0] if path else None
+
+
+def load_baseline(baseline_file: t.Union[str, Path]) -> t.FrozenSet[str]:
+    """Load the error fingerprints from the provided baseline file."""
+    return frozenset(fingerprint for fingerprint, _ in iter_baseline_entries(baseline_file))
+
+
+def source_size(source: t.Union[str, bytes]) -> int:
+    """
+    Measure the size of the provided source in bytes.
+
+    Decoded source is measured as UTF-8 encoded bytes, only encoding it if it isn't ASCII.
+    """
+    if isinstance(source, bytes) or source.isascii():
+        return len(source)
+
+    return len(source.encode("utf-8", errors="surrogatepass"))
+
+
+def is_generated_header(header: str, markers: t.Iterable[str]) -> bool:
+    """
+    Determine whether any of the provided markers is found in a comment of the provided header.
+
+    Markers must be delimited by non-word characters, so `@generated` doesn't match
+    `@generated_cache`, and only comments are searched, so a marker in a docstring or a string
+    literal isn't matched. Headers are truncated, so comments are only searched up to the point the
+    header can no longer be tokenized.
+
+    NOTE: The header is only tokenized if it contains one of the markers as a substring.
+    """
+    markers = [marker for marker in markers if marker in header]
+    if not markers:
+        return False
+
+    pattern = re.compile("|".join(rf"(?<!\w){re.escape(marker)}(?!\w)" for marker in markers))
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(header).readline):
+            if token.type == tokenize.COMMENT and pattern.search(token.string):
+                return True
+    except (tokenize.TokenError, SyntaxError):
+        pass
+
+    return False
 
 
 def classify_error(function: Function, arg: Argument) -> error_codes.Error:
@@ -275,29 +569,31 @@ def classify_error(function: Function, arg: Argument) -> error_codes.Error:
     For the currently defined rules & program flow, the assumption can be made that an argument
     passed to this method will match a linting error, and will only match a single linting error
 
-    This function provides an initial classificaton, then passes relevant attributes to cached
-    helper function(s).
+    This function provides an initial classificaton, then looks up the relevant attributes in the
+    precomputed classification tables.
     """
     # Check for return type
     # All return "arguments" have an explicitly defined name "return"
+    return_errors, argument_errors = _classification_tables()
     if arg.argname == "return":
-        error_code = _return_error_classifier(
-            function.is_class_method, function.class_decorator_type, function.function_type
-        )
+        error_code = return_errors[
+            (function.is_class_method, function.class_decorator_type, function.function_type)
+        ]
     else:
         # Otherwise, classify function argument error
         is_first_arg = arg == function.args[0]
-        error_code = _argument_error_classifier(
-            function.is_class_method,
-            is_first_arg,
-            function.class_decorator_type,
-            arg.annotation_type,
-        )
+        error_code = argument_errors[
+            (
+                function.is_class_method,
+                is_first_arg,
+                function.class_decorator_type,
+                arg.annotation_type,
+            )
+        ]
 
     return error_code.from_argument(arg)
 
 
-@lru_cache()
 def _return_error_classifier(
     is_class_method: bool,
     class_decorator_type: enums.ClassDecoratorType,
@@ -321,7 +617,6 @@ def _return_error_classifier(
         return error_codes.ANN201
 
 
-@lru_cache()
 def _argument_error_classifier(
     is_class_method: bool,
     is_first_arg: bool,
@@ -347,3 +642,33 @@ def _argument_error_classifier(
     else:
         # Combine POSONLYARG, ARG, and KWONLYARGS
         return error_codes.ANN001
+
+
+_CLASS_DECORATOR_TYPES = (None, *enums.ClassDecoratorType)
+
+
+@functools.cache
+def _classification_tables() -> t.Tuple[
+    t.Dict[t.Tuple[t.Any, ...], t.Type[error_codes.Error]],
+    t.Dict[t.Tuple[t.Any, ...], t.Type[error_codes.Error]],
+]:
+    """
+    Build the `(return, argument)` error classification tables.
+
+    The classifiers only depend on a handful of flags & enums, so every classification is computed
+    on first use; once built, the read-only tables are safe to share between threads.
+
+    NOTE: The tables are built lazily since `error_codes` & this module import each other, so the
+    error code classes may not be defined yet while this module is imported.
+    """
+    return_errors = {
+        key: _return_error_classifier(*key)
+        for key in itertools.product((False, True), _CLASS_DECORATOR_TYPES, enums.FunctionType)
+    }
+    argument_errors = {
+        key: _argument_error_classifier(*key)
+        for key in itertools.product(
+            (False, True), (False, True), _CLASS_DECORATOR_TYPES, enums.AnnotationType
+        )
+    }
+    return return_errors, argument_errors
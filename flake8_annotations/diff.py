@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import re
+import subprocess
+import sys
+import typing as t
+from pathlib import Path
+
+from flake8_annotations.checker import TypeHintChecker
+from flake8_annotations.options import add_config_options, build_parser, parse_args_with_config
+from flake8_annotations.source import RESULT, SourceChecker, check_lines, read_source, split_lines
+from flake8_annotations.style_guide import StyleGuide, format_result
+
+LINE_RANGES = t.List[t.Tuple[int, int]]
+
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,(?P<old>\d+))? \+(?P<start>\d+)(?:,(?P<new>\d+))? @@")
+
+
+def _strip_path(path: str, strip: int) -> str:
+    """Strip the provided number of leading components from the path, like `patch -p<strip>`."""
+    return path.split("/", strip)[-1] if path.count("/") >= strip else path
+
+
+def _merge_lines(changed_lines: t.Iterable[int]) -> LINE_RANGES:
+    """Merge the provided line numbers into sorted, inclusive ranges of consecutive lines."""
+    ranges: LINE_RANGES = []
+    for lineno in sorted(set(changed_lines)):
+        if ranges and lineno == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], lineno)
+        else:
+            ranges.append((lineno, lineno))
+
+    return ranges
+
+
+def parse_unified_diff(diff_text: str, strip: int = 1) -> t.Dict[str, LINE_RANGES]:
+    """
+    Map each file in the provided unified diff to the line ranges changed in its new version.
+
+    Added lines are mapped directly; removed lines are mapped to the lines on either side of the
+    removal. Deleted files are not included.
+
+    Like `patch`, `strip` leading path components are removed from each file path; the default of
+    `1` handles the `a/` & `b/` prefixes used by `git diff`.
+    """
+    changed: t.Dict[str, t.List[int]] = {}
+    current_file: t.Optional[t.List[int]] = None
+    old_remaining = new_remaining = 0
+    new_lineno = 0
+
+    for line in diff_text.splitlines():
+        if old_remaining > 0 or new_remaining > 0:
+            # Hunk body, where lines are classified by their first character
+            if line.startswith("+"):
+                if current_file is not None:
+                    current_file.append(new_lineno)
+
+                new_lineno += 1
+                new_remaining -= 1
+            elif line.startswith("-"):
+                if current_file is not None:
+                    current_file.extend((max(new_lineno - 1, 1), max(new_lineno, 1)))
+
+                old_remaining -= 1
+            elif not line.startswith("\\"):
+                # Context line; "\\ No newline at end of file" markers are ignored
+                new_lineno += 1
+                old_remaining -= 1
+                new_remaining -= 1
+        elif line.startswith("+++ "):
+            path = line[4:].split("\t", 1)[0]
+            if path == "/dev/null":
+                current_file = None
+            else:
+                current_file = changed.setdefault(_strip_path(path, strip), [])
+        elif match := HUNK_HEADER.match(line):
+            new_lineno = int(match["start"])
+            old_remaining = int(match["old"] or 1)
+            new_remaining = int(match["new"] or 1)
+            if new_remaining == 0:
+                # For pure removals, the new start line is the line preceding the removal
+                new_lineno += 1
+
+    return {path: _merge_lines(lines) for path, lines in changed.items()}
+
+
+def git_changed_ranges(
+    revision_range: str, cwd: t.Optional[t.Union[str, Path]] = None
+) -> t.Dict[str, LINE_RANGES]:
+    """
+    Map each Python file changed in the provided git revision range to its changed line ranges.
+
+    Paths are relative to the working directory. Revision ranges are passed straight to `git diff`,
+    so a single revision compares that revision to the working tree.
+    """
+    diff = subprocess.run(
+        ["git", "diff", "--no-color", "--no-ext-diff", "--relative", "-U0", revision_range, "--"],
+        capture_output=True,
+        check=True,
+        cwd=cwd,
+        encoding="utf-8",
+        errors="surrogateescape",
+    )
+    return parse_unified_diff(diff.stdout)
+
+
+def check_line_range(src: str, start: int, end: int) -> t.List[RESULT]:
+    """
+    Check the provided source string, reporting only functions overlapping the provided line range.
+
+    Line numbers are 1-indexed & inclusive. The entire source is still parsed, so file-level state
+    like a series of overload-decorated functions or a module-level `type: ignore` is respected.
+
+    NOTE: Checker options are assumed to have already been parsed by `TypeHintChecker`.
+    """
+    return check_lines(split_lines(src), [(start, end)])
+
+
+def check_changed_files(
+    changed_ranges: t.Dict[str, LINE_RANGES], source_checker: SourceChecker
+) -> t.Iterator[t.Tuple[str, RESULT]]:
+    """Check the changed line ranges of each file, yielding `(path, result)` tuples by path."""
+    for path, line_ranges in sorted(changed_ranges.items()):
+        if not (path.endswith(".py") and line_ranges and Path(path).is_file()):
+            continue
+
+        for result in source_checker.check(path, read_source(path), line_ranges):
+            yield path, result
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    """Check only the functions overlapping the changes in a unified diff or git revision range."""
+    parser = build_parser(
+        prog="python -m flake8_annotations.diff",
+        description="Check only the function definitions overlapping changed lines.",
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "--rev", help="Git revision (compared to the working tree) or revision range to check."
+    )
+    source.add_argument("--diff", type=Path, help="Unified diff file to check, or '-' for stdin.")
+    parser.add_argument(
+        "--strip",
+        type=int,
+        default=1,
+        help="Leading path components to strip from diff file paths. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--benchmark",
+        default=False,
+        action="store_true",
+        help="Print benchmark information after the run.",
+    )
+    add_config_options(parser)
+    options = parse_args_with_config(parser, argv)
+    TypeHintChecker.parse_options(options)
+
+    if options.rev is not None:
+        changed_ranges = git_changed_ranges(options.rev)
+    elif str(options.diff) == "-":
+        changed_ranges = parse_unified_diff(sys.stdin.read(), options.strip)
+    else:
+        changed_ranges = parse_unified_diff(options.diff.read_text(), options.strip)
+
+    n_reported = 0
+    source_checker = SourceChecker(StyleGuide(options))
+    for path, result in check_changed_files(changed_ranges, source_checker):
+        print(format_result(path, result))
+        n_reported += 1
+
+    if options.benchmark:
+        print(source_checker.stats.describe())
+
+    return 1 if n_reported else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
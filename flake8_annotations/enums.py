@@ -32,3 +32,11 @@ class AnnotationType(Enum):
     KWONLYARGS = auto()
     KWARG = auto()
     RETURN = auto()
+
+
+class SkipReason(Enum):
+    """Represent the reason a file is skipped by triage, before it's parsed."""
+
+    OVERSIZED = auto()  # Larger than the configured size limit
+    GENERATED = auto()  # Marked as generated in its header
+    NO_FUNCTIONS = auto()  # No function definitions, so no errors can be reported
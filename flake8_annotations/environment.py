@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import fnmatch
+import hashlib
+import re
+import sys
+import typing as t
+from collections import Counter
+from dataclasses import dataclass
+from importlib import metadata
+from pathlib import Path
+
+from flake8_annotations.archives import MEMBER_PATTERNS
+from flake8_annotations.checker import TypeHintChecker
+from flake8_annotations.options import (
+    add_config_options,
+    build_parser,
+    options_fingerprint,
+    parse_args_with_config,
+)
+from flake8_annotations.runner import requested_jobs
+from flake8_annotations.source import CountsCache, error_code
+from flake8_annotations.worker import check_file, init_worker, try_create_worker_pool
+
+DEFAULT_CACHE_FILE = ".flake8-annotations-environment.json"
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a distribution name, as done by PEP 503."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+@dataclass(slots=True)
+class Distribution:
+    """An installed distribution, along with the modules listed by its `RECORD` file."""
+
+    name: str
+    version: str
+    record_digest: str
+    modules: t.List[str]
+    size: int
+
+    @property
+    def cache_key(self) -> str:
+        """
+        Key identifying the distribution's installed modules.
+
+        Any change to the installed files, e.g. a reinstall from a different build of the same
+        version, changes their hashes & sizes listed by `RECORD`, so changes its digest.
+        """
+        return f"{normalize_name(self.name)}=={self.version}#{self.record_digest}"
+
+
+def parse_record(record: str) -> t.Iterator[t.Tuple[str, int]]:
+    """
+    Parse the `(path, size)` pairs of the Python modules listed by a `RECORD` file.
+
+    Paths are relative to the directory containing the distribution's metadata; files installed
+    outside of it, e.g. scripts, are skipped. Sizes are `0` where they aren't recorded.
+    """
+    for row in csv.reader(record.splitlines()):
+        if not row:
+            continue
+
+        path = row[0]
+        if path.startswith(("../", "/")) or not any(
+            fnmatch.fnmatch(path, pattern) for pattern in MEMBER_PATTERNS
+        ):
+            continue
+
+        size = row[2] if len(row) > 2 else ""
+        yield path, int(size) if size.isdigit() else 0
+
+
+def find_distributions(paths: t.Optional[t.Sequence[str]] = None) -> t.List[Distribution]:
+    """
+    List the distributions installed in the provided directories, or on `sys.path`.
+
+    Each distribution's modules are listed from its `RECORD` file, rather than by walking its
+    installation directory. Distributions without a `RECORD` file (e.g. installed by a system
+    package manager) are skipped. Where a distribution is installed more than once, only the first
+    installation found, the one that's imported, is listed.
+    """
+    distributions: t.Dict[str, Distribution] = {}
+    for dist in metadata.distributions(path=list(paths) if paths is not None else sys.path):
+        name = dist.metadata["Name"]
+        record = dist.read_text("RECORD")
+        if not name or record is None or normalize_name(name) in distributions:
+            continue
+
+        modules, size = [], 0
+        for path, module_size in parse_record(record):
+            modules.append(str(dist.locate_file(path)))
+            size += module_size
+
+        record_digest = hashlib.blake2b(record.encode(), digest_size=16).hexdigest()
+        distributions[normalize_name(name)] = Distribution(
+            name, dist.version, record_digest, modules, size
+        )
+
+    return sorted(distributions.values(), key=lambda dist: normalize_name(dist.name))
+
+
+def count_errors(modules: t.Sequence[str]) -> t.Dict[str, int]:
+    """Check the provided modules in the current process, counting their errors by error code."""
+    counts: t.Counter[str] = Counter()
+    for path in modules:
+        counts.update(error_code(result) for result in check_file(path))
+
+    return dict(sorted(counts.items()))
+
+
+@dataclass(slots=True)
+class AuditStats:
+    """Keep track of the distributions checked & reused from the cache during an audit."""
+
+    distributions_checked: int = 0
+    distributions_reused: int = 0
+    modules_checked: int = 0
+
+
+def audit_distributions(
+    distributions: t.Sequence[Distribution],
+    options: argparse.Namespace,
+    cache: CountsCache,
+    jobs: int = 1,
+    stats: t.Optional[AuditStats] = None,
+) -> t.List[t.Tuple[Distribution, t.Dict[str, int]]]:
+    """
+    Count the errors of each distribution by error code, reusing the counts cached for its key.
+
+    Distributions that aren't cached are checked in parallel on a pool of `jobs` worker processes,
+    one distribution per task, largest first, falling back to checking serially if the pool can't
+    be created. The cache is updated with their counts; entries of distributions that are no
+    longer installed are dropped.
+    """
+    if stats is None:
+        stats = AuditStats()
+
+    pending = [dist for dist in distributions if dist.cache_key not in cache.counts]
+    stats.distributions_checked += len(pending)
+    stats.distributions_reused += len(distributions) - len(pending)
+    stats.modules_checked += sum(len(dist.modules) for dist in pending)
+
+    # Submit the largest distributions first, so a single large distribution isn't left until last
+    pending.sort(key=lambda dist: dist.size, reverse=True)
+    modules = [dist.modules for dist in pending]
+    counts: t.Optional[t.List[t.Dict[str, int]]] = None
+    if jobs > 1 and len(pending) > 1:
+        executor = try_create_worker_pool(options, min(jobs, len(pending)))
+        if executor is not None:
+            with executor:
+                counts = list(executor.map(count_errors, modules))
+
+    if counts is None:
+        init_worker(options)
+        counts = [count_errors(dist_modules) for dist_modules in modules]
+
+    for dist, dist_counts in zip(pending, counts, strict=True):
+        cache.counts[dist.cache_key] = dist_counts
+
+    cache.counts = {dist.cache_key: cache.counts[dist.cache_key] for dist in distributions}
+    return [(dist, cache.counts[dist.cache_key]) for dist in distributions]
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    """Summarize the missing annotations of each installed distribution, by error code."""
+    parser = build_parser(
+        prog="python -m flake8_annotations.environment",
+        description="Summarize the missing annotations of each installed distribution.",
+    )
+    parser.add_argument(
+        "--path",
+        action="append",
+        default=None,
+        help=(
+            "Directory to find installed distributions in, e.g. a virtualenv's site-packages. "
+            "May be repeated. (Default: sys.path)"
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default="auto",
+        help="Number of worker processes to use, or 'auto' for one per CPU. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-file",
+        type=Path,
+        default=Path(DEFAULT_CACHE_FILE),
+        help="Cache of the counts of each distribution to reuse & update. (Default: %(default)s)",
+    )
+    add_config_options(parser)
+    options = parse_args_with_config(parser, argv)
+    if options.jobs != "auto" and not options.jobs.isdigit():
+        parser.error(f"'{options.jobs}' is not a valid value for --jobs")
+
+    # The audit counts all missing annotations, so the baseline isn't applied
+    options.baseline = None
+    TypeHintChecker.parse_options(options)
+
+    jobs = requested_jobs(options.jobs)
+    cache = CountsCache.load(options.cache_file, options_fingerprint(options))
+    stats = AuditStats()
+    audited = audit_distributions(find_distributions(options.path), options, cache, jobs, stats)
+    cache.save(options.cache_file)
+
+    for dist, counts in audited:
+        total = sum(counts.values())
+        summary = " ".join(f"{code}={count}" for code, count in counts.items())
+        print(
+            f"{dist.name} {dist.version}: {len(dist.modules)} modules, {total} errors"
+            + (f" ({summary})" if summary else "")
+        )
+
+    print(
+        f"{len(audited)} distributions, {stats.distributions_checked} checked "
+        f"({stats.modules_checked} modules), {stats.distributions_reused} reused from the cache"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import collections
+import fnmatch
+import os
+import subprocess
+import threading
+import typing as t
+from pathlib import Path
+
+from flake8.defaults import EXCLUDE
+
+from flake8_annotations.source import is_excluded
+
+# File modes of regular (non-executable & executable) files; symlinks & submodules aren't checked
+BLOB_MODES = frozenset(("100644", "100755"))
+
+# Prefix of the content digests derived from blob object names (see: `Blob.digest`)
+DIGEST_PREFIX = "git:"
+
+
+class Blob(t.NamedTuple):
+    """A file in a git tree, the index or a diff, along with the name of its blob object."""
+
+    path: str
+    object_name: str
+
+    @property
+    def digest(self) -> str:
+        """
+        Digest used to identify the blob's contents (see: `SourceChecker`).
+
+        Git already identifies each blob by a hash of its contents, so the contents are never hashed
+        again. Blob digests are prefixed, so they can't collide with the digests of other sources.
+        """
+        return f"{DIGEST_PREFIX}{self.object_name}"
+
+
+def is_null_object(object_name: str) -> bool:
+    """Determine whether the object name is git's null object name, e.g. for a new branch."""
+    return not object_name.strip("0")
+
+
+def run_git(args: t.Sequence[str], cwd: t.Optional[t.Union[str, Path]] = None) -> bytes:
+    """
+    Run the provided git command, returning its output.
+
+    NOTE: `subprocess.CalledProcessError` is raised, with git's error output, if the command fails.
+    """
+    return subprocess.run(["git", *args], capture_output=True, check=True, cwd=cwd).stdout
+
+
+def iter_records(output: bytes) -> t.Iterator[str]:
+    """Decode the records of NUL separated git output, as requested by `-z`, with paths unquoted."""
+    for record in output.split(b"\0"):
+        if record:
+            yield os.fsdecode(record)
+
+
+def parse_tree_listing(output: bytes) -> t.Iterator[t.Tuple[str, Blob]]:
+    """Parse the `(mode, blob)` pairs of `git ls-tree -r -z` output, skipping non-blob entries."""
+    for record in iter_records(output):
+        info, _, path = record.partition("\t")
+        mode, object_type, object_name = info.split()
+        if object_type == "blob":
+            yield mode, Blob(path, object_name)
+
+
+def parse_index_listing(output: bytes) -> t.Iterator[t.Tuple[str, Blob]]:
+    """
+    Parse the `(mode, blob)` pairs of `git ls-files -s -z` output.
+
+    Only merged entries are included; the stages of unmerged (conflicted) paths are skipped.
+    """
+    for record in iter_records(output):
+        info, _, path = record.partition("\t")
+        mode, object_name, stage = info.split()
+        if stage == "0":
+            yield mode, Blob(path, object_name)
+
+
+def parse_raw_change(info: str, path: str) -> t.Tuple[str, str, Blob]:
+    """
+    Parse a single change of `--raw` diff output into its `(status, mode, blob)` on the new side.
+
+    The blob of a deleted file has a null object name (see: `is_null_object`).
+    """
+    _, new_mode, _, new_object_name, status = info.lstrip("\n:").split()
+    return status, new_mode, Blob(path, new_object_name)
+
+
+def parse_raw_diff(output: bytes) -> t.Iterator[t.Tuple[str, Blob]]:
+    """
+    Parse the `(mode, blob)` pairs of the new side of `git diff-tree -r -z --no-renames` output.
+
+    Deleted files are skipped.
+    """
+    records = iter_records(output)
+    for info in records:
+        status, mode, blob = parse_raw_change(info, next(records))
+        if status != "D":
+            yield mode, blob
+
+
+class BlobFilter:
+    """
+    Select the blobs to check, mirroring flake8's file discovery.
+
+    Only regular files are selected. As when walking directories, files within excluded directories
+    are skipped & the remaining files must match one of the filename patterns, unless their path was
+    passed explicitly.
+    """
+
+    def __init__(
+        self,
+        exclude: t.Sequence[str] = EXCLUDE,
+        filename_patterns: t.Sequence[str] = ("*.py",),
+        explicit_paths: t.Iterable[str] = (),
+    ):
+        self.exclude = exclude
+        self.filename_patterns = filename_patterns
+        self.explicit_paths = {os.path.normpath(path) for path in explicit_paths}
+        self._excluded_dirs: t.Dict[str, bool] = {}
+
+    def __call__(self, entries: t.Iterable[t.Tuple[str, Blob]]) -> t.Iterator[Blob]:
+        """Lazily yield the blobs of the provided `(mode, blob)` pairs that should be checked."""
+        for mode, blob in entries:
+            if self.selects(mode, blob):
+                yield blob
+
+    def selects(self, mode: str, blob: Blob) -> bool:
+        """Determine whether the blob, with the provided file mode, should be checked."""
+        if mode not in BLOB_MODES or self._is_dir_excluded(os.path.dirname(blob.path)):
+            return False
+
+        if is_excluded(blob.path, self.exclude):
+            return False
+
+        if blob.path in self.explicit_paths or not self.filename_patterns:
+            return True
+
+        return any(fnmatch.fnmatch(blob.path, pattern) for pattern in self.filename_patterns)
+
+    def _is_dir_excluded(self, directory: str) -> bool:
+        if not directory:
+            return False
+
+        excluded = self._excluded_dirs.get(directory)
+        if excluded is None:
+            excluded = self._is_dir_excluded(os.path.dirname(directory)) or is_excluded(
+                directory, self.exclude
+            )
+            self._excluded_dirs[directory] = excluded
+
+        return excluded
+
+
+def revision_blobs(
+    revision: str,
+    pathspecs: t.Sequence[str] = (),
+    cwd: t.Optional[t.Union[str, Path]] = None,
+) -> t.Iterator[t.Tuple[str, Blob]]:
+    """List the `(mode, blob)` pairs of the files in the provided revision's tree."""
+    return parse_tree_listing(run_git(["ls-tree", "-r", "-z", revision, "--", *pathspecs], cwd))
+
+
+def index_blobs(
+    pathspecs: t.Sequence[str] = (), cwd: t.Optional[t.Union[str, Path]] = None
+) -> t.Iterator[t.Tuple[str, Blob]]:
+    """List the `(mode, blob)` pairs of the files staged in the index."""
+    return parse_index_listing(run_git(["ls-files", "-s", "-z", "--", *pathspecs], cwd))
+
+
+def range_blobs(
+    revision_range: str,
+    pathspecs: t.Sequence[str] = (),
+    cwd: t.Optional[t.Union[str, Path]] = None,
+) -> t.Iterator[t.Tuple[str, Blob]]:
+    """
+    List the `(mode, blob)` pairs of the files added or modified by the provided revision range.
+
+    Ranges are of the form `<old>..<new>`, as given to a pre-receive hook. If `<old>` is the null
+    object name, i.e. the push creates a new branch, every file of `<new>` is listed.
+    """
+    old, sep, new = revision_range.partition("..")
+    if not sep or not old or not new:
+        raise ValueError(f"'{revision_range}' is not a revision range of the form <old>..<new>")
+
+    if is_null_object(old):
+        return revision_blobs(new, pathspecs, cwd)
+
+    args = ["diff-tree", "-r", "-z", "--no-renames", "--relative", old, new, "--", *pathspecs]
+    return parse_raw_diff(run_git(args, cwd))
+
+
+class CatFile:
+    """
+    Read the contents of blobs through a single, long-lived `git cat-file --batch` process.
+
+    Object names are written to the process on a separate thread while their contents are read, so
+    requests & responses are streamed through the process without waiting on each other; git
+    flushes the contents of each blob as soon as it's read. The pipes' buffers bound the number of
+    blobs in flight, so no temporary files are written & memory use doesn't grow with the number of
+    blobs.
+
+    NOTE: Blobs are read from the repository containing the working directory (or `cwd`), so no
+    checkout is needed.
+    """
+
+    def __init__(self, cwd: t.Optional[t.Union[str, Path]] = None):
+        self.process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=cwd,
+        )
+
+    def __enter__(self) -> CatFile:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the `git cat-file` process."""
+        if self.process.poll() is None:
+            self.process.kill()
+
+        self.process.wait()
+        for pipe in (self.process.stdin, self.process.stdout):
+            if pipe is not None:
+                pipe.close()
+
+    def iter_contents(self, blobs: t.Iterable[Blob]) -> t.Iterator[t.Tuple[Blob, bytes]]:
+        """
+        Lazily yield the `(blob, contents)` pairs of the provided blobs, in order.
+
+        A `LookupError` is raised for blobs that don't exist in the repository.
+        """
+        stdin, stdout = self.process.stdin, self.process.stdout
+        if stdin is None or stdout is None:
+            raise RuntimeError("git cat-file has been closed")
+
+        requested: t.Deque[Blob] = collections.deque()
+        # Requests are only sent once they've been recorded, so each response has a request
+        requests_sent = threading.Condition()
+        done = False
+
+        def send_requests() -> None:
+            nonlocal done
+            try:
+                for blob in blobs:
+                    with requests_sent:
+                        requested.append(blob)
+                        requests_sent.notify()
+
+                    # Written unbuffered, so git starts on each request as soon as it's sent
+                    request = f"{blob.object_name}\n".encode()
+                    while request:
+                        request = request[os.write(stdin.fileno(), request) :]
+            except (OSError, ValueError):
+                # The process was stopped before every request was sent
+                pass
+            finally:
+                with requests_sent:
+                    done = True
+                    requests_sent.notify()
+
+        writer = threading.Thread(target=send_requests, name="flake8-annotations-cat-file")
+        writer.start()
+        try:
+            while True:
+                with requests_sent:
+                    requests_sent.wait_for(lambda: done or bool(requested))
+                    if not requested:
+                        break
+
+                    blob = requested.popleft()
+
+                yield blob, self._read_contents(blob)
+        finally:
+            if writer.is_alive():
+                # Abandoned before every blob was read; stop the writer blocked on a full pipe
+                self.close()
+
+            writer.join()
+
+    def _read_contents(self, blob: Blob) -> bytes:
+        stdout = self.process.stdout
+        assert stdout is not None
+
+        header = stdout.readline().split()
+        if len(header) != 3:
+            raise LookupError(f"git object {blob.object_name} for {blob.path} is missing")
+
+        size = int(header[2])
+        contents = stdout.read(size)
+        # Contents are followed by a newline
+        stdout.read(1)
+        return contents
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import subprocess
+import sys
+import typing as t
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from flake8_annotations.checker import TypeHintChecker
+from flake8_annotations.gitobjects import (
+    Blob,
+    BlobFilter,
+    CatFile,
+    iter_records,
+    parse_raw_change,
+    revision_blobs,
+    run_git,
+)
+from flake8_annotations.options import (
+    add_config_options,
+    add_discovery_options,
+    build_parser,
+    options_fingerprint,
+    parse_args_with_config,
+)
+from flake8_annotations.pipeline import CheckPipeline
+from flake8_annotations.runner import requested_jobs
+from flake8_annotations.source import CountsCache, error_code
+
+DEFAULT_CACHE_FILE = ".flake8-annotations-history.json"
+DEFAULT_MAX_COUNT = 1000
+
+# A change to a checked file: its path & the object name of its new blob, or `None` if it's no
+# longer checked, e.g. because it was deleted
+_CHANGE = t.Tuple[str, t.Optional[str]]
+
+
+@dataclass(slots=True)
+class Commit:
+    """A commit, along with the `(status, mode, blob)` changes to its first parent's tree."""
+
+    object_name: str
+    parents: t.List[str]
+    date: str
+    changes: t.List[t.Tuple[str, str, Blob]] = field(default_factory=list)
+
+
+def parse_log(output: bytes) -> t.Iterator[Commit]:
+    """
+    Parse the commits of `git log -z --raw --format='%H %P %cI'` output.
+
+    Each commit's header is followed by the raw changes of its diff, if any; changes are the only
+    records starting with a colon.
+    """
+    commit: t.Optional[Commit] = None
+    records = iter_records(output)
+    for record in records:
+        if record.lstrip("\n").startswith(":"):
+            if commit is not None:
+                commit.changes.append(parse_raw_change(record, next(records)))
+        else:
+            if commit is not None:
+                yield commit
+
+            object_name, *parents, date = record.split()
+            commit = Commit(object_name, parents, date)
+
+    if commit is not None:
+        yield commit
+
+
+def list_history(
+    revision: str = "HEAD",
+    max_count: int = DEFAULT_MAX_COUNT,
+    cwd: t.Optional[t.Union[str, Path]] = None,
+) -> t.List[Commit]:
+    """
+    List the revision's last `max_count` first-parent commits, oldest first, with their changes.
+
+    Every commit & its changes to its first parent's tree are listed by a single `git log`, so no
+    trees are listed or diffed per commit. Paths are relative to the working directory & only
+    changes within it are listed.
+    """
+    output = run_git(
+        [
+            "log",
+            "-z",
+            "--reverse",
+            "--first-parent",
+            f"--max-count={max_count}",
+            "--raw",
+            "--root",
+            "--no-renames",
+            "--no-abbrev",
+            "--diff-merges=first-parent",
+            "--relative",
+            "--format=%H %P %cI",
+            revision,
+            "--",
+        ],
+        cwd,
+    )
+    return list(parse_log(output))
+
+
+@dataclass(slots=True)
+class TrendPoint:
+    """The per-error code counts of all the checked files in the tree of a commit."""
+
+    commit: str
+    date: str
+    counts: t.Dict[str, int]
+
+    @property
+    def total(self) -> int:
+        """Total number of errors reported for the commit's tree."""
+        return sum(self.counts.values())
+
+
+@dataclass(slots=True)
+class HistoryStats:
+    """Keep track of the work done while building a coverage trend."""
+
+    commits: int = 0
+    changes: int = 0
+    blobs_checked: int = 0
+    blobs_reused: int = 0
+
+
+def count_blobs(
+    blobs: t.Sequence[Blob],
+    options: argparse.Namespace,
+    jobs: int = 1,
+    cwd: t.Optional[t.Union[str, Path]] = None,
+) -> t.Iterator[t.Tuple[Blob, t.Dict[str, int]]]:
+    """
+    Count the errors of each of the provided blobs by error code.
+
+    Blobs are streamed from a single `git cat-file --batch` process through the check pipeline,
+    on a pool of `jobs` worker processes (see: `CheckPipeline.run_sources`).
+    """
+    pipeline = CheckPipeline(options, jobs)
+    with CatFile(cwd) as cat_file:
+        sources = ((blob.path, data, blob.digest) for blob, data in cat_file.iter_contents(blobs))
+        for blob, (_, results) in zip(blobs, pipeline.run_sources(sources), strict=True):
+            yield blob, dict(sorted(Counter(error_code(result) for result in results).items()))
+
+
+def coverage_trend(
+    commits: t.Sequence[Commit],
+    options: argparse.Namespace,
+    cache: CountsCache,
+    jobs: int = 1,
+    blob_filter: t.Optional[BlobFilter] = None,
+    cwd: t.Optional[t.Union[str, Path]] = None,
+    stats: t.Optional[HistoryStats] = None,
+) -> t.List[TrendPoint]:
+    """
+    Count the errors in the tree of each of the provided commits, oldest first, by error code.
+
+    The tree of the first commit's parent is listed once; each commit's tree is then derived from
+    the previous one by applying its changes. Only blobs that aren't in the cache, keyed by their
+    object name, are checked, so the cost grows with the number of distinct blobs rather than the
+    number of commits & files. The cache is updated with the counts of the checked blobs.
+    """
+    if blob_filter is None:
+        blob_filter = BlobFilter()
+
+    if stats is None:
+        stats = HistoryStats()
+
+    tree: t.Dict[str, str] = {}
+    if commits and commits[0].parents:
+        parent_blobs = blob_filter(revision_blobs(commits[0].parents[0], cwd=cwd))
+        tree = {blob.path: blob.object_name for blob in parent_blobs}
+
+    # Find the blobs of each commit's changes, & those that haven't been counted yet
+    unseen = {object_name: Blob(path, object_name) for path, object_name in tree.items()}
+    commit_changes: t.List[t.List[_CHANGE]] = []
+    for commit in commits:
+        changes: t.List[_CHANGE] = []
+        for status, mode, blob in commit.changes:
+            if status != "D" and blob_filter.selects(mode, blob):
+                changes.append((blob.path, blob.object_name))
+                unseen.setdefault(blob.object_name, blob)
+            else:
+                changes.append((blob.path, None))
+
+        commit_changes.append(changes)
+        stats.changes += len(changes)
+
+    pending = [blob for object_name, blob in unseen.items() if object_name not in cache.counts]
+    stats.blobs_checked += len(pending)
+    stats.blobs_reused += len(unseen) - len(pending)
+    for blob, counts in count_blobs(pending, options, jobs, cwd):
+        cache.counts[blob.object_name] = counts
+
+    # Replay the changes, updating the counts of the tree as each file changes
+    totals: t.Counter[str] = Counter()
+    for tree_object_name in tree.values():
+        totals.update(cache.counts[tree_object_name])
+
+    trend = []
+    for commit, changes in zip(commits, commit_changes, strict=True):
+        for path, new_object_name in changes:
+            previous = tree.pop(path, None)
+            if previous is not None:
+                totals.subtract(cache.counts[previous])
+
+            if new_object_name is not None:
+                tree[path] = new_object_name
+                totals.update(cache.counts[new_object_name])
+
+        counts = {code: count for code, count in sorted(totals.items()) if count}
+        trend.append(TrendPoint(commit.object_name, commit.date, counts))
+        stats.commits += 1
+
+    return trend
+
+
+def write_trend(trend: t.Sequence[TrendPoint], f: t.TextIO) -> None:
+    """Write the trend as CSV, with a column for each error code reported by any commit."""
+    codes = sorted({code for point in trend for code in point.counts})
+    writer = csv.writer(f, lineterminator="\n")
+    writer.writerow(("commit", "date", "total", *codes))
+    for point in trend:
+        writer.writerow(
+            (point.commit, point.date, point.total, *(point.counts.get(code, 0) for code in codes))
+        )
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    """Write the number of missing annotations in each of the last commits, as CSV."""
+    parser = build_parser(
+        prog="python -m flake8_annotations.history",
+        description="Count missing annotations by error code across the git history, as CSV.",
+    )
+    parser.add_argument(
+        "revision", nargs="?", default="HEAD", help="Revision to count up to. (Default: HEAD)"
+    )
+    add_discovery_options(parser)
+    parser.add_argument(
+        "-n",
+        "--max-count",
+        type=int,
+        default=DEFAULT_MAX_COUNT,
+        help="Number of first-parent commits to count. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default="auto",
+        help="Number of worker processes to use, or 'auto' for one per CPU. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-file",
+        type=Path,
+        default=Path(DEFAULT_CACHE_FILE),
+        help="Cache of the counts of each blob to reuse & update. (Default: %(default)s)",
+    )
+    add_config_options(parser)
+    options = parse_args_with_config(parser, argv)
+    if options.jobs != "auto" and not options.jobs.isdigit():
+        parser.error(f"'{options.jobs}' is not a valid value for --jobs")
+    if options.per_file_ignores:
+        # Counts are shared by every path of a blob, so they can't depend on the path
+        parser.error("per-file ignores aren't supported, since counts are cached by blob")
+
+    # The trend counts all missing annotations, so the baseline isn't applied
+    options.baseline = None
+    TypeHintChecker.parse_options(options)
+
+    try:
+        commits = list_history(options.revision, options.max_count)
+    except subprocess.CalledProcessError as e:
+        parser.error(os.fsdecode(e.stderr).strip())
+
+    jobs = requested_jobs(options.jobs)
+    cache = CountsCache.load(options.cache_file, options_fingerprint(options))
+    stats = HistoryStats()
+    blob_filter = BlobFilter([*options.exclude, *options.extend_exclude], options.filename)
+    trend = coverage_trend(commits, options, cache, jobs, blob_filter, stats=stats)
+    cache.save(options.cache_file)
+
+    write_trend(trend, sys.stdout)
+    print(
+        f"{stats.commits} commits, {stats.changes} file changes, {stats.blobs_checked} blobs "
+        f"checked, {stats.blobs_reused} reused",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
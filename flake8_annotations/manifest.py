@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import argparse
+import json
+import operator
+import os
+import sys
+import time
+import typing as t
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from flake8_annotations.options import (
+    add_config_options,
+    add_discovery_options,
+    build_parser,
+    parse_args_with_config,
+)
+from flake8_annotations.runner import iter_paths, requested_jobs
+from flake8_annotations.scheduling import DEFAULT_CHUNK_BYTES, FILE_OVERHEAD_BYTES, pack_work_units
+from flake8_annotations.style_guide import format_result
+from flake8_annotations.worker import (
+    FILE_RESULTS,
+    UNIT_RESULTS,
+    check_project_files,
+    init_project_worker,
+    try_create_worker_pool,
+)
+
+
+@dataclass(slots=True)
+class Project:
+    """A project of a manifest: its root directory & the options its files are checked with."""
+
+    name: str
+    root: str
+    options: argparse.Namespace
+    files: t.List[str] = field(default_factory=list)
+    sizes: t.List[int] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class WorkUnit:
+    """A work unit of files of a single project, along with their total size."""
+
+    project: int
+    files: t.List[str]
+    size: int
+
+
+def load_manifest(manifest_file: t.Union[str, Path]) -> t.List[t.Tuple[str, str, t.List[str]]]:
+    """
+    Load the `(name, root, args)` of each project listed by a manifest file.
+
+    A manifest is a JSON list of objects, each with the `root` directory of a project & optionally
+    its `name` (Default: its root) & a list of `args`, accepted by `build_project_parser`. Roots are
+    relative to the directory of the manifest file.
+
+    NOTE: `ValueError` is raised if the manifest isn't valid.
+    """
+    with open(manifest_file, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if not isinstance(manifest, list):
+        raise ValueError("expected a list of projects")
+
+    projects = []
+    for entry in manifest:
+        if not isinstance(entry, dict) or not isinstance(entry.get("root"), str):
+            raise ValueError(f"expected a project with a 'root' directory, got: {entry!r}")
+
+        args = entry.get("args", [])
+        if not isinstance(args, list) or not all(isinstance(arg, str) for arg in args):
+            raise ValueError(f"expected a list of 'args' for {entry['root']!r}, got: {args!r}")
+
+        root = os.path.normpath(os.path.join(os.path.dirname(manifest_file), entry["root"]))
+        projects.append((str(entry.get("name", entry["root"])), root, args))
+
+    return projects
+
+
+def build_project_parser(name: str) -> argparse.ArgumentParser:
+    """Build the argument parser for the options of a single project of a manifest."""
+    parser = build_parser(
+        prog=f"python -m flake8_annotations.manifest ({name})",
+        description="Options of a single project, relative to its root directory.",
+    )
+    parser.add_argument(
+        "paths", nargs="*", default=[], help="Files & directories to check. (Default: '.')"
+    )
+    add_discovery_options(parser)
+    add_config_options(parser)
+    parser.add_argument(
+        "--gitignore",
+        default=False,
+        action="store_true",
+        help="Skip the files & directories ignored by .gitignore files while walking directories.",
+    )
+    parser.add_argument(
+        "--follow-symlinks",
+        default=False,
+        action="store_true",
+        help="Walk symlinked directories.",
+    )
+    parser.set_defaults(files_from=None, stdin_display_name="stdin")
+
+    return parser
+
+
+def parse_project(name: str, root: str, args: t.Sequence[str]) -> Project:
+    """
+    Parse the options of a project, relative to its root directory.
+
+    As when running flake8 from the project's root, its configuration file is located from the
+    root & relative paths, both of the arguments & of the configuration, are relative to the root.
+    The project's paths are then prefixed with its root, so its files are discovered & reported
+    relative to the current directory.
+    """
+    parser = build_project_parser(name)
+    cwd = os.getcwd()
+    try:
+        os.chdir(root)
+    except OSError as e:
+        parser.error(f"can't change to the project's root directory: {e}")
+
+    try:
+        options = parse_args_with_config(parser, args)
+    finally:
+        os.chdir(cwd)
+
+    if "-" in options.paths:
+        parser.error("stdin can't be checked by a project of a manifest")
+    if options.baseline:
+        # Baseline fingerprints are of paths relative to the working directory, not the root
+        parser.error("baselines aren't supported by the projects of a manifest")
+
+    options.paths = [os.path.normpath(os.path.join(root, path)) for path in options.paths or ["."]]
+    return Project(name, root, options)
+
+
+def discover_files(project: Project) -> None:
+    """Discover the files of the provided project, along with their sizes, in path order."""
+    project.files = list(iter_paths(project.options))
+    project.sizes = []
+    for path in project.files:
+        try:
+            project.sizes.append(os.stat(path).st_size)
+        except OSError:
+            project.sizes.append(0)
+
+
+def plan_work_units(
+    projects: t.Sequence[Project], chunk_bytes: int = DEFAULT_CHUNK_BYTES
+) -> t.List[WorkUnit]:
+    """
+    Pack the files of each project into work units, ordered largest first across every project.
+
+    Each unit only holds files of a single project, so it's checked with that project's options, but
+    the units of every project are scheduled together: submitted in decreasing order of size (LPT
+    ordering), a large project's units are spread across the whole pool rather than queued behind
+    those of the projects listed before it.
+    """
+    units = []
+    for idx, project in enumerate(projects):
+        sizes = dict(zip(project.files, project.sizes, strict=True))
+        for files in pack_work_units(project.files, sizes.__getitem__, chunk_bytes):
+            size = sum(sizes[path] + FILE_OVERHEAD_BYTES for path in files)
+            units.append(WorkUnit(idx, files, size))
+
+    units.sort(key=lambda unit: unit.size, reverse=True)
+    return units
+
+
+def run_projects(
+    projects: t.Sequence[Project],
+    options: argparse.Namespace,
+    jobs: int = 1,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> t.List[t.List[FILE_RESULTS]]:
+    """
+    Check the files of each of the provided projects, returning each project's results by path.
+
+    Every project is checked on a single pool of `jobs` worker processes, configured by the provided
+    options & initialized once with the options of every project (see: `check_project_files`), so
+    workers are only started once for the whole manifest. The pool falls back to checking serially
+    if it can't be created.
+    """
+    units = plan_work_units(projects, chunk_bytes)
+    project_options = [project.options for project in projects]
+    unit_results: t.Optional[t.List[UNIT_RESULTS]] = None
+    if jobs > 1 and len(units) > 1:
+        executor = try_create_worker_pool(options, min(jobs, len(units)), project_options)
+        if executor is not None:
+            with executor:
+                futures = [
+                    executor.submit(check_project_files, unit.project, unit.files) for unit in units
+                ]
+                unit_results = [future.result() for future in futures]
+
+    if unit_results is None:
+        init_project_worker(project_options)
+        unit_results = [check_project_files(unit.project, unit.files) for unit in units]
+
+    results: t.List[t.List[FILE_RESULTS]] = [[] for _ in projects]
+    for unit, (batch, _) in zip(units, unit_results, strict=True):
+        results[unit.project].extend(zip(unit.files, batch, strict=True))
+
+    for project_results in results:
+        project_results.sort(key=operator.itemgetter(0))
+
+    return results
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    """Check each project listed by a manifest, reporting errors in flake8's format per project."""
+    parser = argparse.ArgumentParser(
+        prog="python -m flake8_annotations.manifest",
+        description=(
+            "Check the projects listed by a manifest, each with its own options, on a single pool "
+            "of worker processes."
+        ),
+    )
+    parser.add_argument("manifest", help="JSON list of the projects to check.")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default="auto",
+        help="Number of worker processes to use, or 'auto' for one per CPU. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--chunk-bytes",
+        type=int,
+        default=DEFAULT_CHUNK_BYTES,
+        help=(
+            "Approximate total size of the source files sent to a worker as a single task. "
+            "(Default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--exit-zero",
+        default=False,
+        action="store_true",
+        help="Exit with a status code of 0 even if errors are reported.",
+    )
+    parser.add_argument(
+        "--benchmark",
+        default=False,
+        action="store_true",
+        help="Print benchmark information after the run.",
+    )
+    options = parser.parse_args(argv)
+    if options.jobs != "auto" and not options.jobs.isdigit():
+        parser.error(f"'{options.jobs}' is not a valid value for --jobs")
+
+    try:
+        manifest = load_manifest(options.manifest)
+    except (OSError, ValueError) as e:
+        parser.error(f"can't load the manifest: {e}")
+
+    start = time.perf_counter()
+    projects = [parse_project(name, root, args) for name, root, args in manifest]
+    for project in projects:
+        discover_files(project)
+
+    jobs = requested_jobs(options.jobs)
+    results = run_projects(projects, options, jobs, options.chunk_bytes)
+
+    n_files = n_reported = 0
+    for project, project_results in zip(projects, results, strict=True):
+        project_reported = 0
+        for path, file_results in project_results:
+            for result in file_results:
+                print(format_result(path, result))
+
+            project_reported += len(file_results)
+
+        print(
+            f"{project.name}: {len(project_results)} files, {project_reported} errors",
+            file=sys.stderr,
+        )
+        n_files += len(project_results)
+        n_reported += project_reported
+
+    if options.benchmark:
+        elapsed = time.perf_counter() - start
+        print(f"{elapsed:<12.3g} seconds elapsed")
+        print(f"{n_files:<12} total files processed")
+        print(f"{n_files / elapsed if elapsed else 0:<12.0f} files processed per second")
+        print(f"{len(projects):<12} projects checked")
+
+    return 1 if n_reported and not options.exit_zero else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
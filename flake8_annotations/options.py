@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import argparse
+import configparser
+import hashlib
+import typing as t
+
+from flake8.defaults import EXCLUDE
+from flake8.exceptions import ExecutionError
+from flake8.options.config import load_config
+from flake8.utils import (
+    normalize_path,
+    normalize_paths,
+    parse_comma_separated_list,
+    parse_files_to_codes_mapping,
+)
+
+from flake8_annotations.checker import TypeHintChecker
+
+
+class StandaloneOptionManager:
+    """
+    Minimal stand-in for flake8's `OptionManager` for use outside of flake8.
+
+    This allows `TypeHintChecker.add_options` to be reused as-is to register the plugin's options
+    with a plain `argparse.ArgumentParser`, so the standalone entry points accept exactly the same
+    options as the plugin.
+    """
+
+    def __init__(self, parser: argparse.ArgumentParser):
+        self.parser = parser
+        self.extended_default_ignore: t.List[str] = []
+        self.dests: t.List[str] = []
+
+    def add_option(
+        self,
+        *args: str,
+        parse_from_config: bool = False,
+        comma_separated_list: bool = False,
+        **kwargs: t.Any,
+    ) -> None:
+        """Register the provided option with the underlying argument parser."""
+        if comma_separated_list:
+            kwargs["type"] = parse_comma_separated_list
+
+        action = self.parser.add_argument(*args, **kwargs)
+        self.dests.append(action.dest)
+
+    def extend_default_ignore(self, error_codes: t.Sequence[str]) -> None:
+        """Record the error codes to be ignored by default."""
+        self.extended_default_ignore.extend(error_codes)
+
+
+def add_checker_options(parser: argparse.ArgumentParser) -> StandaloneOptionManager:
+    """Register `TypeHintChecker`'s options with the provided argument parser."""
+    manager = StandaloneOptionManager(parser)
+    TypeHintChecker.add_options(manager)
+    parser.set_defaults(extended_default_ignore=manager.extended_default_ignore)
+
+    return manager
+
+
+STYLE_OPTION_NAMES = (
+    "select",
+    "ignore",
+    "extend_select",
+    "extend_ignore",
+    "per_file_ignores",
+    "disable_noqa",
+)
+
+
+def parse_per_file_ignores(value: str) -> t.List[t.Tuple[str, t.List[str]]]:
+    """
+    Parse a mapping of filename patterns to the error codes ignored for them, as done by flake8.
+
+    As in flake8, patterns containing a path separator are normalized relative to the current
+    directory, rather than to the directory of the configuration file.
+
+    NOTE: `argparse.ArgumentTypeError` is raised if the mapping can't be parsed.
+    """
+    try:
+        mapping = parse_files_to_codes_mapping(value)
+    except ExecutionError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+    return [(normalize_path(pattern), codes) for pattern, codes in mapping]
+
+
+def add_style_options(parser: argparse.ArgumentParser) -> None:
+    """Register the subset of flake8's error selection options supported by `StyleGuide`."""
+    for option, help_text in (
+        ("--select", "Comma-separated list of error codes to enable."),
+        ("--ignore", "Comma-separated list of error codes to ignore."),
+        ("--extend-select", "Comma-separated list of error codes to add to the selected codes."),
+        ("--extend-ignore", "Comma-separated list of error codes to add to the ignored codes."),
+    ):
+        parser.add_argument(option, type=parse_comma_separated_list, default=None, help=help_text)
+
+    parser.add_argument(
+        "--per-file-ignores",
+        type=parse_per_file_ignores,
+        default=[],
+        help=(
+            "Whitespace-separated pairings of comma-separated filename patterns & the error codes "
+            "to ignore for the matching files, e.g. 'tests/*.py:ANN001,ANN201 setup.py:ANN'."
+        ),
+    )
+    parser.add_argument(
+        "--disable-noqa",
+        default=False,
+        action="store_true",
+        help="Disable the effect of '# noqa' comments. (Default: %(default)s)",
+    )
+
+
+DISCOVERY_OPTION_NAMES = ("exclude", "extend_exclude", "filename")
+
+
+def parse_path_list(value: str) -> t.List[str]:
+    """Parse a comma-separated list of paths or patterns, normalized like flake8's path options."""
+    paths: t.List[str] = normalize_paths(parse_comma_separated_list(value))
+    return paths
+
+
+def add_discovery_options(parser: argparse.ArgumentParser) -> None:
+    """Register the subset of flake8's file discovery options supported by `iter_source_files`."""
+    parser.add_argument(
+        "--exclude",
+        type=parse_path_list,
+        default=list(EXCLUDE),
+        help="Comma-separated list of files or directories to exclude. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--extend-exclude",
+        type=parse_path_list,
+        default=[],
+        help="Comma-separated list of files or directories to add to the excluded paths.",
+    )
+    parser.add_argument(
+        "--filename",
+        type=parse_path_list,
+        default=["*.py"],
+        help="Only check the files matching these comma-separated patterns. (Default: %(default)s)",
+    )
+
+
+def add_config_options(parser: argparse.ArgumentParser) -> None:
+    """Register flake8's options for locating its configuration file."""
+    parser.add_argument("--config", default=None, help="Path to the config file to use.")
+    parser.add_argument(
+        "--append-config",
+        action="append",
+        default=[],
+        help="Additional config file(s) to read after the located or specified config file.",
+    )
+    parser.add_argument(
+        "--isolated",
+        default=False,
+        action="store_true",
+        help="Ignore all configuration files.",
+    )
+
+
+def config_defaults(
+    parser: argparse.ArgumentParser,
+    config_names: t.Iterable[str],
+    cfg: configparser.RawConfigParser,
+    cfg_dir: str,
+) -> t.Dict[str, t.Any]:
+    """
+    Parse the parser's options from the `[flake8]` section of the provided configuration.
+
+    Only options whose destination is in `config_names` are read & option names may use either
+    dashes or underscores, as done by flake8. Path options are normalized relative to the directory
+    of the configuration file.
+    """
+    if "flake8" not in cfg:
+        return {}
+
+    config_actions = {}
+    config_names = set(config_names)
+    for action in parser._actions:
+        if action.dest not in config_names:
+            continue
+
+        for option_string in action.option_strings:
+            if option_string.startswith("--"):
+                config_actions[option_string[2:]] = action
+                config_actions[option_string[2:].replace("-", "_")] = action
+
+    defaults: t.Dict[str, t.Any] = {}
+    for name in cfg["flake8"]:
+        config_action = config_actions.get(name)
+        if config_action is None:
+            continue
+
+        value: t.Any
+        if isinstance(config_action, (argparse._StoreTrueAction, argparse._StoreFalseAction)):
+            value = cfg.getboolean("flake8", name)
+        elif config_action.type is parse_path_list:
+            value = normalize_paths(parse_comma_separated_list(cfg.get("flake8", name)), cfg_dir)
+        elif callable(config_action.type):
+            value = config_action.type(cfg.get("flake8", name))
+        else:
+            value = cfg.get("flake8", name)
+
+        defaults[config_action.dest] = value
+
+    return defaults
+
+
+def parse_args_with_config(
+    parser: argparse.ArgumentParser,
+    argv: t.Optional[t.Sequence[str]] = None,
+    config_names: t.Iterable[str] = (),
+) -> argparse.Namespace:
+    """
+    Parse the provided arguments, using flake8's configuration file for any option defaults.
+
+    Like flake8, the configuration is located using the `--config`, `--append-config`, &
+    `--isolated` options before the remaining arguments are parsed. Checker, error selection, &
+    file discovery options are always read from the configuration, along with `config_names`.
+    """
+    preliminary, _ = parser.parse_known_args(argv)
+    try:
+        cfg, cfg_dir = load_config(
+            preliminary.config, preliminary.append_config, isolated=preliminary.isolated
+        )
+    except ExecutionError as e:
+        parser.error(str(e))
+
+    config_names = (
+        *checker_option_names(),
+        *STYLE_OPTION_NAMES,
+        *DISCOVERY_OPTION_NAMES,
+        *config_names,
+    )
+    try:
+        defaults = config_defaults(parser, config_names, cfg, cfg_dir)
+    except argparse.ArgumentTypeError as e:
+        parser.error(f"invalid configuration: {e}")
+
+    parser.set_defaults(**defaults)
+    return parser.parse_intermixed_args(argv)
+
+
+def build_parser(prog: str, description: str) -> argparse.ArgumentParser:
+    """Build an argument parser accepting the checker & error selection options."""
+    parser = argparse.ArgumentParser(prog=prog, description=description)
+    add_checker_options(parser)
+    add_style_options(parser)
+
+    return parser
+
+
+def checker_option_names() -> t.Tuple[str, ...]:
+    """Provide the destination names of the options registered by `TypeHintChecker`."""
+    manager = add_checker_options(argparse.ArgumentParser(add_help=False))
+    return tuple(manager.dests)
+
+
+def options_fingerprint(options: argparse.Namespace, extra_names: t.Iterable[str] = ()) -> str:
+    """
+    Calculate a digest of the result-relevant values of the provided options.
+
+    Cached results are only valid for the options they were generated with, so this is used to
+    invalidate any persisted results when the configuration changes. The checker & error selection
+    options are always included, along with the options named by `extra_names`.
+    """
+    normalized = []
+    for name in (*checker_option_names(), *STYLE_OPTION_NAMES, *extra_names):
+        value = getattr(options, name, None)
+        if isinstance(value, (list, set, frozenset, tuple)):
+            value = sorted(value)
+
+        normalized.append(f"{name}={value!r}")
+
+    return hashlib.blake2b("\n".join(normalized).encode(), digest_size=16).hexdigest()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import argparse
+import collections
+import typing as t
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+from flake8_annotations.scheduling import DEFAULT_CHUNK_BYTES, pack_work_units
+from flake8_annotations.source import RESULT, RunStats
+from flake8_annotations.style_guide import StyleGuide
+from flake8_annotations.worker import (
+    FILE_RESULTS,
+    check_sources,
+    display_path,
+    init_worker,
+    read_error_results,
+    read_path,
+    try_create_worker_pool,
+)
+
+# Files read ahead of the check stage, per worker process
+QUEUE_SIZE_PER_JOB = 16
+
+# Work units in flight in the check stage, per worker process
+UNITS_PER_JOB = 2
+
+
+class _ReadFile(t.NamedTuple):
+    """A file that's been read, or that couldn't be read, ahead of the check stage."""
+
+    path: str
+    data: bytes
+    digest: t.Optional[str] = None
+    error_results: t.Optional[t.List[RESULT]] = None
+
+
+class CheckPipeline:
+    """
+    Check a stream of files as a pipeline of read, check, and write stages.
+
+    Files are read (& prefetched) by a pool of reader threads. Their contents are packed, in order,
+    into work units of roughly `chunk_bytes` (see: `pack_work_units`), which are parsed & checked by
+    a pool of worker processes. Results are yielded to the single writer, the caller, in the order
+    the files were provided.
+
+    Each stage is connected by a bounded queue: at most `queue_size` files are read ahead of the
+    check stage & at most `UNITS_PER_JOB` work units per worker are in flight ahead of the writer.
+    This provides back-pressure when any stage falls behind, so memory use doesn't grow with the
+    number of files & the pipeline's throughput approaches that of its slowest stage.
+
+    The stats of every worker's checks are aggregated into `stats` as their results are written.
+    """
+
+    def __init__(
+        self,
+        options: argparse.Namespace,
+        jobs: int,
+        read_threads: int = 4,
+        queue_size: t.Optional[int] = None,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    ):
+        self.options = options
+        self.jobs = jobs
+        self.read_threads = read_threads
+        self.queue_size = queue_size or max(1, jobs) * QUEUE_SIZE_PER_JOB
+        self.chunk_bytes = chunk_bytes
+        self.style_guide = StyleGuide(options)
+        self.stats = RunStats()
+
+    def run(self, paths: t.Iterable[str]) -> t.Iterator[FILE_RESULTS]:
+        """Check the provided files, yielding their `(path, results)` tuples in the same order."""
+        with ThreadPoolExecutor(self.read_threads, "flake8-annotations-reader") as readers:
+            yield from self._check(self._iter_read(paths, readers))
+
+    def run_sources(
+        self, sources: t.Iterable[t.Tuple[str, bytes, t.Optional[str]]]
+    ) -> t.Iterator[FILE_RESULTS]:
+        """
+        Check the provided `(display path, contents, digest)` triples, which have already been read.
+
+        Sources are consumed lazily, as the check stage has room for them, & checked by the check &
+        write stages as done by `run`. Sources with a digest are identified by it rather than by a
+        digest of their contents (see: `SourceChecker`).
+        """
+        yield from self._check(_ReadFile(path, data, digest) for path, data, digest in sources)
+
+    def _check(self, read_files: t.Iterable[_ReadFile]) -> t.Iterator[FILE_RESULTS]:
+        with self._create_check_executor() as checkers:
+            units = pack_work_units(
+                read_files, lambda read_file: len(read_file.data), self.chunk_bytes
+            )
+
+            pending: t.Deque[t.Tuple[t.List[_ReadFile], Future]] = collections.deque()
+            for unit in units:
+                if len(pending) >= max(1, self.jobs) * UNITS_PER_JOB:
+                    yield from self._merge(*pending.popleft())
+
+                checked = [rf for rf in unit if rf.error_results is None]
+                sources = [(rf.path, rf.data) for rf in checked]
+                digests = [rf.digest for rf in checked]
+                pending.append((unit, checkers.submit(check_sources, sources, digests)))
+
+            while pending:
+                yield from self._merge(*pending.popleft())
+
+    def _iter_read(self, paths: t.Iterable[str], readers: Executor) -> t.Iterator[_ReadFile]:
+        """Read the provided files in order, keeping up to `queue_size` reads in flight."""
+        reads: t.Deque[t.Tuple[str, Future[bytes]]] = collections.deque()
+        for path in paths:
+            if len(reads) >= self.queue_size:
+                yield self._read_result(*reads.popleft())
+
+            reads.append((path, readers.submit(read_path, path)))
+
+        while reads:
+            yield self._read_result(*reads.popleft())
+
+    def _read_result(self, path: str, read: Future[bytes]) -> _ReadFile:
+        name = display_path(path, self.options)
+        try:
+            return _ReadFile(name, read.result())
+        except OSError as e:
+            return _ReadFile(name, b"", error_results=read_error_results(e, self.style_guide, name))
+
+    def _merge(self, unit: t.List[_ReadFile], check: Future) -> t.Iterator[FILE_RESULTS]:
+        """Yield the results for each file of the work unit, in order."""
+        records = check.result()
+        if records.stats is not None:
+            self.stats.merge(records.stats)
+
+        batch = iter(records)
+        for read_file in unit:
+            if read_file.error_results is not None:
+                yield read_file.path, read_file.error_results
+            else:
+                yield read_file.path, next(batch)
+
+    def _create_check_executor(self) -> Executor:
+        executor = try_create_worker_pool(self.options, self.jobs) if self.jobs > 1 else None
+        if executor is not None:
+            return executor
+
+        # Check serially, in a single thread, so the checker state isn't shared between threads
+        init_worker(self.options)
+        return ThreadPoolExecutor(1, "flake8-annotations-checker")
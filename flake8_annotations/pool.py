@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import collections
+import multiprocessing
+import os
+import threading
+import typing as t
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+
+MIB = 1024 * 1024
+
+# Interval between checks of the memory use of busy workers, in seconds
+RSS_POLL_SECONDS = 0.05
+
+# Time a stopped worker is given to exit, before it's terminated (& then killed), in seconds
+STOP_TIMEOUT_SECONDS = 5
+
+# Number of times a task is retried on a fresh worker after its worker is restarted or dies
+MAX_TASK_RETRIES = 2
+
+
+class BrokenWorkerError(RuntimeError):
+    """Raised for a task whose worker died on each of its attempts."""
+
+
+def rss_bytes(pid: t.Union[int, str, None] = "self") -> t.Optional[int]:
+    """
+    Read the resident set size of the provided process from `/proc/<pid>/statm`, in bytes.
+
+    `None` is returned if the process' memory use can't be read, e.g. on platforms without procfs.
+    A `ValueError` is raised for a missing process ID (`None` or `0`), e.g. of a process that
+    hasn't been started, rather than reading the memory use of the current process.
+    """
+    if pid is None or pid == 0:
+        raise ValueError(f"Invalid process ID: {pid!r}")
+
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+@dataclass(slots=True)
+class PoolStats:
+    """Keep track of the workers recycled & tasks retried by a `RecyclingPool`."""
+
+    workers_started: int = 0
+    workers_retired: int = 0
+    workers_restarted: int = 0
+    tasks_retried: int = 0
+
+    def describe(self) -> str:
+        """Describe the pool's worker recycling."""
+        return (
+            f"{self.workers_started} workers started; {self.workers_retired} retired, "
+            f"{self.workers_restarted} restarted over the memory limit or after dying, "
+            f"{self.tasks_retried} tasks retried"
+        )
+
+
+@dataclass(slots=True)
+class _Task:
+    future: Future
+    fn: t.Callable[..., t.Any]
+    args: t.Tuple[t.Any, ...]
+    kwargs: t.Dict[str, t.Any]
+    attempts: int = 0
+
+
+@dataclass(slots=True)
+class _Worker:
+    process: multiprocessing.process.BaseProcess
+    conn: Connection
+    task: t.Optional[_Task] = None
+
+
+def _worker_main(
+    conn: Connection,
+    initializer: t.Optional[t.Callable[..., t.Any]],
+    initargs: t.Tuple[t.Any, ...],
+    should_retire: t.Optional[t.Callable[[], bool]],
+) -> None:
+    """Run tasks received from the pool until told to stop, or until the worker should retire."""
+    if initializer is not None:
+        initializer(*initargs)
+
+    while True:
+        task = conn.recv()
+        if task is None:
+            return
+
+        fn, args, kwargs = task
+        try:
+            outcome = (True, fn(*args, **kwargs))
+        except BaseException as e:
+            outcome = (False, e)
+
+        retire = should_retire is not None and should_retire()
+        try:
+            conn.send((*outcome, retire))
+        except Exception as e:  # e.g. an unpicklable result or exception
+            conn.send((False, RuntimeError(f"Unable to send the task's outcome: {e!r}"), retire))
+
+        if retire:
+            return
+
+
+class RecyclingPool(Executor):
+    """
+    Process pool that recycles its workers, bounding the memory each worker can accumulate.
+
+    After each task, a worker retires itself if `should_retire` (called in the worker) returns
+    `True` & is replaced by a fresh worker. Independently, the parent polls the resident set size of
+    busy workers: a worker exceeding `max_rss` bytes is restarted & its in-flight task is retried on
+    a fresh worker. The limit is soft: a retried task is allowed to exceed it, so a task that needs
+    more memory than the limit still completes. Tasks whose worker dies unexpectedly, e.g. at the
+    hands of the OOM killer, are also retried, up to `MAX_TASK_RETRIES` times.
+
+    Each worker runs a single task at a time, so a restarted worker only affects its own task.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        initializer: t.Optional[t.Callable[..., t.Any]] = None,
+        initargs: t.Tuple[t.Any, ...] = (),
+        should_retire: t.Optional[t.Callable[[], bool]] = None,
+        max_rss: t.Optional[int] = None,
+        mp_context: t.Optional[t.Any] = None,
+    ):
+        self._max_workers = max_workers
+        self._initializer = initializer
+        self._initargs = initargs
+        self._should_retire = should_retire
+        self._max_rss = max_rss
+        self._context = mp_context or multiprocessing.get_context()
+        self.stats = PoolStats()
+
+        self._lock = threading.Lock()
+        self._tasks: t.Deque[_Task] = collections.deque()
+        self._workers: t.List[_Worker] = []
+        self._is_shutdown = False
+        wakeup: t.Tuple[Connection, Connection] = self._context.Pipe(duplex=False)
+        self._wakeup_reader, self._wakeup_writer = wakeup
+        self._dispatcher = threading.Thread(
+            target=self._dispatch, name="flake8-annotations-pool", daemon=True
+        )
+        self._dispatcher.start()
+
+    def submit(self, fn: t.Callable[..., t.Any], /, *args: t.Any, **kwargs: t.Any) -> Future:
+        """Schedule the provided callable to be run on a worker process."""
+        with self._lock:
+            if self._is_shutdown:
+                raise RuntimeError("Cannot schedule new tasks after shutdown")
+
+            future: Future = Future()
+            self._tasks.append(_Task(future, fn, args, kwargs))
+
+        self._wakeup()
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """Stop the pool once all scheduled tasks are complete, optionally cancelling them."""
+        with self._lock:
+            self._is_shutdown = True
+            if cancel_futures:
+                while self._tasks:
+                    self._tasks.popleft().future.cancel()
+
+        self._wakeup()
+        if wait:
+            self._dispatcher.join()
+
+    def _wakeup(self) -> None:
+        self._wakeup_writer.send_bytes(b"")
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self._initializer, self._initargs, self._should_retire),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self.stats.workers_started += 1
+        return _Worker(process, parent_conn)
+
+    def _dispatch(self) -> None:
+        try:
+            self._workers = [self._spawn() for _ in range(self._max_workers)]
+            while True:
+                self._assign_tasks()
+                with self._lock:
+                    if self._is_shutdown and not self._tasks:
+                        if not any(worker.task for worker in self._workers):
+                            break
+
+                busy = [worker for worker in self._workers if worker.task is not None]
+                waitables: t.List[t.Any] = [self._wakeup_reader]
+                waitables.extend(worker.conn for worker in busy)
+                waitables.extend(worker.process.sentinel for worker in busy)
+                timeout = RSS_POLL_SECONDS if self._max_rss is not None and busy else None
+                ready = set(wait(waitables, timeout))
+
+                if self._wakeup_reader in ready:
+                    while self._wakeup_reader.poll():
+                        self._wakeup_reader.recv_bytes()
+
+                for worker in busy:
+                    if worker.conn in ready:
+                        self._receive(worker)
+                    elif worker.process.sentinel in ready:
+                        self._restart(worker)
+
+                if self._max_rss is not None:
+                    self._check_memory()
+        except BaseException as e:
+            # Don't leave the caller waiting on tasks that will never be run
+            with self._lock:
+                self._is_shutdown = True
+                tasks = [*self._tasks, *(worker.task for worker in self._workers if worker.task)]
+                self._tasks.clear()
+
+            for task in tasks:
+                if not task.future.done():
+                    task.future.set_exception(BrokenWorkerError(f"Worker pool failed: {e!r}"))
+
+            raise
+        finally:
+            for worker in self._workers:
+                self._stop(worker)
+
+    def _assign_tasks(self) -> None:
+        for worker in self._workers:
+            if worker.task is not None:
+                continue
+
+            with self._lock:
+                if not self._tasks:
+                    return
+
+                task = self._tasks.popleft()
+
+            if task.attempts == 0 and not task.future.set_running_or_notify_cancel():
+                continue
+
+            worker.task = task
+            try:
+                worker.conn.send((task.fn, task.args, task.kwargs))
+            except (OSError, ValueError):
+                # The worker died while idle, or the task couldn't be pickled
+                if worker.process.is_alive():
+                    worker.task = None
+                    task.future.set_exception(RuntimeError("Unable to send the task to a worker"))
+                else:
+                    self._restart(worker)
+
+    def _receive(self, worker: _Worker) -> None:
+        try:
+            is_success, outcome, retire = worker.conn.recv()
+        except (EOFError, OSError):
+            self._restart(worker)
+            return
+
+        task, worker.task = worker.task, None
+        assert task is not None
+        if is_success:
+            task.future.set_result(outcome)
+        else:
+            task.future.set_exception(outcome)
+
+        if retire:
+            self.stats.workers_retired += 1
+            self._replace(worker)
+
+    def _check_memory(self) -> None:
+        assert self._max_rss is not None
+        for worker in self._workers:
+            task = worker.task
+            if task is None or task.attempts > 0:
+                # Retried tasks may exceed the soft limit, so they're guaranteed to complete
+                continue
+
+            rss = rss_bytes(worker.process.pid)
+            if rss is not None and rss > self._max_rss:
+                worker.process.kill()
+                worker.process.join()
+                self._restart(worker)
+
+    def _restart(self, worker: _Worker) -> None:
+        """Replace a worker that died or was killed, retrying its in-flight task."""
+        self.stats.workers_restarted += 1
+        task, worker.task = worker.task, None
+        if task is not None:
+            if task.attempts < MAX_TASK_RETRIES:
+                task.attempts += 1
+                self.stats.tasks_retried += 1
+                with self._lock:
+                    self._tasks.appendleft(task)
+            else:
+                task.future.set_exception(
+                    BrokenWorkerError(
+                        f"Worker died on all {task.attempts + 1} attempts of the task"
+                    )
+                )
+
+        self._replace(worker)
+
+    def _replace(self, worker: _Worker) -> None:
+        self._stop(worker)
+        replacement = self._spawn()
+        self._workers[self._workers.index(worker)] = replacement
+
+    @staticmethod
+    def _stop(worker: _Worker) -> None:
+        """Stop the worker, terminating it if it doesn't exit within `STOP_TIMEOUT_SECONDS`."""
+        if worker.process.is_alive():
+            try:
+                worker.conn.send(None)
+            except (OSError, ValueError):
+                worker.process.kill()
+
+        worker.process.join(STOP_TIMEOUT_SECONDS)
+        if worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join(STOP_TIMEOUT_SECONDS)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+
+        worker.conn.close()
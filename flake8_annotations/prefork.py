@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import gc
+import multiprocessing
+import os
+import typing as t
+from argparse import Namespace
+
+from flake8_annotations.checker import CheckerConfig, TypeHintChecker
+
+# Source exercising each of the checker's code paths, checked once before forking workers so the
+# code they run is already warm in the pages they share with the parent
+WARMUP_SOURCE = """\
+import typing
+from functools import singledispatch
+from typing import overload
+
+
+def untyped(a, b=1, *args, c, d=2, **kwargs):
+    def nested(e):
+        return e
+
+    return nested
+
+
+async def coroutine(a: int, /, b: typing.Any, *args: typing.Any) -> None:
+    pass
+
+
+def _protected():
+    pass
+
+
+def __private():
+    pass
+
+
+def type_comments(a, b):
+    # type: (int, str) -> None
+    pass
+
+
+def ignored(a):  # type: ignore
+    pass
+
+
+@overload
+def overloaded(a: int) -> int: ...
+@overload
+def overloaded(a: str) -> str: ...
+def overloaded(a):
+    return a
+
+
+@singledispatch
+def dispatched(a):
+    pass
+
+
+class Klass:
+    def __init__(self, a):
+        pass
+
+    def method(self, a: typing.Any):
+        lambda_ = lambda b: b  # noqa: E731
+        return lambda_
+
+    @classmethod
+    def class_method(cls, _):
+        yield
+
+    @staticmethod
+    def static_method(a):
+        return
+
+    @property
+    def prop(self):
+        return 1
+"""
+
+# Whether the current process has already been prepared for forking workers
+_prepared = False
+
+
+def uses_fork() -> bool:
+    """
+    Determine whether worker processes are started by forking the current process.
+
+    NOTE: The global start method isn't fixed if it hasn't been set yet, so it can still be set by
+    the host application; `get_context()` would also fix it, so the platform's default start method
+    is instead the first of `get_all_start_methods()`.
+    """
+    start_method = multiprocessing.get_start_method(allow_none=True)
+    if start_method is None:
+        start_method = multiprocessing.get_all_start_methods()[0]
+
+    return start_method == "fork"
+
+
+def flake8_forks_workers(options: Namespace) -> bool:
+    """
+    Determine whether flake8 will fork worker processes for the provided options.
+
+    flake8 checks files serially with a single job or when reading from stdin. Options not parsed
+    by flake8, e.g. those of the standalone runner, are never considered to fork flake8's workers.
+    """
+    jobs: t.Any = getattr(options, "jobs", None)
+    if not hasattr(jobs, "n_jobs"):
+        return False
+
+    n_jobs = (os.cpu_count() or 1) if jobs.is_auto else jobs.n_jobs
+    return n_jobs > 1 and "-" not in getattr(options, "filenames", ()) and uses_fork()
+
+
+def warm_up(config: t.Optional[CheckerConfig] = None) -> None:
+    """
+    Exercise the checker once with the provided configuration, in the current process.
+
+    Every table the checker needs is built at import; this additionally runs the parser, the AST
+    walker, the error classifiers & the message templates of each error code, so workers forked
+    afterwards don't each warm them up on their first file.
+    """
+    checker_instance = TypeHintChecker(None, WARMUP_SOURCE.splitlines(keepends=True))
+    if config is not None:
+        checker_instance.config = config
+
+    for function, error in checker_instance.iter_errors():
+        error.to_flake8()
+        TypeHintChecker.error_key(function, error)
+
+
+def prepare_for_fork(config: t.Optional[CheckerConfig] = None) -> None:
+    """
+    Prepare the current process for forking worker processes that share its memory.
+
+    The checker is warmed up (see: `warm_up`), then the garbage collector is run & every surviving
+    object is moved to the permanent generation (see: `gc.freeze`). Objects created before the fork
+    are then never traversed by the garbage collector in the workers, which would otherwise write to
+    (& copy) the pages holding them.
+
+    NOTE: The current process is only prepared once, since frozen objects are never collected.
+    """
+    global _prepared
+
+    if _prepared:
+        return
+
+    warm_up(config)
+    gc.collect()
+    gc.freeze()
+    _prepared = True
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import itertools
+import typing as t
+from array import array
+from dataclasses import dataclass, field
+
+from flake8_annotations import error_codes
+from flake8_annotations.source import RESULT, RunStats
+
+# Message template of each of the plugin's error codes, where `{}` is replaced by the argument name
+TEMPLATES: t.Dict[str, str] = {
+    cls.__name__: cls("", 0, 0).message  # type: ignore[call-arg]
+    for cls in error_codes.Error.__subclasses__()
+}
+
+# Enumeration of the error codes that can be encoded by reference to their template; results with
+# any other message, e.g. E999 & E902, are encoded with their message inline as code 0
+CODES: t.Tuple[str, ...] = ("", *sorted(TEMPLATES))
+_CODE_IDS = {code: idx for idx, code in enumerate(CODES)}
+_TEMPLATE_PARTS = {code: template.partition("{}") for code, template in TEMPLATES.items()}
+
+INLINE = 0
+
+
+def encode_message(message: str) -> t.Tuple[int, str]:
+    """
+    Encode the provided message as a `(code id, argument name)` pair.
+
+    Messages that don't match their code's template are encoded inline, as `(INLINE, message)`.
+    """
+    code = message.partition(" ")[0]
+    code_id = _CODE_IDS.get(code, INLINE)
+    if code_id != INLINE:
+        prefix, placeholder, suffix = _TEMPLATE_PARTS[code]
+        if not placeholder:
+            if message == prefix:
+                return code_id, ""
+        elif (
+            message.startswith(prefix)
+            and message.endswith(suffix)
+            and len(message) >= len(prefix) + len(suffix)
+        ):
+            return code_id, message[len(prefix) : len(message) - len(suffix)]
+
+    return INLINE, message
+
+
+def decode_message(code_id: int, text: str) -> str:
+    """Rebuild the message for the provided `(code id, argument name)` pair."""
+    if code_id == INLINE:
+        return text
+
+    return TEMPLATES[CODES[code_id]].replace("{}", text, 1)
+
+
+def _packed(values: t.List[int]) -> array:
+    """
+    Pack the provided integers into an array of the narrowest sufficient type.
+
+    NOTE: Column numbers may be negative, e.g. `-1` where a function's closing colon can't be found.
+    """
+    low, high = min(values, default=0), max(values, default=0)
+    signed = low < 0
+    for typecode in "bhiq" if signed else "BHIQ":
+        bits = array(typecode).itemsize * 8 - signed
+        if -(1 << bits) <= low and high < 1 << bits:
+            break
+
+    return array(typecode, values)
+
+
+@dataclass(slots=True)
+class ResultRecords:
+    """
+    Compact binary encoding of the checker results for each file of a work unit.
+
+    Each result is encoded as a fixed-width record of its line & column numbers and the id of its
+    message in the batch's message table. Each distinct message is encoded once, as the id of its
+    error code (see: `CODES`) & the id of its argument name in the batch's interned string table.
+    Records are stored column-wise in typed arrays of the narrowest sufficient width, which pickle
+    as a single buffer each, and message text is only rebuilt from the code's template when a
+    file's results are first accessed.
+
+    Workers also attach the stats of the unit's checks, if any were made by a `SourceChecker`, so
+    they can be aggregated across workers (see: `RunStats.merge`).
+
+    Iterating over the records yields a lazily decoded sequence of results for each file, in order.
+    """
+
+    counts: array = field(default_factory=lambda: array("I"))
+    lines: array = field(default_factory=lambda: array("I"))
+    columns: array = field(default_factory=lambda: array("I"))
+    message_ids: array = field(default_factory=lambda: array("I"))
+    message_codes: array = field(default_factory=lambda: array("B"))
+    message_strings: array = field(default_factory=lambda: array("I"))
+    string_table: t.List[str] = field(default_factory=list)
+    stats: t.Optional[RunStats] = field(default=None, compare=False, repr=False)
+    _messages: t.Optional[t.List[str]] = field(default=None, compare=False, repr=False)
+
+    @classmethod
+    def from_results(cls, batch: t.Iterable[t.Sequence[RESULT]]) -> ResultRecords:
+        """Encode the provided results for each file of a work unit."""
+        interned: t.Dict[str, int] = {}
+        message_ids: t.Dict[str, int] = {}
+        message_codes, message_strings = [], []
+        counts, lines, columns, ids = [], [], [], []
+        for results in batch:
+            counts.append(len(results))
+            for lineno, col_offset, message in results:
+                message_id = message_ids.get(message)
+                if message_id is None:
+                    code_id, text = encode_message(message)
+                    message_id = message_ids[message] = len(message_ids)
+                    message_codes.append(code_id)
+                    message_strings.append(interned.setdefault(text, len(interned)))
+
+                lines.append(lineno)
+                columns.append(col_offset)
+                ids.append(message_id)
+
+        return cls(
+            _packed(counts),
+            _packed(lines),
+            _packed(columns),
+            _packed(ids),
+            array("B", message_codes),
+            _packed(message_strings),
+            list(interned),
+        )
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __iter__(self) -> t.Iterator[FileResults]:
+        for stop, count in zip(itertools.accumulate(self.counts), self.counts, strict=True):
+            yield FileResults(self, stop - count, stop)
+
+    def messages(self) -> t.List[str]:
+        """Rebuild the text of the batch's distinct messages, in order of their message ids."""
+        if self._messages is None:
+            self._messages = [
+                decode_message(code_id, self.string_table[string_id])
+                for code_id, string_id in zip(self.message_codes, self.message_strings, strict=True)
+            ]
+
+        return self._messages
+
+    def decode(self, start: int, stop: int) -> t.Iterator[RESULT]:
+        """Lazily decode the results of the provided range of records."""
+        messages = self.messages()
+        return zip(
+            self.lines[start:stop],
+            self.columns[start:stop],
+            map(messages.__getitem__, self.message_ids[start:stop]),
+            strict=True,
+        )
+
+
+class FileResults(t.Sequence[RESULT]):
+    """
+    Lazily decoded results of a single file.
+
+    Iterating over the results decodes them on the fly; indexing decodes & keeps all of them.
+    """
+
+    __slots__ = ("_records", "_start", "_stop", "_results")
+
+    def __init__(self, records: ResultRecords, start: int, stop: int):
+        self._records = records
+        self._start = start
+        self._stop = stop
+        self._results: t.Optional[t.List[RESULT]] = None
+
+    def _decoded(self) -> t.List[RESULT]:
+        if self._results is None:
+            self._results = list(self._records.decode(self._start, self._stop))
+
+        return self._results
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    @t.overload
+    def __getitem__(self, idx: int) -> RESULT: ...
+
+    @t.overload
+    def __getitem__(self, idx: slice) -> t.List[RESULT]: ...
+
+    def __getitem__(self, idx: t.Union[int, slice]) -> t.Union[RESULT, t.List[RESULT]]:
+        return self._decoded()[idx]
+
+    def __iter__(self) -> t.Iterator[RESULT]:
+        if self._results is not None:
+            return iter(self._results)
+
+        return self._records.decode(self._start, self._stop)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (FileResults, list)):
+            return self._decoded() == list(other)
+
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"FileResults({self._decoded()!r})"
@@ -0,0 +1,660 @@
+from __future__ import annotations
+
+import argparse
+import operator
+import os
+import subprocess
+import sys
+import time
+import typing as t
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+
+from flake8_annotations.archives import ARCHIVE_PATTERNS
+from flake8_annotations.gitobjects import (
+    Blob,
+    BlobFilter,
+    CatFile,
+    index_blobs,
+    range_blobs,
+    revision_blobs,
+)
+from flake8_annotations.options import (
+    add_config_options,
+    add_discovery_options,
+    build_parser,
+    parse_args_with_config,
+)
+from flake8_annotations.pipeline import CheckPipeline, QUEUE_SIZE_PER_JOB
+from flake8_annotations.scheduling import (
+    CostModel,
+    DEFAULT_CHUNK_BYTES,
+    choose_workers,
+    lpt_makespan,
+    pack_by_cost,
+    pack_work_units,
+    unit_target_seconds,
+)
+from flake8_annotations.source import RunStats, is_excluded, iter_path_list, iter_source_files
+from flake8_annotations.split import DEFAULT_SPLIT_BYTES, FileSplitter, check_split_file
+from flake8_annotations.style_guide import format_result
+from flake8_annotations.walk import SourceWalker
+from flake8_annotations.worker import (
+    ARCHIVE_RESULTS,
+    FILE_RESULTS,
+    UNIT_RESULTS,
+    check_archive,
+    check_files,
+    display_path,
+    init_worker,
+    try_create_worker_pool,
+)
+
+
+def requested_jobs(jobs: str) -> int:
+    """Determine the number of worker processes requested by the `--jobs` option."""
+    if jobs == "auto":
+        return os.cpu_count() or 1
+
+    return max(1, int(jobs))
+
+
+def job_count(jobs: str, paths: t.Sequence[str], split_bytes: int = 0) -> int:
+    """
+    Determine the number of worker processes to use, in the same manner as flake8.
+
+    Checks are run serially when reading from stdin or when there's only a single file to check,
+    unless a file is large enough to be checked in parallel chunks (see: `--split-bytes`).
+    """
+    if "-" in paths:
+        return 1
+
+    n_jobs = requested_jobs(jobs)
+    if len(paths) < n_jobs and split_bytes > 0:
+        if any(_file_size(path) >= split_bytes for path in paths):
+            return n_jobs
+
+    return max(1, min(n_jobs, len(paths)))
+
+
+def run_checks(
+    paths: t.Iterable[str],
+    options: argparse.Namespace,
+    jobs: int = 1,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    stats: t.Optional[RunStats] = None,
+) -> t.List[FILE_RESULTS]:
+    """
+    Check the provided files, returning `(path, results)` tuples sorted by path.
+
+    Files are checked on a pool of `jobs` worker processes, each initialized with the provided
+    options, falling back to checking serially if the pool can't be created. Files are sent to the
+    workers in work units of roughly `chunk_bytes` of source (see: `pack_work_units`). Files of at
+    least `--split-bytes` are instead split into chunks checked in parallel (see: `FileSplitter`).
+
+    Paths may be provided lazily, e.g. as a file list is read; each work unit is dispatched as soon
+    as it's packed.
+
+    If provided, the stats of every worker's checks are added to `stats` (see: `RunStats.merge`).
+    """
+    sizes: t.Dict[str, int] = {}
+
+    def file_size(path: str) -> int:
+        size = sizes[path] = _file_size(path)
+        return size
+
+    units = pack_work_units(paths, file_size, chunk_bytes)
+    return _sorted_file_results(check_units(units, options, jobs, sizes), options, stats)
+
+
+@dataclass(slots=True)
+class ScheduleReport:
+    """Summarize a run scheduled using the cost model."""
+
+    jobs: int
+    units: int
+    predicted_makespan: float
+    actual_makespan: float = 0.0
+
+    def describe(self) -> str:
+        """Describe the predicted & actual makespan of the run."""
+        return (
+            f"{self.units} work units on {self.jobs} jobs; predicted makespan "
+            f"{self.predicted_makespan:.3f}s, actual makespan {self.actual_makespan:.3f}s"
+        )
+
+
+def run_scheduled(
+    paths: t.Sequence[str],
+    options: argparse.Namespace,
+    max_jobs: int,
+    cost_model: CostModel,
+    auto_jobs: bool = True,
+    stats: t.Optional[RunStats] = None,
+) -> t.Tuple[t.List[FILE_RESULTS], ScheduleReport]:
+    """
+    Check the provided files, scheduled using the predicted cost of each file.
+
+    Files are packed into work units by predicted cost & submitted longest first (LPT ordering),
+    so a single expensive file isn't left until the end of the run. If `auto_jobs` is `True`, the
+    number of workers, up to `max_jobs`, is chosen to minimize the predicted makespan.
+
+    The time taken to check each file is recorded in the cost model, for use by subsequent runs. If
+    provided, the stats of every worker's checks are added to `stats`.
+    """
+    sizes = [_file_size(path) for path in paths]
+    costs = [cost_model.predict(path, size) for path, size in zip(paths, sizes, strict=True)]
+    target = unit_target_seconds(sum(costs), max_jobs)
+    unit_indices = pack_by_cost(costs, target)
+    unit_costs = [sum(costs[idx] for idx in unit) for unit in unit_indices]
+
+    jobs = choose_workers(unit_costs, max_jobs) if auto_jobs else min(max_jobs, len(unit_costs))
+    jobs = max(1, jobs)
+    report = ScheduleReport(jobs, len(unit_indices), lpt_makespan(unit_costs, jobs))
+
+    start = time.perf_counter()
+    units = [[paths[idx] for idx in unit] for unit in unit_indices]
+    unit_results = check_units(units, options, jobs)
+    report.actual_makespan = time.perf_counter() - start
+
+    for unit, (_, (_, durations)) in zip(unit_indices, unit_results, strict=True):
+        for idx, seconds in zip(unit, durations, strict=True):
+            cost_model.record(paths[idx], sizes[idx], seconds)
+
+    cost_model.fit()
+    return _sorted_file_results(unit_results, options, stats), report
+
+
+def check_units(
+    units: t.Iterable[t.List[str]],
+    options: argparse.Namespace,
+    jobs: int = 1,
+    sizes: t.Optional[t.Mapping[str, int]] = None,
+) -> t.List[t.Tuple[t.List[str], UNIT_RESULTS]]:
+    """
+    Check the provided work units, returning each unit along with its results, in order.
+
+    Units are checked on a pool of `jobs` worker processes, each initialized with the provided
+    options, falling back to checking serially if the pool can't be created.
+
+    If the size of each file is provided, files of at least `--split-bytes` are taken out of their
+    unit & checked in parallel chunks on the same pool, each reported as a unit of its own.
+    """
+    if jobs > 1:
+        unit_results = _check_parallel(units, options, jobs, sizes)
+        if unit_results is not None:
+            return unit_results
+
+    init_worker(options)
+    return [(unit, check_files(unit)) for unit in units]
+
+
+def _sorted_file_results(
+    unit_results: t.List[t.Tuple[t.List[str], UNIT_RESULTS]],
+    options: argparse.Namespace,
+    stats: t.Optional[RunStats] = None,
+) -> t.List[FILE_RESULTS]:
+    if stats is not None:
+        for _, (batch, _) in unit_results:
+            if batch.stats is not None:
+                stats.merge(batch.stats)
+
+    file_results = [
+        (display_path(path, options), results)
+        for unit, (batch, _) in unit_results
+        for path, results in zip(unit, batch, strict=True)
+    ]
+    return sorted(file_results, key=operator.itemgetter(0))
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+def _check_parallel(
+    units: t.Iterable[t.List[str]],
+    options: argparse.Namespace,
+    jobs: int,
+    sizes: t.Optional[t.Mapping[str, int]] = None,
+) -> t.Optional[t.List[t.Tuple[t.List[str], UNIT_RESULTS]]]:
+    executor = try_create_worker_pool(options, jobs)
+    if executor is None:
+        return None
+
+    splitter = FileSplitter(executor, jobs, getattr(options, "split_bytes", 0))
+    splitting: t.Optional[ThreadPoolExecutor] = None
+    with executor:
+        # Lazily packed units are submitted as they're packed, so workers can start while files are
+        # still being sized
+        futures: t.List[t.Tuple[t.List[str], Future]] = []
+        for unit in units:
+            if sizes is not None:
+                split = [path for path in unit if splitter.should_split(sizes.get(path, 0))]
+                if split:
+                    # Split files are read & merged on threads of this process, which wait on their
+                    # chunks' checks on the pool
+                    if splitting is None:
+                        splitting = ThreadPoolExecutor(jobs, "flake8-annotations-splitter")
+
+                    for path in split:
+                        futures.append(
+                            ([path], splitting.submit(check_split_file, path, options, splitter))
+                        )
+
+                    unit = [path for path in unit if path not in split]
+                    if not unit:
+                        continue
+
+            futures.append((unit, executor.submit(check_files, unit)))
+
+        try:
+            return [(unit, future.result()) for unit, future in futures]
+        finally:
+            if splitting is not None:
+                splitting.shutdown()
+
+
+def build_runner_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the standalone runner."""
+    parser = build_parser(
+        prog="python -m flake8_annotations",
+        description="Check for missing type annotations, without the overhead of running flake8.",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=[],
+        help="Files & directories to check. (Default: '.', unless --files-from is provided)",
+    )
+    add_discovery_options(parser)
+    add_config_options(parser)
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default="auto",
+        help="Number of worker processes to use, or 'auto' for one per CPU. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--files-from",
+        default=None,
+        metavar="FILE",
+        help=(
+            "Also check the files & directories listed in this file, or '-' for stdin, separated "
+            "by NULs or newlines. Listed files are checked as the list is read."
+        ),
+    )
+    parser.add_argument(
+        "-0",
+        "--null",
+        default=None,
+        action="store_true",
+        help="The --files-from list is NUL separated. (Default: detected from the first separator)",
+    )
+    parser.add_argument(
+        "--archives",
+        default=False,
+        action="store_true",
+        help=(
+            "Check the Python sources inside wheels, zip & tar.gz archives, without unpacking "
+            "them. Paths name archives, or directories searched for them."
+        ),
+    )
+    git_objects = parser.add_mutually_exclusive_group()
+    git_objects.add_argument(
+        "--git-rev",
+        default=None,
+        metavar="REVISION",
+        help=(
+            "Check the files of this git revision, read from the repository rather than the "
+            "working tree. Paths limit the files checked, as git pathspecs."
+        ),
+    )
+    git_objects.add_argument(
+        "--git-index",
+        default=False,
+        action="store_true",
+        help="Check the files staged in the git index, e.g. from a pre-commit hook.",
+    )
+    git_objects.add_argument(
+        "--git-range",
+        default=None,
+        metavar="OLD..NEW",
+        help=(
+            "Check the files added or modified between two git revisions, e.g. from a "
+            "pre-receive hook. A null OLD checks every file of NEW."
+        ),
+    )
+    parser.add_argument(
+        "--gitignore",
+        default=False,
+        action="store_true",
+        help=(
+            "Skip the files & directories ignored by .gitignore files while walking directories. "
+            "Files & directories reached by several paths are only checked once."
+        ),
+    )
+    parser.add_argument(
+        "--follow-symlinks",
+        default=False,
+        action="store_true",
+        help=(
+            "Walk symlinked directories. Files & directories reached by several paths are only "
+            "checked once."
+        ),
+    )
+    parser.add_argument(
+        "--stdin-display-name",
+        default="stdin",
+        help="Name used to report errors for source read from stdin. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--exit-zero",
+        default=False,
+        action="store_true",
+        help="Exit with a status code of 0 even if errors are reported.",
+    )
+    parser.add_argument(
+        "--chunk-bytes",
+        type=int,
+        default=DEFAULT_CHUNK_BYTES,
+        help=(
+            "Approximate total size of the source files sent to a worker as a single task. "
+            "(Default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--split-bytes",
+        type=int,
+        default=DEFAULT_SPLIT_BYTES,
+        help=(
+            "Check files of at least this size in parallel chunks, split at top-level statements. "
+            "Not used with --pipeline or --cost-file; 0 disables splitting. (Default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--cost-file",
+        default=None,
+        help=(
+            "Cost database used to schedule the longest files first & to choose the number of "
+            "jobs, updated with the time taken to check each file."
+        ),
+    )
+    parser.add_argument(
+        "--pipeline",
+        default=False,
+        action="store_true",
+        help=(
+            "Read files on a pool of threads & stream them through the worker processes, "
+            "reporting results as they're available."
+        ),
+    )
+    parser.add_argument(
+        "--read-threads",
+        type=int,
+        default=4,
+        help="Number of threads reading files, with --pipeline. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=None,
+        help=(
+            "Maximum number of files in flight, with --pipeline. "
+            f"(Default: {QUEUE_SIZE_PER_JOB} per job)"
+        ),
+    )
+    parser.add_argument(
+        "--executor",
+        choices=("process", "thread", "interpreter"),
+        default="process",
+        help=(
+            "Run checks on a pool of worker processes, on a pool of threads, which only check in "
+            "parallel on free-threaded builds of CPython, or on a pool of subinterpreters, on "
+            "Python 3.14+. (Default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--max-worker-files",
+        type=int,
+        default=None,
+        help="Replace each worker process once it has checked this many files.",
+    )
+    parser.add_argument(
+        "--max-worker-bytes",
+        type=int,
+        default=None,
+        help="Replace each worker process once it has checked this many bytes of source.",
+    )
+    parser.add_argument(
+        "--max-worker-rss",
+        type=int,
+        default=None,
+        help=(
+            "Soft limit on the resident memory of each worker process, in MiB. Workers over the "
+            "limit are restarted & their in-flight files are retried on a fresh worker."
+        ),
+    )
+    parser.add_argument(
+        "--benchmark",
+        default=False,
+        action="store_true",
+        help="Print benchmark information after the run.",
+    )
+
+    return parser
+
+
+def iter_paths(
+    options: argparse.Namespace, filename_patterns: t.Optional[t.Sequence[str]] = None
+) -> t.Iterator[str]:
+    """
+    Lazily expand the paths to check into files to check, mirroring flake8's file discovery.
+
+    Paths are expanded in sorted order, so files are yielded in path order unless the provided paths
+    overlap. The paths listed by `--files-from` are then expanded in the order they're listed, as
+    they're read.
+
+    Directories are walked for files matching the provided filename patterns, if any, otherwise
+    those of `--filename`.
+    """
+    exclude = [*options.exclude, *options.extend_exclude]
+    if filename_patterns is None:
+        filename_patterns = options.filename
+
+    discover: t.Callable[[t.Iterable[str]], t.Iterator[str]]
+    if options.gitignore or options.follow_symlinks:
+        discover = SourceWalker(
+            exclude, filename_patterns, options.gitignore, options.follow_symlinks
+        ).walk
+    else:
+        discover = partial(iter_source_files, exclude=exclude, filename_patterns=filename_patterns)
+
+    for path in sorted(options.paths, key=lambda path: f"{path}/" if os.path.isdir(path) else path):
+        if path == "-":
+            # Like flake8, stdin can only be excluded using a custom display name
+            display_name = options.stdin_display_name
+            if display_name == "stdin" or not is_excluded(display_name, exclude):
+                yield path
+        else:
+            yield from discover([path])
+
+    if options.files_from is not None:
+        yield from discover(iter_files_from(options))
+
+
+def iter_files_from(options: argparse.Namespace) -> t.Iterator[str]:
+    """Lazily read the paths listed by `--files-from`, where a path of `-` is read from stdin."""
+    if options.files_from == "-":
+        yield from iter_path_list(sys.stdin.buffer, options.null)
+        return
+
+    with open(options.files_from, "rb") as f:
+        yield from iter_path_list(f, options.null)
+
+
+def run_archive_checks(
+    archives: t.Sequence[str],
+    options: argparse.Namespace,
+    jobs: int = 1,
+    stats: t.Optional[RunStats] = None,
+) -> t.List[FILE_RESULTS]:
+    """
+    Check the Python sources inside the provided archives, returning `(path, results)` tuples.
+
+    Each archive is read & checked by a single worker (see: `check_archive`), so archives are
+    checked in parallel on a pool of `jobs` worker processes, falling back to checking serially if
+    the pool can't be created. Results are sorted by path, where sources are reported as
+    `<archive>!<member>`. If provided, the stats of every worker's checks are added to `stats`.
+    """
+    archive_results: t.Optional[t.List[ARCHIVE_RESULTS]] = None
+    if jobs > 1:
+        executor = try_create_worker_pool(options, jobs)
+        if executor is not None:
+            with executor:
+                archive_results = list(executor.map(check_archive, archives))
+
+    if archive_results is None:
+        init_worker(options)
+        archive_results = [check_archive(archive) for archive in archives]
+
+    if stats is not None:
+        for _, batch in archive_results:
+            if batch.stats is not None:
+                stats.merge(batch.stats)
+
+    file_results = [
+        (path, results)
+        for paths, batch in archive_results
+        for path, results in zip(paths, batch, strict=True)
+    ]
+    return sorted(file_results, key=operator.itemgetter(0))
+
+
+def uses_git_objects(options: argparse.Namespace) -> bool:
+    """Determine whether files are read from git objects rather than the filesystem."""
+    return options.git_rev is not None or options.git_index or options.git_range is not None
+
+
+def iter_git_blobs(options: argparse.Namespace) -> t.Iterator[Blob]:
+    """
+    List the git blobs to check for `--git-rev`, `--git-index` or `--git-range`.
+
+    Paths are passed to git as pathspecs, and the listed files are filtered in the same manner as
+    flake8's file discovery (see: `BlobFilter`).
+
+    NOTE: `subprocess.CalledProcessError` is raised immediately if git can't list the files.
+    """
+    if options.git_rev is not None:
+        entries = revision_blobs(options.git_rev, options.paths)
+    elif options.git_range is not None:
+        entries = range_blobs(options.git_range, options.paths)
+    else:
+        entries = index_blobs(options.paths)
+
+    exclude = [*options.exclude, *options.extend_exclude]
+    return BlobFilter(exclude, options.filename, options.paths)(entries)
+
+
+def run_git_checks(
+    blobs: t.Iterable[Blob],
+    options: argparse.Namespace,
+    jobs: int,
+    stats: t.Optional[RunStats] = None,
+) -> t.Iterator[FILE_RESULTS]:
+    """
+    Check the provided git blobs, yielding their `(path, results)` tuples in the same order.
+
+    Blobs are streamed from a single `git cat-file --batch` process through the check pipeline
+    (see: `CheckPipeline.run_sources`), so nothing is written to disk. Each blob's contents are
+    identified by its object name, so they're never hashed. If provided, the stats of every
+    worker's checks are added to `stats` once every blob has been checked.
+    """
+    pipeline = CheckPipeline(
+        options, jobs, queue_size=options.queue_size, chunk_bytes=options.chunk_bytes
+    )
+    with CatFile() as cat_file:
+        sources = ((blob.path, data, blob.digest) for blob, data in cat_file.iter_contents(blobs))
+        yield from pipeline.run_sources(sources)
+
+    if stats is not None:
+        stats.merge(pipeline.stats)
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    """Check the provided paths for missing annotations, reporting errors in flake8's format."""
+    parser = build_runner_parser()
+    options = parse_args_with_config(parser, argv, config_names=("jobs",))
+    if options.jobs != "auto" and not options.jobs.isdigit():
+        parser.error(f"'{options.jobs}' is not a valid value for --jobs")
+    if options.files_from == "-" and "-" in options.paths:
+        parser.error("stdin can't be both checked & used for --files-from")
+    if uses_git_objects(options) and (options.files_from is not None or "-" in options.paths):
+        parser.error("git objects can't be checked along with --files-from or stdin")
+    if options.archives and (uses_git_objects(options) or "-" in options.paths):
+        parser.error("archives can't be checked along with git objects or stdin")
+    if not options.paths and options.files_from is None:
+        options.paths = ["."]
+
+    start = time.perf_counter()
+    file_results: t.Iterable[FILE_RESULTS]
+    report: t.Optional[ScheduleReport] = None
+    stats = RunStats()
+    if uses_git_objects(options):
+        try:
+            blobs = iter_git_blobs(options)
+        except (subprocess.CalledProcessError, ValueError) as e:
+            stderr = getattr(e, "stderr", None)
+            parser.error(os.fsdecode(stderr).strip() if stderr else str(e))
+
+        file_results = run_git_checks(blobs, options, requested_jobs(options.jobs), stats)
+    elif options.archives:
+        archives = list(iter_paths(options, ARCHIVE_PATTERNS))
+        file_results = run_archive_checks(
+            archives, options, job_count(options.jobs, archives), stats
+        )
+    elif options.pipeline:
+        jobs = 1 if "-" in options.paths else requested_jobs(options.jobs)
+        pipeline = CheckPipeline(
+            options, jobs, options.read_threads, options.queue_size, options.chunk_bytes
+        )
+        stats = pipeline.stats
+        file_results = pipeline.run(iter_paths(options))
+    elif options.files_from is not None and options.cost_file is None:
+        # Listed files are dispatched as they're read, rather than once the whole list is read
+        jobs = 1 if "-" in options.paths else requested_jobs(options.jobs)
+        file_results = run_checks(iter_paths(options), options, jobs, options.chunk_bytes, stats)
+    else:
+        paths = list(iter_paths(options))
+        if options.cost_file is not None and "-" not in paths:
+            jobs = job_count(options.jobs, paths)
+            cost_model = CostModel.load(options.cost_file)
+            file_results, report = run_scheduled(
+                paths, options, jobs, cost_model, auto_jobs=options.jobs == "auto", stats=stats
+            )
+            cost_model.save(options.cost_file)
+        else:
+            jobs = job_count(options.jobs, paths, options.split_bytes)
+            file_results = run_checks(paths, options, jobs, options.chunk_bytes, stats)
+
+    n_files = n_reported = 0
+    for path, results in file_results:
+        for result in results:
+            print(format_result(path, result))
+
+        n_files += 1
+        n_reported += len(results)
+
+    if options.benchmark:
+        elapsed = time.perf_counter() - start
+        print(f"{elapsed:<12.3g} seconds elapsed")
+        print(f"{n_files:<12} total files processed")
+        print(f"{n_files / elapsed if elapsed else 0:<12.0f} files processed per second")
+        print(stats.describe())
+        if report is not None:
+            print(report.describe())
+
+    return 1 if n_reported and not options.exit_zero else 0
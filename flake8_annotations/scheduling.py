@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import heapq
+import json
+import typing as t
+from dataclasses import dataclass, field
+from pathlib import Path
+
+_T = t.TypeVar("_T")
+
+# Nominal size added to each file when packing work units, accounting for the fixed per-file cost of
+# checking a file regardless of its size
+FILE_OVERHEAD_BYTES = 512
+
+DEFAULT_CHUNK_BYTES = 256 * 1024
+
+
+def pack_work_units(
+    items: t.Iterable[_T], size: t.Callable[[_T], int], chunk_bytes: int = DEFAULT_CHUNK_BYTES
+) -> t.Iterator[t.List[_T]]:
+    """
+    Lazily pack the provided items into contiguous work units of roughly `chunk_bytes` in total.
+
+    Each item counts as its size plus `FILE_OVERHEAD_BYTES`, so units of tiny or empty files are
+    still bounded. A unit is closed as soon as it reaches `chunk_bytes`, so items larger than
+    `chunk_bytes` get a unit to themselves; a `chunk_bytes` of `0` gives each item its own unit.
+    """
+    unit: t.List[_T] = []
+    unit_bytes = 0
+    for item in items:
+        unit.append(item)
+        unit_bytes += size(item) + FILE_OVERHEAD_BYTES
+        if unit_bytes >= chunk_bytes:
+            yield unit
+            unit, unit_bytes = [], 0
+
+    if unit:
+        yield unit
+
+
+# Fallback cost estimates for files the cost model hasn't seen, used until the model has recorded
+# enough bytes to fit its own rate
+FILE_OVERHEAD_SECONDS = 50e-6
+DEFAULT_SECONDS_PER_BYTE = 0.2e-6
+MIN_FITTED_BYTES = 1024 * 1024
+
+# Work units are sized so that each worker receives several units, for load balancing, but each
+# unit is large enough to amortize its IPC & scheduling cost
+UNITS_PER_WORKER = 4
+MIN_UNIT_SECONDS = 0.01
+
+# Approximate cost of starting each additional worker process
+WORKER_STARTUP_SECONDS = 0.02
+
+COST_MODEL_VERSION = 1
+
+
+@dataclass(slots=True)
+class CostModel:
+    """
+    Predict the time taken to check each file, based on the times recorded by previous runs.
+
+    Files are keyed by path & recorded along with their size, so the recorded time is scaled if the
+    file's size has changed since it was recorded. Files that haven't been recorded are estimated
+    from their size, using the rate fitted over all recorded files.
+    """
+
+    files: t.Dict[str, t.Tuple[int, float]] = field(default_factory=dict)
+    seconds_per_byte: float = DEFAULT_SECONDS_PER_BYTE
+
+    def __post_init__(self) -> None:
+        self.fit()
+
+    def fit(self) -> None:
+        """Fit the per-byte rate used to estimate unseen files to the recorded files."""
+        total_bytes = sum(size for size, _ in self.files.values())
+        if total_bytes < MIN_FITTED_BYTES:
+            self.seconds_per_byte = DEFAULT_SECONDS_PER_BYTE
+            return
+
+        total_seconds = sum(seconds for _, seconds in self.files.values())
+        variable_seconds = total_seconds - FILE_OVERHEAD_SECONDS * len(self.files)
+        self.seconds_per_byte = max(variable_seconds, 0) / total_bytes or DEFAULT_SECONDS_PER_BYTE
+
+    def predict(self, path: str, size: int) -> float:
+        """Predict the time taken to check the provided file, in seconds."""
+        recorded = self.files.get(path)
+        if recorded is not None:
+            recorded_size, seconds = recorded
+            if recorded_size == size:
+                return seconds
+            elif recorded_size > 0:
+                return seconds * size / recorded_size
+
+        return FILE_OVERHEAD_SECONDS + size * self.seconds_per_byte
+
+    def record(self, path: str, size: int, seconds: float) -> None:
+        """Record the time taken to check the provided file."""
+        self.files[path] = (size, seconds)
+
+    @classmethod
+    def load(cls, cost_file: t.Union[str, Path]) -> CostModel:
+        """Load a previously saved cost model, or an empty model if it can't be loaded."""
+        try:
+            with open(cost_file, encoding="utf-8") as f:
+                serialized = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+
+        if serialized.get("version") != COST_MODEL_VERSION:
+            return cls()
+
+        return cls({path: (size, seconds) for path, (size, seconds) in serialized["files"].items()})
+
+    def save(self, cost_file: t.Union[str, Path]) -> None:
+        """Save the cost model for use by subsequent runs."""
+        serialized = {"version": COST_MODEL_VERSION, "files": self.files}
+        with open(cost_file, "w", encoding="utf-8") as f:
+            json.dump(serialized, f, separators=(",", ":"))
+
+
+def lpt_order(costs: t.Sequence[float]) -> t.List[int]:
+    """Order the indices of the provided costs by decreasing cost, for LPT scheduling."""
+    return sorted(range(len(costs)), key=lambda idx: costs[idx], reverse=True)
+
+
+def pack_by_cost(costs: t.Sequence[float], target_seconds: float) -> t.List[t.List[int]]:
+    """
+    Pack item indices into work units of roughly `target_seconds` of predicted cost, in LPT order.
+
+    Items are taken in decreasing order of cost, so the most expensive items are scheduled first &
+    items costing more than the target get a unit to themselves.
+    """
+    units = []
+    unit: t.List[int] = []
+    unit_cost = 0.0
+    for idx in lpt_order(costs):
+        unit.append(idx)
+        unit_cost += costs[idx]
+        if unit_cost >= target_seconds:
+            units.append(unit)
+            unit, unit_cost = [], 0.0
+
+    if unit:
+        units.append(unit)
+
+    return units
+
+
+def unit_target_seconds(total_seconds: float, workers: int) -> float:
+    """Determine the target cost of each work unit for the provided total cost & worker count."""
+    return max(MIN_UNIT_SECONDS, total_seconds / (workers * UNITS_PER_WORKER))
+
+
+def lpt_makespan(unit_costs: t.Sequence[float], workers: int) -> float:
+    """
+    Predict the makespan of the provided work units, scheduled in order onto `workers` workers.
+
+    Each unit is assigned to the first worker to become free, as done by a process pool, so for
+    units in decreasing order of cost this is the makespan of LPT scheduling.
+    """
+    finish_times = [0.0] * max(1, min(workers, len(unit_costs)))
+    for cost in unit_costs:
+        heapq.heappush(finish_times, heapq.heappop(finish_times) + cost)
+
+    return max(finish_times)
+
+
+def choose_workers(unit_costs: t.Sequence[float], max_workers: int) -> int:
+    """
+    Choose the number of workers minimizing the predicted makespan, including worker startup.
+
+    Small runs don't benefit from a large pool, since starting each worker costs more than the work
+    it would take on; a single worker means the files are checked serially, without a pool.
+    """
+    best_workers, best_makespan = 1, sum(unit_costs)
+    for workers in range(2, max(1, min(max_workers, len(unit_costs))) + 1):
+        makespan = lpt_makespan(unit_costs, workers) + workers * WORKER_STARTUP_SECONDS
+        if makespan < best_makespan:
+            best_workers, best_makespan = workers, makespan
+
+    return best_workers
@@ -0,0 +1,611 @@
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import re
+import tokenize
+import typing as t
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from flake8.defaults import EXCLUDE
+
+from flake8_annotations.checker import (
+    CheckerConfig,
+    TypeHintChecker,
+    baseline_fingerprint,
+    normalize_path,
+)
+from flake8_annotations.enums import SkipReason
+
+if t.TYPE_CHECKING:
+    from flake8_annotations.split import FileSplitter
+    from flake8_annotations.style_guide import StyleGuide
+
+# Checker results with the checker type dropped, as yielded to flake8:
+#   (line number, column number, message)
+RESULT = t.Tuple[int, int, str]
+
+# Size of each read of a streamed file list; reads return as soon as any data is available
+PATH_LIST_READ_BYTES = 64 * 1024
+
+# Inclusive, 1-indexed line ranges
+LINE_RANGES = t.Tuple[t.Tuple[int, int], ...]
+
+# Checker results paired with their path independent error key, used for baseline fingerprints
+ANALYSIS = t.List[t.Tuple[RESULT, str]]
+
+# Version of the format saved by `CountsCache`
+COUNTS_CACHE_VERSION = 1
+
+
+def decode_source(data: bytes) -> t.List[str]:
+    """
+    Decode raw source bytes into a list of lines, matching flake8's handling of source files.
+
+    The encoding is detected using `tokenize.detect_encoding`, falling back to `latin-1` if the
+    encoding can't be detected or if the detected encoding is incorrect. Newlines are normalized
+    and a leading UTF-8 BOM is stripped.
+    """
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+        text = data.decode(encoding)
+    except (SyntaxError, UnicodeError, LookupError):
+        text = data.decode("latin-1")
+
+    lines = split_lines(text)
+    if lines and lines[0][:1] == "\ufeff":
+        lines[0] = lines[0][1:]
+
+    return lines
+
+
+def split_lines(text: str) -> t.List[str]:
+    """Split the provided source text into lines, normalizing newlines like flake8."""
+    return io.StringIO(text, newline=None).readlines()
+
+
+# Line endings recognized when splitting source into lines (see: `split_lines`)
+_NEWLINE = re.compile(rb"\r\n?|\n")
+
+# Every `noqa` comment contains this, ignoring case; none of its letters have special case folds, so
+# the search is exact for ASCII compatible encodings
+_NOQA = re.compile(rb"noqa", re.IGNORECASE)
+
+
+class SourceLines(t.Sequence[str]):
+    """
+    Lines of raw source bytes, decoded on access.
+
+    Only a table of the offset of each line is kept, built when a line other than the first is
+    first accessed, so neither a list of lines nor a decoded copy of the source is made. Each line
+    is decoded on access, matching `decode_source`: newlines are normalized & a leading UTF-8 BOM
+    is stripped.
+
+    NOTE: The source is assumed to be valid in the provided encoding, e.g. because it was parsed
+    successfully.
+    """
+
+    __slots__ = ("data", "encoding", "_offsets")
+
+    def __init__(self, data: bytes, encoding: str):
+        self.data = data
+        self.encoding = encoding
+        self._offsets: t.Optional[array] = None
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> SourceLines:
+        """Wrap the provided source bytes, detecting their encoding like `decode_source`."""
+        try:
+            encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+        except SyntaxError:
+            encoding = "latin-1"
+
+        return cls(data, encoding)
+
+    def _line_offsets(self) -> array:
+        if self._offsets is None:
+            offsets = array("Q", [0])
+            offsets.extend(match.end() for match in _NEWLINE.finditer(self.data))
+            if offsets[-1] == len(self.data):
+                # The source is empty or ends with a newline, so there's no partial last line
+                offsets.pop()
+
+            self._offsets = offsets
+
+        return self._offsets
+
+    def _decode(self, start: int, stop: int, first: bool) -> str:
+        # Only the first line may start with a BOM, which `utf-8-sig` strips
+        encoding = self.encoding if first or self.encoding != "utf-8-sig" else "utf-8"
+        line = self.data[start:stop].decode(encoding)
+        if line.endswith("\r\n"):
+            return f"{line[:-2]}\n"
+        elif line.endswith("\r"):
+            return f"{line[:-1]}\n"
+
+        return line
+
+    def __len__(self) -> int:
+        return len(self._line_offsets())
+
+    def __bool__(self) -> bool:
+        # Any source has at least one line, so the offsets needn't be built to check for one
+        return bool(self.data)
+
+    @t.overload
+    def __getitem__(self, idx: int) -> str: ...
+
+    @t.overload
+    def __getitem__(self, idx: slice) -> t.List[str]: ...
+
+    def __getitem__(self, idx: t.Union[int, slice]) -> t.Union[str, t.List[str]]:
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+
+        if idx == 0 and self._offsets is None and self.data:
+            # The first line is often all that's needed, e.g. for module-level ignores
+            match = _NEWLINE.search(self.data)
+            return self._decode(0, match.end() if match else len(self.data), True)
+
+        offsets = self._line_offsets()
+        if idx < 0:
+            idx += len(offsets)
+        if not 0 <= idx < len(offsets):
+            raise IndexError("line index out of range")
+
+        stop = offsets[idx + 1] if idx + 1 < len(offsets) else len(self.data)
+        return self._decode(offsets[idx], stop, idx == 0)
+
+    def may_have_noqa(self) -> bool:
+        """Determine whether the source may contain a `noqa` comment, without decoding it."""
+        # `utf-8-sig` prefixes a BOM
+        if not "noqa".encode(self.encoding, errors="replace").endswith(b"noqa"):
+            return True
+
+        return _NOQA.search(self.data) is not None
+
+
+def is_excluded(path: str, exclude: t.Sequence[str]) -> bool:
+    """Determine whether the path's basename or absolute path match any of the exclude patterns."""
+    basename = os.path.basename(path)
+    if basename not in {".", ".."} and any(
+        fnmatch.fnmatch(basename, pattern) for pattern in exclude
+    ):
+        return True
+
+    absolute_path = os.path.abspath(path)
+    return any(fnmatch.fnmatch(absolute_path, pattern) for pattern in exclude)
+
+
+def iter_source_files(
+    paths: t.Iterable[str],
+    exclude: t.Sequence[str] = EXCLUDE,
+    filename_patterns: t.Sequence[str] = ("*.py",),
+) -> t.Iterator[str]:
+    """
+    Yield the source files to check for the provided paths, mirroring flake8's file discovery.
+
+    Files passed explicitly are always yielded unless excluded; directories are walked for files
+    whose path matches any of the filename patterns. Excluded directories are not descended into &,
+    like `os.walk`, symlinked directories aren't followed.
+
+    Files are yielded lazily, in sorted order for each directory path, so results can be reported in
+    path order as files are checked.
+    """
+    for path in paths:
+        if is_excluded(path, exclude):
+            continue
+
+        if not os.path.isdir(path):
+            yield path
+            continue
+
+        yield from _walk_sorted(path, exclude, filename_patterns)
+
+
+def iter_path_list(stream: t.BinaryIO, null: t.Optional[bool] = None) -> t.Iterator[str]:
+    """
+    Lazily yield the paths of a NUL or newline separated file list, as they're read from the stream.
+
+    Paths are yielded as soon as they're complete, without waiting for the end of the list, so
+    checks can start while a long list is still being produced (e.g. by `git ls-files -z`). If
+    `null` isn't provided, the separator is whichever of a NUL or a newline is found first. Empty
+    entries are skipped; for newline separated lists, a trailing carriage return is stripped.
+
+    Paths are decoded with the filesystem encoding, in the same manner as `os.fsdecode`.
+    """
+    read = getattr(stream, "read1", None) or stream.read
+    separator = None if null is None else (b"\0" if null else b"\n")
+    pending = b""
+    while chunk := read(PATH_LIST_READ_BYTES):
+        pending += chunk
+        if separator is None:
+            nul, newline = pending.find(b"\0"), pending.find(b"\n")
+            if nul == newline == -1:
+                continue
+
+            separator = b"\0" if newline == -1 or -1 < nul < newline else b"\n"
+
+        *entries, pending = pending.split(separator)
+        yield from _decode_path_list(entries, separator)
+
+    yield from _decode_path_list([pending], separator or b"\n")
+
+
+def _decode_path_list(entries: t.List[bytes], separator: bytes) -> t.Iterator[str]:
+    for entry in entries:
+        if separator == b"\n":
+            entry = entry.removesuffix(b"\r")
+
+        if entry:
+            yield os.fsdecode(entry)
+
+
+def _walk_sorted(
+    root: str, exclude: t.Sequence[str], filename_patterns: t.Sequence[str]
+) -> t.Iterator[str]:
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+
+    # Sort subdirectories by their path prefix, so files are yielded in sorted path order
+    children = []
+    for entry in entries:
+        is_dir = entry.is_dir()
+        children.append((f"{entry.name}/" if is_dir else entry.name, entry, is_dir))
+
+    for _, entry, is_dir in sorted(children, key=lambda child: child[0]):
+        filepath = os.path.join(root, entry.name)
+        if is_excluded(filepath, exclude):
+            continue
+
+        if is_dir:
+            if not entry.is_symlink():
+                yield from _walk_sorted(filepath, exclude, filename_patterns)
+        elif not filename_patterns or any(
+            fnmatch.fnmatch(filepath, pattern) for pattern in filename_patterns
+        ):
+            yield filepath
+
+
+def read_source(path: t.Union[str, Path]) -> bytes:
+    """Read the raw contents of the provided source file."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def content_digest(data: bytes) -> str:
+    """Calculate the digest used to identify the provided source contents."""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def analyze_lines(
+    lines: t.List[str],
+    line_ranges: t.Optional[t.Sequence[t.Tuple[int, int]]] = None,
+    error_keys: bool = False,
+    config: t.Optional[CheckerConfig] = None,
+) -> ANALYSIS:
+    """
+    Run `TypeHintChecker` against the provided source lines.
+
+    The checker uses the provided configuration, if any, otherwise the currently parsed options.
+
+    If line ranges are provided, only errors for functions whose definitions overlap at least one of
+    the (1-indexed, inclusive) ranges are reported.
+
+    The analysis is independent of the file's path, so the baseline isn't applied. If `error_keys`
+    is `True`, each result is paired with its path independent error key (see:
+    `TypeHintChecker.error_key`), otherwise an empty key is used.
+
+    Source that can't be parsed is reported as a single `E999` result, in the same manner as
+    flake8, unless it's skipped by triage (see: `TypeHintChecker.triage`).
+    """
+    try:
+        checker_instance = TypeHintChecker(None, lines, config=config)
+    except SyntaxError as e:
+        # Mirror flake8's extraction of the error location from the exception
+        row, column = (e.lineno, e.offset) if e.lineno is not None else (1, 0)
+        return [((row, column or 0, f"E999 {type(e).__name__}: {e.args[0]}"), "")]
+
+    return _analyze(checker_instance, line_ranges, error_keys, config)
+
+
+def analyze_source(
+    data: bytes,
+    line_ranges: t.Optional[t.Sequence[t.Tuple[int, int]]] = None,
+    error_keys: bool = False,
+    config: t.Optional[CheckerConfig] = None,
+) -> t.Tuple[ANALYSIS, t.Sequence[str]]:
+    """
+    Run `TypeHintChecker` against the provided raw source bytes, as done by `analyze_lines`.
+
+    The bytes are parsed directly, so no list of lines & no decoded copy of the source are made; the
+    few lines the checker needs are decoded on access (see: `SourceLines`). Source that can't be
+    parsed as is, e.g. invalid in its declared encoding, is decoded & analyzed by `analyze_lines`,
+    so the results are identical.
+
+    The analysis is returned along with the source's lines, for filtering by a style guide.
+    """
+    lines: t.Sequence[str] = SourceLines.from_bytes(data)
+    try:
+        checker_instance = TypeHintChecker(None, lines, source=data, config=config)
+    except (SyntaxError, ValueError):
+        lines = decode_source(data)
+        return analyze_lines(lines, line_ranges, error_keys, config), lines
+
+    return _analyze(checker_instance, line_ranges, error_keys, config), lines
+
+
+def _analyze(
+    checker_instance: TypeHintChecker,
+    line_ranges: t.Optional[t.Sequence[t.Tuple[int, int]]],
+    error_keys: bool,
+    config: t.Optional[CheckerConfig],
+) -> ANALYSIS:
+    checker_instance.line_ranges = line_ranges
+    if config is not None:
+        checker_instance.config = config
+
+    analysis = []
+    for function, error in checker_instance.iter_errors():
+        lineno, col_offset, message, _ = error.to_flake8()
+        key = checker_instance.error_key(function, error) if error_keys else ""
+        analysis.append(((lineno, col_offset, message), key))
+
+    return analysis
+
+
+def apply_baseline(
+    analysis: ANALYSIS, filename: str, baseline: t.Optional[t.AbstractSet[str]] = None
+) -> t.List[RESULT]:
+    """
+    Drop the analyzed results whose fingerprint, for the provided path, is in the baseline.
+
+    If no baseline is provided, the baseline of the currently parsed options is used.
+    """
+    if baseline is None:
+        baseline = TypeHintChecker.default_config.baseline
+
+    if not baseline:
+        return [result for result, _ in analysis]
+
+    normalized_path = normalize_path(filename)
+    return [
+        result
+        for result, key in analysis
+        if not (key and baseline_fingerprint(normalized_path, key) in baseline)
+    ]
+
+
+def check_lines(
+    lines: t.List[str],
+    line_ranges: t.Optional[t.Sequence[t.Tuple[int, int]]] = None,
+    filename: str = "stdin",
+    config: t.Optional[CheckerConfig] = None,
+) -> t.List[RESULT]:
+    """Check the provided source lines, as done by `analyze_lines`, & apply the baseline."""
+    if config is None:
+        config = TypeHintChecker.default_config
+
+    analysis = analyze_lines(lines, line_ranges, bool(config.baseline), config)
+    return apply_baseline(analysis, filename, config.baseline)
+
+
+@dataclass(slots=True)
+class RunStats:
+    """Keep track of the work avoided by triage & by deduplicating identical file contents."""
+
+    files_checked: int = 0
+    files_analyzed: int = 0
+    bytes_checked: int = 0
+    bytes_analyzed: int = 0
+    bytes_skipped: int = 0
+
+    # Number of files skipped by triage, by reason
+    files_skipped: t.Counter[SkipReason] = field(default_factory=Counter)
+
+    @property
+    def files_deduplicated(self) -> int:
+        """Number of checked files whose contents were already analyzed."""
+        return self.files_checked - self.files_analyzed - sum(self.files_skipped.values())
+
+    def merge(self, other: RunStats) -> None:
+        """Add the provided stats, e.g. of another worker's checks, to these stats."""
+        self.files_checked += other.files_checked
+        self.files_analyzed += other.files_analyzed
+        self.bytes_checked += other.bytes_checked
+        self.bytes_analyzed += other.bytes_analyzed
+        self.bytes_skipped += other.bytes_skipped
+        self.files_skipped.update(other.files_skipped)
+
+    def describe(self) -> str:
+        """Describe the work avoided by triage & deduplication."""
+        bytes_deduplicated = self.bytes_checked - self.bytes_analyzed - self.bytes_skipped
+        description = (
+            f"{self.files_checked} files checked, {self.files_analyzed} distinct contents "
+            f"analyzed; deduplication skipped {self.files_deduplicated} files "
+            f"({bytes_deduplicated} bytes)"
+        )
+        if self.files_skipped:
+            reasons = " ".join(
+                f"{reason.name.lower()}={count}" for reason, count in self.files_skipped.items()
+            )
+            description += (
+                f"; triage skipped {sum(self.files_skipped.values())} files "
+                f"({self.bytes_skipped} bytes; {reasons})"
+            )
+
+        return description
+
+
+class SourceChecker:
+    """
+    Check source files within a run, analyzing each distinct file content only once.
+
+    Files are identified by a digest of their contents, which is computed before any parsing. Since
+    the analysis (including filtering by the optional style guide) only depends on the file's
+    contents, it's reused for every path sharing the same contents; only the baseline, which depends
+    on the file's path, is applied per path.
+
+    Files are checked using the provided checker configuration, if any, otherwise the currently
+    parsed options. If a splitter is provided, files large enough to be split are analyzed in
+    parallel chunks (see: `FileSplitter`).
+
+    NOTE: Source checkers aren't thread safe; concurrent checks should use a checker per thread,
+    which may share the same (immutable) configuration.
+    """
+
+    def __init__(
+        self,
+        style_guide: t.Optional[StyleGuide] = None,
+        error_keys: t.Optional[bool] = None,
+        config: t.Optional[CheckerConfig] = None,
+        splitter: t.Optional[FileSplitter] = None,
+    ):
+        self.style_guide = style_guide
+        self.splitter = splitter
+        self.config = TypeHintChecker.default_config if config is None else config
+        self.error_keys = bool(self.config.baseline) if error_keys is None else error_keys
+        self.stats = RunStats()
+
+        # Sources without function definitions can only report a syntax error
+        self.reports_syntax_errors = style_guide is None or style_guide.is_selected("E999")
+        self._analyses: t.Dict[t.Tuple[str, t.Optional[LINE_RANGES]], ANALYSIS] = {}
+
+    def analyze(
+        self,
+        data: bytes,
+        line_ranges: t.Optional[t.Sequence[t.Tuple[int, int]]] = None,
+        digest: t.Optional[str] = None,
+    ) -> ANALYSIS:
+        """
+        Analyze the provided source contents, reusing the analysis of identical contents.
+
+        Contents skipped by triage (see: `TypeHintChecker.triage`) are neither hashed nor parsed.
+        Contents without function definitions are only skipped if syntax errors (`E999`) aren't
+        reported, otherwise they're parsed, but not checked, to find them.
+        """
+        self.stats.files_checked += 1
+        self.stats.bytes_checked += len(data)
+        skip_reason = TypeHintChecker.triage(data, self.config)
+        if skip_reason == SkipReason.NO_FUNCTIONS and self.reports_syntax_errors:
+            # The source must still be parsed, in case it can't be
+            skip_reason = None
+
+        if skip_reason is not None:
+            self.stats.files_skipped[skip_reason] += 1
+            self.stats.bytes_skipped += len(data)
+            return []
+
+        if digest is None:
+            digest = content_digest(data)
+
+        cache_key = (digest, tuple(line_ranges) if line_ranges is not None else None)
+        analysis = self._analyses.get(cache_key)
+        if analysis is None:
+            self.stats.files_analyzed += 1
+            self.stats.bytes_analyzed += len(data)
+
+            lines: t.Sequence[str]
+            if self.splitter is not None and self.splitter.should_split(len(data)):
+                lines = decode_source(data)
+                analysis = self.splitter.analyze(lines, line_ranges, self.error_keys, self.config)
+            else:
+                analysis, lines = analyze_source(data, line_ranges, self.error_keys, self.config)
+
+            if self.style_guide is not None and analysis:
+                may_have_noqa = not isinstance(lines, SourceLines) or lines.may_have_noqa()
+                analysis = self.style_guide.filter_items(
+                    analysis, lines, key=lambda item: item[0], may_have_noqa=may_have_noqa
+                )
+
+            self._analyses[cache_key] = analysis
+
+        return analysis
+
+    def check(
+        self,
+        path: str,
+        data: bytes,
+        line_ranges: t.Optional[t.Sequence[t.Tuple[int, int]]] = None,
+        digest: t.Optional[str] = None,
+    ) -> t.List[RESULT]:
+        """
+        Check the provided source contents, reporting the results for the provided path.
+
+        NOTE: Analyses are shared by identical contents, so the per-file ignores of the path, if
+        any, are applied to its results rather than to the analysis (see: `StyleGuide.for_path`).
+        """
+        results = apply_baseline(
+            self.analyze(data, line_ranges, digest), path, self.config.baseline
+        )
+        if self.style_guide is None or not results:
+            return results
+
+        style_guide = self.style_guide.for_path(path)
+        if style_guide is self.style_guide:
+            return results
+
+        return [result for result in results if style_guide.is_selected(error_code(result))]
+
+    def retain(self, digests: t.Collection[str]) -> None:
+        """Drop the cached analyses of all contents other than those with the provided digests."""
+        self._analyses = {key: value for key, value in self._analyses.items() if key[0] in digests}
+
+
+def error_code(result: RESULT) -> str:
+    """Extract the error code from the provided result's message."""
+    return result[2].split(maxsplit=1)[0]
+
+
+@dataclass(slots=True)
+class CountsCache:
+    """
+    Persisted per-error code counts, keyed by an identifier of the contents they were counted for.
+
+    Counts are only valid for the checker options they were generated with, identified by the
+    fingerprint of the options (see: `options_fingerprint`).
+    """
+
+    fingerprint: str
+    counts: t.Dict[str, t.Dict[str, int]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, cache_file: t.Union[str, Path], fingerprint: str) -> CountsCache:
+        """
+        Load a previously saved cache, if one exists.
+
+        An empty cache is returned if the cache file is missing, unreadable, or was generated with
+        a different cache version or set of checker options.
+        """
+        try:
+            with open(cache_file, encoding="utf-8") as f:
+                serialized = json.load(f)
+        except (OSError, ValueError):
+            return cls(fingerprint)
+
+        if (
+            serialized.get("version") != COUNTS_CACHE_VERSION
+            or serialized.get("options") != fingerprint
+        ):
+            return cls(fingerprint)
+
+        return cls(fingerprint, serialized["counts"])
+
+    def save(self, cache_file: t.Union[str, Path]) -> None:
+        """Save the cache for reuse by subsequent runs."""
+        serialized = {
+            "version": COUNTS_CACHE_VERSION,
+            "options": self.fingerprint,
+            "counts": self.counts,
+        }
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump(serialized, f, separators=(",", ":"))
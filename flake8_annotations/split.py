@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import argparse
+import ast
+import itertools
+import re
+import time
+import tokenize
+import typing as t
+from concurrent.futures import Executor, Future
+
+from flake8_annotations.checker import CheckerConfig, TypeHintChecker
+from flake8_annotations.records import ResultRecords
+from flake8_annotations.source import ANALYSIS, SourceChecker, analyze_lines, read_source
+from flake8_annotations.style_guide import StyleGuide
+from flake8_annotations.worker import UNIT_RESULTS, read_error_results
+
+# Files at least this large are split into chunks checked in parallel
+DEFAULT_SPLIT_BYTES = 4 * 1024 * 1024
+
+# Chunks are sized so each worker receives a couple of chunks, but are never smaller than this
+MIN_CHUNK_BYTES = 256 * 1024
+CHUNKS_PER_JOB = 2
+
+# Clauses that continue a compound statement, rather than starting a new one, at column 0
+_CONTINUATION_CLAUSES = ("else", "elif", "except", "finally")
+
+
+class ChunkAnalysis(t.NamedTuple):
+    """Analysis of a chunk of a module, along with the state carried to the following chunk."""
+
+    analysis: ANALYSIS
+
+    # Name of the last overload-decorated function in the chunk, if any
+    last_overload_name: t.Optional[str]
+
+
+def is_statement_start(line: str) -> bool:
+    """Determine whether the provided line may start a top-level statement."""
+    if not line or line[0] in " \t\f\r\n#)]}":
+        return False
+
+    word = line.split(None, 1)[0].rstrip(":")
+    return word not in _CONTINUATION_CLAUSES
+
+
+def split_points(lines: t.Sequence[str], chunk_bytes: int) -> t.List[int]:
+    """
+    Choose the (0-indexed) lines at which to split the provided module into chunks.
+
+    Chunks are split at candidate top-level statement boundaries, found with a quick scan of the
+    start of each line, once they reach roughly `chunk_bytes` of source. Statements continued onto
+    lines starting at column 0, e.g. within brackets or strings, can't be told apart from a new
+    statement without tokenizing the entire module, so candidates are unverified; a chunk split at
+    a false boundary fails to parse, & is merged with the following chunk by `FileSplitter.analyze`.
+    """
+    points = []
+    size = 0
+    previous = ""
+    for idx, line in enumerate(lines):
+        if (
+            size >= chunk_bytes
+            and is_statement_start(line)
+            and not previous.startswith("@")
+            and not previous.rstrip().endswith("\\")
+        ):
+            points.append(idx)
+            size = 0
+
+        size += len(line)
+        if line.strip():
+            previous = line
+
+    return points
+
+
+def has_line_one_type_ignore(lines: t.Sequence[str]) -> bool:
+    """Determine whether the module's first line has a `type: ignore` comment, as found by `ast`."""
+    if not lines or "type" not in lines[0]:
+        return False
+
+    # Tokenizing is lazy, so only the tokens up to the end of the first line are generated
+    comments = []
+    try:
+        for token in tokenize.generate_tokens(iter(lines).__next__):
+            if token.start[0] > 1:
+                break
+            if token.type == tokenize.COMMENT:
+                comments.append(token.string)
+    except (tokenize.TokenError, SyntaxError, StopIteration):
+        pass
+
+    return any(ast.parse(comment, type_comments=True).type_ignores for comment in comments)
+
+
+def analyze_chunk(
+    start: int,
+    lines: t.List[str],
+    line_ranges: t.Optional[t.Sequence[t.Tuple[int, int]]],
+    error_keys: bool,
+    config: CheckerConfig,
+    has_module_level_ignore: bool,
+    last_overload_name: t.Optional[str] = None,
+) -> t.Optional[ChunkAnalysis]:
+    """
+    Analyze a chunk of a module, starting at the provided (0-indexed) line of the module.
+
+    The state carried between the chunks of a module, its module-level ignores & the name of the
+    last preceding overload-decorated function, is provided by the caller.
+
+    `None` is returned if the chunk can't be parsed.
+    """
+    # Pad the chunk so the reported line numbers match those of the module
+    padded = ["\n"] * start
+    padded.extend(lines)
+    try:
+        # The module as a whole has already been triaged; every chunk is parsed, so a false split
+        # boundary is always detected
+        checker_instance = TypeHintChecker(None, padded, config=config, triage=False)
+    except SyntaxError:
+        return None
+
+    checker_instance.line_ranges = line_ranges
+    checker_instance.config = config
+    checker_instance.has_module_level_ignore = has_module_level_ignore
+    checker_instance.last_overload_decorated_function_name = last_overload_name
+
+    analysis = []
+    for function, error in checker_instance.iter_errors():
+        lineno, col_offset, message, _ = error.to_flake8()
+        key = checker_instance.error_key(function, error) if error_keys else ""
+        analysis.append(((lineno, col_offset, message), key))
+
+    last_overload_name = checker_instance.last_overload_decorated_function_name
+    return ChunkAnalysis(analysis, last_overload_name)
+
+
+class FileSplitter:
+    """
+    Analyze large modules by splitting them into chunks analyzed in parallel on an executor.
+
+    Modules of at least `split_bytes` are split at top-level statement boundaries (see:
+    `split_points`) into chunks, which are parsed & walked in parallel. The analysis of each chunk
+    keeps the module's line numbers & the chunks' analyses are merged in order, so the result is
+    identical to analyzing the module as a whole:
+
+      * Module-level ignores, found on the module's first line, are applied to every chunk
+      * A series of overload-decorated functions may span chunks; each chunk is first analyzed
+        assuming no preceding overload-decorated function, then the chunks that define a function
+        of the same name as the last overload-decorated function of the preceding chunks are
+        re-analyzed with it
+      * If a chunk can't be parsed, e.g. because it was split at a false boundary, it's merged with
+        the following chunk & re-analyzed, discarding the following chunk's analysis. Chunks that
+        parse end at a true boundary, so each merged chunk starts at one. If the last chunk can't be
+        parsed, the module has a syntax error & is analyzed as a whole, so syntax errors are
+        reported exactly as before
+    """
+
+    def __init__(self, executor: Executor, jobs: int, split_bytes: int = DEFAULT_SPLIT_BYTES):
+        self.executor = executor
+        self.jobs = jobs
+        self.split_bytes = split_bytes
+
+    def should_split(self, n_bytes: int) -> bool:
+        """Determine whether a module of the provided size should be split."""
+        return self.split_bytes > 0 and n_bytes >= self.split_bytes
+
+    def analyze(
+        self,
+        lines: t.List[str],
+        line_ranges: t.Optional[t.Sequence[t.Tuple[int, int]]] = None,
+        error_keys: bool = False,
+        config: t.Optional[CheckerConfig] = None,
+    ) -> ANALYSIS:
+        """Analyze the provided module, as done by `analyze_lines`, in parallel chunks."""
+        if config is None:
+            config = TypeHintChecker.default_config
+
+        n_bytes = sum(map(len, lines))
+        chunk_bytes = max(MIN_CHUNK_BYTES, n_bytes // max(1, self.jobs * CHUNKS_PER_JOB))
+        bounds = [0, *split_points(lines, chunk_bytes), len(lines)]
+        if len(bounds) <= 2:
+            return analyze_lines(lines, line_ranges, error_keys, config)
+
+        has_module_level_ignore = has_line_one_type_ignore(lines) or (
+            "# mypy: ignore-errors" in lines[0]
+        )
+        chunks = list(itertools.pairwise(bounds))
+
+        def submit(start: int, stop: int, last_overload_name: t.Optional[str] = None) -> Future:
+            return self.executor.submit(
+                analyze_chunk,
+                start,
+                lines[start:stop],
+                line_ranges,
+                error_keys,
+                config,
+                has_module_level_ignore,
+                last_overload_name,
+            )
+
+        futures = [submit(start, stop) for start, stop in chunks]
+        analyses: t.List[t.Optional[ChunkAnalysis]] = [future.result() for future in futures]
+
+        # Merge each chunk that can't be parsed with the following chunk, until it can be
+        idx = 0
+        while idx < len(chunks):
+            if analyses[idx] is not None:
+                idx += 1
+                continue
+
+            if idx == len(chunks) - 1:
+                return analyze_lines(lines, line_ranges, error_keys, config)
+
+            start, stop = chunks[idx][0], chunks[idx + 1][1]
+            chunks[idx : idx + 2] = [(start, stop)]
+            analyses[idx : idx + 2] = [submit(start, stop).result()]
+
+        # Reconcile overload series spanning chunks, re-analyzing the affected chunks
+        reanalyze = {}
+        preceding_name: t.Optional[str] = None
+        for idx, ((start, stop), chunk) in enumerate(zip(chunks, analyses, strict=True)):
+            assert chunk is not None
+            if preceding_name is not None and _defines(lines[start:stop], preceding_name):
+                reanalyze[idx] = submit(start, stop, preceding_name)
+
+            preceding_name = chunk.last_overload_name or preceding_name
+
+        for idx, future in reanalyze.items():
+            analyses[idx] = future.result()
+
+        return [item for chunk in analyses if chunk is not None for item in chunk.analysis]
+
+
+def _defines(lines: t.List[str], name: str) -> bool:
+    """Determine whether the provided lines may define a function of the provided name."""
+    pattern = re.compile(rf"\bdef[\s\\]+{re.escape(name)}\b")
+    return any(name in line and pattern.search(line) for line in lines)
+
+
+def check_split_file(
+    path: str, options: argparse.Namespace, splitter: FileSplitter
+) -> UNIT_RESULTS:
+    """
+    Check the provided file in parallel chunks, as a work unit of its own.
+
+    The file is read & its chunks' analyses are merged in the calling process, while the chunks are
+    analyzed on the splitter's executor.
+    """
+    start = time.perf_counter()
+    style_guide = StyleGuide(options)
+    source_checker = SourceChecker(
+        style_guide, config=CheckerConfig.from_options(options), splitter=splitter
+    )
+    try:
+        results = source_checker.check(path, read_source(path))
+    except OSError as e:
+        results = read_error_results(e, style_guide, path)
+
+    records = ResultRecords.from_results([results])
+    records.stats = source_checker.stats
+    return records, [time.perf_counter() - start]
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import argparse
+import copy
+import re
+import tokenize
+import typing as t
+
+from flake8.defaults import IGNORE
+from flake8.utils import parse_comma_separated_list
+
+from flake8_annotations.source import RESULT, error_code, is_excluded
+
+_T = t.TypeVar("_T")
+
+# Error code prefixes selected by default, mirroring flake8's default selection for the codes that
+# can be reported outside of flake8: our own codes & `E999` for unparseable source
+EXTENDED_DEFAULT_SELECT = ("ANN", "E")
+
+# Match flake8's parsing of inline & file-level `noqa` comments
+NOQA_INLINE = re.compile(r"# noqa(?::[\s]?(?P<codes>([A-Z]+[0-9]+(?:[,\s]+)?)+))?", re.IGNORECASE)
+NOQA_FILE = re.compile(r"\s*# flake8[:=]\s*noqa", re.IGNORECASE)
+
+
+def _sorted_prefixes(*prefix_lists: t.Optional[t.Iterable[str]]) -> t.Tuple[str, ...]:
+    prefixes = [prefix for prefix_list in prefix_lists for prefix in (prefix_list or ())]
+    return tuple(sorted(prefixes, reverse=True))
+
+
+class StyleGuide:
+    """
+    Decide which results are reported, replicating flake8's select, ignore, & `noqa` handling.
+
+    Selection decisions follow flake8's `DecisionEngine`: codes matched by both an explicit select &
+    an explicit ignore (or by both an implicit select & an implicit ignore) are decided by the
+    longest matching prefix, otherwise explicit configuration wins over the defaults.
+
+    As in flake8, each of the `--per-file-ignores` pairings is decided by its own style guide, with
+    its codes added to the ignored codes, for the paths matching its pattern (see: `for_path`).
+    """
+
+    def __init__(self, options: argparse.Namespace):
+        self.disable_noqa: bool = options.disable_noqa
+        self._decisions: t.Dict[str, bool] = {}
+
+        self.per_file: t.List[t.Tuple[str, StyleGuide]] = []
+        for pattern, codes in getattr(options, "per_file_ignores", None) or ():
+            per_file_options = copy.copy(options)
+            per_file_options.extend_ignore = [*(options.extend_ignore or ()), *codes]
+            per_file_options.per_file_ignores = []
+            self.per_file.append((pattern, StyleGuide(per_file_options)))
+
+        self.selected_explicitly = _sorted_prefixes(options.select, options.extend_select)
+        self.ignored_explicitly = _sorted_prefixes(options.ignore, options.extend_ignore)
+
+        if options.select is not None:
+            self.selected = _sorted_prefixes(options.select, options.extend_select)
+        else:
+            self.selected = _sorted_prefixes(EXTENDED_DEFAULT_SELECT, options.extend_select)
+
+        if options.ignore is not None:
+            self.ignored = _sorted_prefixes(options.ignore, options.extend_ignore)
+        else:
+            self.ignored = _sorted_prefixes(
+                IGNORE, options.extended_default_ignore, options.extend_ignore
+            )
+
+    def is_selected(self, code: str) -> bool:
+        """Determine whether the provided error code is selected by the configured options."""
+        decision = self._decisions.get(code)
+        if decision is None:
+            decision = self._make_decision(code)
+            self._decisions[code] = decision
+
+        return decision
+
+    def for_path(self, path: str) -> StyleGuide:
+        """
+        Provide the style guide deciding the results of the provided path.
+
+        As done by flake8, this is the style guide of the longest per-file ignore pattern matching
+        the path's basename or absolute path, if any, otherwise this style guide.
+        """
+        style_guide, longest = self, 0
+        for pattern, per_file in self.per_file:
+            if len(pattern) > longest and is_excluded(path, [pattern]):
+                style_guide, longest = per_file, len(pattern)
+
+        return style_guide
+
+    def _make_decision(self, code: str) -> bool:
+        if code.startswith(self.selected_explicitly):
+            selected_explicitly, selected = True, True
+        else:
+            selected_explicitly, selected = False, code.startswith(self.selected)
+
+        if code.startswith(self.ignored_explicitly):
+            ignored_explicitly, ignored = True, True
+        else:
+            ignored_explicitly, ignored = False, code.startswith(self.ignored)
+
+        if selected_explicitly != ignored_explicitly:
+            return selected_explicitly
+        elif not (selected and ignored):
+            return selected and not ignored
+
+        # Code is in both lists: longest prefix wins
+        select = next(prefix for prefix in self.selected if code.startswith(prefix))
+        ignore = next(prefix for prefix in self.ignored if code.startswith(prefix))
+        return len(select) > len(ignore)
+
+    def filter_results(self, results: t.Iterable[RESULT], lines: t.Sequence[str]) -> t.List[RESULT]:
+        """
+        Filter the provided results down to those that flake8 would report for the source lines.
+
+        Results are returned sorted by line & column number.
+        """
+        return self.filter_items(results, lines, lambda result: result)
+
+    def filter_items(
+        self,
+        items: t.Iterable[_T],
+        lines: t.Sequence[str],
+        key: t.Callable[[_T], RESULT],
+        may_have_noqa: bool = True,
+    ) -> t.List[_T]:
+        """
+        Filter the provided items by their corresponding result, as done by `filter_results`.
+
+        If the source is known not to contain any `noqa` comments, `may_have_noqa` can be set to
+        `False` to skip searching its lines for them.
+        """
+        check_noqa = may_have_noqa and not self.disable_noqa
+        if check_noqa and any(NOQA_FILE.match(line) for line in lines):
+            return []
+
+        noqa_lines: t.Optional[t.Dict[int, str]] = None
+        reported = []
+        for item in sorted(items, key=lambda item: key(item)[:2]):
+            result = key(item)
+            code = error_code(result)
+            if not self.is_selected(code):
+                continue
+
+            if check_noqa:
+                if noqa_lines is None:
+                    noqa_lines = noqa_line_mapping(lines)
+
+                if is_inline_ignored(code, _noqa_line_for(result[0], lines, noqa_lines)):
+                    continue
+
+            reported.append(item)
+
+        return reported
+
+
+def format_result(path: str, result: RESULT) -> str:
+    """Format the provided result using flake8's default output format."""
+    lineno, col_offset, message = result
+    return f"{path}:{lineno}:{col_offset + 1}: {message}"
+
+
+def _noqa_line_for(line_number: int, lines: t.Sequence[str], noqa_lines: t.Dict[int, str]) -> str:
+    noqa_line = noqa_lines.get(line_number)
+    if noqa_line is None and 0 < line_number <= len(lines):
+        return lines[line_number - 1]
+
+    return noqa_line or ""
+
+
+def noqa_line_mapping(lines: t.Sequence[str]) -> t.Dict[int, str]:
+    """
+    Map each line number to the text searched for a `noqa` comment, as done by flake8.
+
+    Lines spanned by a multi-line token or logical line all map to the joined text of the span, so
+    a `noqa` comment anywhere in e.g. a multi-line function definition applies to all of its lines.
+    """
+    mapping: t.Dict[int, str] = {}
+    line_iter = iter(lines)
+    min_line, max_line = len(lines) + 2, -1
+    try:
+        for tok_type, _, (start_line, _), (end_line, _), _ in tokenize.generate_tokens(
+            lambda: next(line_iter, "")
+        ):
+            if tok_type in (tokenize.ENDMARKER, tokenize.DEDENT):
+                continue
+
+            min_line, max_line = min(min_line, start_line), max(max_line, end_line)
+            if tok_type in (tokenize.NL, tokenize.NEWLINE):
+                joined = "".join(lines[min_line - 1 : max_line])
+                mapping.update(dict.fromkeys(range(min_line, max_line + 1), joined))
+                min_line, max_line = len(lines) + 2, -1
+    except (tokenize.TokenError, SyntaxError):
+        return {}
+
+    return mapping
+
+
+def is_inline_ignored(code: str, noqa_line: str) -> bool:
+    """Determine whether the error code is ignored by a `noqa` comment in the provided line."""
+    noqa_match = NOQA_INLINE.search(noqa_line)
+    if noqa_match is None:
+        return False
+
+    codes_str = noqa_match.groupdict()["codes"]
+    if codes_str is None:
+        # Blanket noqa
+        return True
+
+    codes = set(parse_comma_separated_list(codes_str))
+    return code in codes or code.startswith(tuple(codes))
@@ -0,0 +1,412 @@
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import json
+import os
+import sys
+import time
+import typing as t
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from flake8.defaults import EXCLUDE
+
+from flake8_annotations.checker import TypeHintChecker
+from flake8_annotations.options import (
+    DISCOVERY_OPTION_NAMES,
+    add_config_options,
+    add_discovery_options,
+    build_parser,
+    options_fingerprint,
+    parse_args_with_config,
+)
+from flake8_annotations.source import (
+    RESULT,
+    SourceChecker,
+    content_digest,
+    error_code,
+    is_excluded,
+    read_source,
+)
+from flake8_annotations.style_guide import StyleGuide
+from flake8_annotations.watch import RACY_WINDOW_NS
+
+SUMMARY_VERSION = 2
+DEFAULT_SUMMARY_FILE = ".flake8-annotations-summary.json"
+
+
+@dataclass(slots=True)
+class FileSummary:
+    """Represent the checker results of a single source file & the state they were generated for."""
+
+    mtime_ns: int
+    size: int
+    digest: str
+    results: t.List[RESULT]
+
+    @property
+    def counts(self) -> t.Counter[str]:
+        """Count the file's results by error code."""
+        return Counter(error_code(result) for result in self.results)
+
+    @property
+    def results_digest(self) -> str:
+        """Calculate a digest of the file's results."""
+        return hashlib.blake2b(repr(self.results).encode(), digest_size=16).hexdigest()
+
+    def is_current(self, entry: os.DirEntry) -> bool:
+        """Determine whether the summary is still valid for the provided directory entry."""
+        stat = entry.stat()
+        return self.mtime_ns == stat.st_mtime_ns and self.size == stat.st_size
+
+
+@dataclass(slots=True)
+class DirectorySummary:
+    """
+    Represent a Merkle summary of a directory's source files & subdirectories.
+
+    The directory's digest is calculated from the name, content digest, and results digest of each
+    child file, along with the name & digest of each child directory, so two summaries with the same
+    digest are guaranteed to describe the same source contents & checker results. Per-error code
+    counts are aggregated for the entire subtree.
+
+    The directory's modification time is kept if it was old enough to be trusted when the directory
+    was listed (see: `RACY_WINDOW_NS`), so the directory isn't listed again until it changes.
+    """
+
+    digest: str
+    files: t.Dict[str, FileSummary] = field(default_factory=dict)
+    directories: t.Dict[str, DirectorySummary] = field(default_factory=dict)
+    counts: t.Dict[str, int] = field(default_factory=dict)
+    mtime_ns: t.Optional[int] = None
+
+    @property
+    def total(self) -> int:
+        """Total number of errors reported for the directory's subtree."""
+        return sum(self.counts.values())
+
+    @classmethod
+    def from_children(
+        cls,
+        files: t.Dict[str, FileSummary],
+        directories: t.Dict[str, DirectorySummary],
+        mtime_ns: t.Optional[int] = None,
+    ) -> DirectorySummary:
+        """Build the directory's summary node from the summaries of its children."""
+        hasher = hashlib.blake2b(digest_size=20)
+        counts: t.Counter[str] = Counter()
+        for name, file_summary in sorted(files.items()):
+            hasher.update(
+                f"F\0{name}\0{file_summary.digest}\0{file_summary.results_digest}\n".encode()
+            )
+            counts.update(file_summary.counts)
+
+        for name, dir_summary in sorted(directories.items()):
+            hasher.update(f"D\0{name}\0{dir_summary.digest}\n".encode())
+            counts.update(dir_summary.counts)
+
+        return cls(hasher.hexdigest(), files, directories, dict(sorted(counts.items())), mtime_ns)
+
+    def iter_directories(self, prefix: str = ".") -> t.Iterator[t.Tuple[str, DirectorySummary]]:
+        """Iterate over the subtree's summary nodes, yielding `(relative path, node)` tuples."""
+        yield prefix, self
+        for name, dir_summary in sorted(self.directories.items()):
+            yield from dir_summary.iter_directories(f"{prefix}/{name}")
+
+    def to_dict(self) -> t.Dict[str, t.Any]:
+        """Serialize the summary to a JSON-compatible dictionary."""
+        return {
+            "digest": self.digest,
+            "mtime_ns": self.mtime_ns,
+            "counts": self.counts,
+            "files": {
+                name: [fs.mtime_ns, fs.size, fs.digest, [list(result) for result in fs.results]]
+                for name, fs in self.files.items()
+            },
+            "directories": {name: ds.to_dict() for name, ds in self.directories.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, serialized: t.Dict[str, t.Any]) -> DirectorySummary:
+        """Deserialize the summary from the output of `to_dict`."""
+        files = {
+            name: FileSummary(mtime_ns, size, digest, [tuple(result) for result in results])
+            for name, (mtime_ns, size, digest, results) in serialized["files"].items()
+        }
+        directories = {
+            name: cls.from_dict(child) for name, child in serialized["directories"].items()
+        }
+        return cls(
+            serialized["digest"], files, directories, serialized["counts"], serialized["mtime_ns"]
+        )
+
+
+@dataclass(slots=True)
+class SummaryStats:
+    """Keep track of the work done while building a tree summary."""
+
+    directories_listed: int = 0
+    files_checked: int = 0
+    files_reused: int = 0
+    directories_reused: int = 0
+
+    # Paths of the files & directories that couldn't be read, which are left out of the summary
+    unreadable: t.List[str] = field(default_factory=list)
+
+
+def summarize_tree(
+    root: t.Union[str, Path],
+    previous: t.Optional[DirectorySummary] = None,
+    exclude: t.Sequence[str] = EXCLUDE,
+    stats: t.Optional[SummaryStats] = None,
+    source_checker: t.Optional[SourceChecker] = None,
+    filename_patterns: t.Sequence[str] = ("*.py",),
+    stat_files: bool = False,
+) -> DirectorySummary:
+    """
+    Build the Merkle summary for the provided directory, reusing an optional previous summary.
+
+    Adding, removing, or renaming a directory entry updates the directory's modification time, so a
+    directory whose modification time matches the previous summary isn't listed again & its file
+    summaries are reused without stat'ing the files; only its subdirectories are visited. A no-op
+    run therefore costs one `stat()` per directory. Changed directories are listed; their files
+    whose size & modification time match the previous summary are not read. If nothing in a subtree
+    has changed, its previous summary node is reused as-is.
+
+    NOTE: Modifying a file in place doesn't update its directory's modification time, so such edits
+    are only picked up once the directory changes, unless `stat_files` is set to list every
+    directory & stat every file.
+
+    Within a run, files with identical contents are only checked once by the source checker.
+
+    Like the standalone runner's file discovery, symlinked directories aren't followed. Files &
+    directories that can't be read are left out of the summary & recorded in the stats.
+
+    NOTE: Checker options are assumed to have already been parsed by `TypeHintChecker` & to be
+    the same as the options used to generate the previous summary.
+    """
+    if stats is None:
+        stats = SummaryStats()
+
+    if source_checker is None:
+        source_checker = SourceChecker()
+
+    try:
+        mtime_ns: t.Optional[int] = os.stat(root).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+
+    if (
+        not stat_files
+        and previous is not None
+        and previous.mtime_ns is not None
+        and previous.mtime_ns == mtime_ns
+    ):
+        return _summarize_unlisted(
+            root, previous, exclude, stats, source_checker, filename_patterns
+        )
+
+    # Entries modified within the racy window may still change without updating the mtime again
+    if mtime_ns is not None and mtime_ns >= time.time_ns() - RACY_WINDOW_NS:
+        mtime_ns = None
+
+    stats.directories_listed += 1
+    is_unchanged = previous is not None
+    files: t.Dict[str, FileSummary] = {}
+    directories: t.Dict[str, DirectorySummary] = {}
+    try:
+        with os.scandir(root) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        stats.unreadable.append(os.fspath(root))
+        entries = []
+        mtime_ns = None
+
+    for entry in entries:
+        if is_excluded(entry.path, exclude):
+            continue
+
+        if entry.is_dir(follow_symlinks=False):
+            prev_dir = previous.directories.get(entry.name) if previous else None
+            directories[entry.name] = summarize_tree(
+                entry.path,
+                prev_dir,
+                exclude,
+                stats,
+                source_checker,
+                filename_patterns,
+                stat_files,
+            )
+            is_unchanged = is_unchanged and directories[entry.name] is prev_dir
+        elif entry.is_file() and _matches(entry.name, filename_patterns):
+            prev_file = previous.files.get(entry.name) if previous else None
+            if prev_file is not None and prev_file.is_current(entry):
+                stats.files_reused += 1
+                files[entry.name] = prev_file
+                continue
+
+            is_unchanged = False
+            try:
+                files[entry.name] = _summarize_file(entry, prev_file, stats, source_checker)
+            except OSError:
+                stats.unreadable.append(entry.path)
+                # Keep listing the directory so the file is retried
+                mtime_ns = None
+
+    if previous is not None and is_unchanged:
+        # Check for removed children, since we've only compared the current directory entries
+        if (
+            files.keys() == previous.files.keys()
+            and directories.keys() == previous.directories.keys()
+        ):
+            stats.directories_reused += 1
+            previous.mtime_ns = mtime_ns
+            return previous
+
+    return DirectorySummary.from_children(files, directories, mtime_ns)
+
+
+def _summarize_unlisted(
+    root: t.Union[str, Path],
+    previous: DirectorySummary,
+    exclude: t.Sequence[str],
+    stats: SummaryStats,
+    source_checker: SourceChecker,
+    filename_patterns: t.Sequence[str],
+) -> DirectorySummary:
+    """Summarize a directory whose entries are unchanged, only visiting its subdirectories."""
+    stats.files_reused += len(previous.files)
+    is_unchanged = True
+    directories: t.Dict[str, DirectorySummary] = {}
+    for name, prev_dir in previous.directories.items():
+        directories[name] = summarize_tree(
+            os.path.join(root, name), prev_dir, exclude, stats, source_checker, filename_patterns
+        )
+        is_unchanged = is_unchanged and directories[name] is prev_dir
+
+    if is_unchanged:
+        stats.directories_reused += 1
+        return previous
+
+    return DirectorySummary.from_children(dict(previous.files), directories, previous.mtime_ns)
+
+
+def _matches(name: str, filename_patterns: t.Sequence[str]) -> bool:
+    """Determine whether the provided file name matches any of the filename patterns."""
+    return any(fnmatch.fnmatch(name, pattern) for pattern in filename_patterns)
+
+
+def _summarize_file(
+    entry: os.DirEntry,
+    previous: t.Optional[FileSummary],
+    stats: SummaryStats,
+    source_checker: SourceChecker,
+) -> FileSummary:
+    """Summarize a changed (or new) source file, only re-checking it if its contents changed."""
+    stat = entry.stat()
+    data = read_source(entry.path)
+    digest = content_digest(data)
+    if previous is not None and previous.digest == digest:
+        # Only the file's metadata has changed
+        stats.files_reused += 1
+        return FileSummary(stat.st_mtime_ns, stat.st_size, digest, previous.results)
+
+    stats.files_checked += 1
+    results = source_checker.check(entry.path, data, digest=digest)
+    return FileSummary(stat.st_mtime_ns, stat.st_size, digest, results)
+
+
+def load_summary(
+    summary_file: t.Union[str, Path], fingerprint: str
+) -> t.Optional[DirectorySummary]:
+    """
+    Load a previously saved summary, if one exists.
+
+    `None` is returned if the summary file is missing, unreadable, or was generated with a different
+    summary version or set of checker options.
+    """
+    try:
+        with open(summary_file, encoding="utf-8") as f:
+            serialized = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if serialized.get("version") != SUMMARY_VERSION or serialized.get("options") != fingerprint:
+        return None
+
+    return DirectorySummary.from_dict(serialized["root"])
+
+
+def save_summary(
+    summary_file: t.Union[str, Path], summary: DirectorySummary, fingerprint: str
+) -> None:
+    """Save the provided summary for reuse by subsequent runs."""
+    serialized = {"version": SUMMARY_VERSION, "options": fingerprint, "root": summary.to_dict()}
+    with open(summary_file, "w", encoding="utf-8") as f:
+        json.dump(serialized, f, separators=(",", ":"))
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    """Summarize the missing annotations of a source tree, by directory & error code."""
+    parser = build_parser(
+        prog="python -m flake8_annotations.summary",
+        description="Summarize missing annotations by directory, skipping unchanged subtrees.",
+    )
+    add_discovery_options(parser)
+    add_config_options(parser)
+    parser.add_argument("root", type=Path, help="Root directory of the source tree.")
+    parser.add_argument(
+        "--stat-files",
+        action="store_true",
+        help=(
+            "List every directory & stat every file, rather than only changed directories, to "
+            "pick up files modified in place."
+        ),
+    )
+    parser.add_argument(
+        "--summary-file",
+        type=Path,
+        default=None,
+        help=f"Summary file to reuse & update. (Default: <root>/{DEFAULT_SUMMARY_FILE})",
+    )
+    options = parse_args_with_config(parser, argv)
+
+    # The summary audits all missing annotations, so the baseline isn't applied
+    options.baseline = None
+    TypeHintChecker.parse_options(options)
+
+    summary_file = options.summary_file or options.root / DEFAULT_SUMMARY_FILE
+    fingerprint = options_fingerprint(options, DISCOVERY_OPTION_NAMES)
+    stats = SummaryStats()
+    source_checker = SourceChecker(StyleGuide(options))
+    summary = summarize_tree(
+        options.root,
+        load_summary(summary_file, fingerprint),
+        exclude=[*options.exclude, *options.extend_exclude],
+        stats=stats,
+        source_checker=source_checker,
+        filename_patterns=options.filename,
+        stat_files=options.stat_files,
+    )
+    save_summary(summary_file, summary, fingerprint)
+
+    for path, node in summary.iter_directories():
+        if node.total:
+            counts = " ".join(f"{code}={count}" for code, count in node.counts.items())
+            print(f"{path}: {node.total} ({counts})")
+
+    print(
+        f"{stats.directories_listed} directories listed, {stats.files_checked} files checked, "
+        f"{stats.files_reused} files & {stats.directories_reused} directories reused"
+    )
+    print(source_checker.stats.describe())
+    for path in stats.unreadable:
+        print(f"{path}: could not be read", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
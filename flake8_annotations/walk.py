@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import fnmatch
+import os
+import re
+import stat
+import typing as t
+from dataclasses import dataclass
+
+from flake8.defaults import EXCLUDE
+
+from flake8_annotations.source import is_excluded
+
+GITIGNORE = ".gitignore"
+
+# Identity of a file or directory, shared by every path (e.g. symlink or hard link) leading to it
+FILE_KEY = t.Tuple[int, int]
+
+
+def translate_pattern(pattern: str) -> str:
+    """
+    Translate a `.gitignore` glob into a regular expression matching relative POSIX paths.
+
+    The pattern's negation, directory-only suffix & anchoring are handled by `GitIgnore`; this only
+    translates the glob itself, where `*`, `?` & `[...]` don't match a `/`, and a `**` path
+    component matches any number of directories.
+    """
+    parts = []
+    idx, n = 0, len(pattern)
+    while idx < n:
+        char = pattern[idx]
+        if pattern.startswith("**/", idx) and (idx == 0 or pattern[idx - 1] == "/"):
+            parts.append("(?:.*/)?")
+            idx += 3
+        elif pattern.startswith("/**", idx) and idx + 3 == n:
+            parts.append("/.*")
+            idx += 3
+        elif char == "*":
+            while idx < n and pattern[idx] == "*":
+                idx += 1
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+            idx += 1
+        elif char == "[":
+            end = idx + 1
+            if end < n and pattern[end] in "!^":
+                end += 1
+            if end < n and pattern[end] == "]":
+                end += 1
+            end = pattern.find("]", end)
+            if end == -1:
+                parts.append(re.escape(char))
+                idx += 1
+                continue
+
+            members = pattern[idx + 1 : end].replace("\\", "\\\\")
+            if members[0] in "!^":
+                members = f"^{members[1:]}"
+            parts.append(f"(?!/)[{members}]")
+            idx = end + 1
+        elif char == "\\" and idx + 1 < n:
+            parts.append(re.escape(pattern[idx + 1]))
+            idx += 2
+        else:
+            parts.append(re.escape(char))
+            idx += 1
+
+    return "".join(parts)
+
+
+@dataclass(slots=True)
+class IgnoreRule:
+    """A single compiled `.gitignore` pattern."""
+
+    regex: t.Pattern[str]
+    negated: bool
+    dir_only: bool
+
+
+class GitIgnore:
+    """
+    Compiled patterns of a `.gitignore` file, matched against paths relative to its directory.
+
+    Patterns follow git's rules: later patterns take precedence over earlier ones, a `!` prefix
+    re-includes a path, a trailing `/` only matches directories, and patterns containing a `/`
+    (other than a trailing one) are anchored to the file's directory, while others match at any
+    depth.
+
+    NOTE: As with git, paths within an ignored directory can't be re-included, since ignored
+    directories are never entered.
+    """
+
+    def __init__(self, rules: t.Sequence[IgnoreRule]):
+        self.rules = rules
+
+    @classmethod
+    def parse(cls, text: str) -> GitIgnore:
+        """Compile the patterns of the provided `.gitignore` contents."""
+        rules = []
+        for line in text.splitlines():
+            # Trailing spaces are ignored unless escaped
+            pattern = line.rstrip(" ")
+            if pattern.endswith("\\") and line != pattern:
+                pattern += " "
+
+            if not pattern or pattern.startswith("#"):
+                continue
+
+            negated = pattern.startswith("!")
+            if negated:
+                pattern = pattern[1:]
+
+            dir_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            if not pattern:
+                continue
+
+            if "/" in pattern:
+                regex = translate_pattern(pattern.lstrip("/"))
+            else:
+                regex = f"(?:.*/)?{translate_pattern(pattern)}"
+
+            rules.append(IgnoreRule(re.compile(regex, re.DOTALL), negated, dir_only))
+
+        return cls(rules)
+
+    @classmethod
+    def load(cls, directory: str) -> t.Optional[GitIgnore]:
+        """Load the `.gitignore` file of the provided directory, if it exists & is readable."""
+        try:
+            with open(os.path.join(directory, GITIGNORE), encoding="utf-8", errors="replace") as f:
+                return cls.parse(f.read())
+        except OSError:
+            return None
+
+    def match(self, relative_path: str, is_dir: bool) -> t.Optional[bool]:
+        """
+        Determine whether the provided relative path is ignored by the patterns.
+
+        `None` is returned if none of the patterns match the path.
+        """
+        for rule in reversed(self.rules):
+            if rule.dir_only and not is_dir:
+                continue
+
+            if rule.regex.fullmatch(relative_path):
+                return not rule.negated
+
+        return None
+
+
+# `.gitignore` files applying to a directory, each with the directory's path relative to its own
+_IGNORE_STACK = t.List[t.Tuple[GitIgnore, str]]
+
+
+def is_ignored(ignores: _IGNORE_STACK, name: str, is_dir: bool) -> bool:
+    """Determine whether the named entry of a directory is ignored by its `.gitignore` files."""
+    # Deeper `.gitignore` files take precedence over those of their parent directories
+    for gitignore, relative_dir in reversed(ignores):
+        ignored = gitignore.match(f"{relative_dir}/{name}" if relative_dir else name, is_dir)
+        if ignored is not None:
+            return ignored
+
+    return False
+
+
+def find_repository_root(path: str) -> t.Optional[str]:
+    """Find the root of the git repository containing the provided path, if any."""
+    directory = os.path.abspath(path)
+    while True:
+        if os.path.exists(os.path.join(directory, ".git")):
+            return directory
+
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+
+        directory = parent
+
+
+class SourceWalker:
+    """
+    Discover the source files to check, mirroring flake8's file discovery.
+
+    Like `iter_source_files`, directories are walked with `os.scandir` & excluded directories are
+    never entered. Additionally:
+
+      * If `gitignore` is `True`, the patterns of the `.gitignore` files of each directory, and of
+        its parent directories up to the root of its git repository, are applied while descending,
+        so ignored directories are never entered. Files passed explicitly are always checked.
+      * If `follow_symlinks` is `True`, symlinked directories are walked.
+      * Files & directories are identified by their (device, inode) pair, so each is only yielded
+        or walked once, however many paths lead to it, e.g. through symlinks or overlapping paths.
+        This also stops symlink loops.
+
+    Files are yielded lazily, in sorted order for each directory path. The walker keeps track of
+    the files it has yielded across calls to `walk`.
+    """
+
+    def __init__(
+        self,
+        exclude: t.Sequence[str] = EXCLUDE,
+        filename_patterns: t.Sequence[str] = ("*.py",),
+        gitignore: bool = False,
+        follow_symlinks: bool = False,
+    ):
+        self.exclude = exclude
+        self.filename_patterns = filename_patterns
+        self.gitignore = gitignore
+        self.follow_symlinks = follow_symlinks
+        self._seen: t.Set[FILE_KEY] = set()
+
+    def walk(self, paths: t.Iterable[str]) -> t.Iterator[str]:
+        """Lazily yield the source files to check for the provided paths."""
+        for path in paths:
+            if is_excluded(path, self.exclude):
+                continue
+
+            try:
+                st = os.stat(path)
+            except OSError:
+                # Reported as an unreadable file by the checker
+                yield path
+                continue
+
+            if not self._first_visit((st.st_dev, st.st_ino)):
+                continue
+
+            if stat.S_ISDIR(st.st_mode):
+                ignores = self._parent_ignores(path) if self.gitignore else []
+                yield from self._walk(path, st.st_dev, ignores)
+            else:
+                yield path
+
+    def _first_visit(self, key: FILE_KEY) -> bool:
+        if key in self._seen:
+            return False
+
+        self._seen.add(key)
+        return True
+
+    def _parent_ignores(self, path: str) -> _IGNORE_STACK:
+        """Load the `.gitignore` files of the path's parents, up to the root of its repository."""
+        directory = os.path.abspath(path)
+        root = find_repository_root(directory)
+        if root is None or root == directory:
+            return []
+
+        relative_dir = os.path.relpath(directory, root).replace(os.sep, "/")
+        parts = relative_dir.split("/")
+        ignores = []
+        for depth in range(len(parts)):
+            gitignore = GitIgnore.load(os.path.join(root, *parts[:depth]))
+            if gitignore is not None:
+                ignores.append((gitignore, "/".join(parts[depth:])))
+
+        return ignores
+
+    def _walk(self, root: str, device: int, ignores: _IGNORE_STACK) -> t.Iterator[str]:
+        try:
+            with os.scandir(root) as it:
+                entries = list(it)
+        except OSError:
+            return
+
+        if self.gitignore and any(entry.name == GITIGNORE for entry in entries):
+            gitignore = GitIgnore.load(root)
+            if gitignore is not None:
+                ignores = [*ignores, (gitignore, "")]
+
+        # Sort subdirectories by their path prefix, so files are yielded in sorted path order
+        children = []
+        for entry in entries:
+            is_dir = entry.is_dir()
+            children.append((f"{entry.name}/" if is_dir else entry.name, entry, is_dir))
+
+        for _, entry, is_dir in sorted(children, key=lambda child: child[0]):
+            filepath = os.path.join(root, entry.name)
+            if is_excluded(filepath, self.exclude):
+                continue
+
+            if ignores and is_ignored(ignores, entry.name, is_dir):
+                continue
+
+            is_symlink = entry.is_symlink()
+            if is_dir:
+                if is_symlink and not self.follow_symlinks:
+                    continue
+
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+
+                if self._first_visit((st.st_dev, st.st_ino)):
+                    child_ignores = [
+                        (gitignore, f"{relative_dir}/{entry.name}" if relative_dir else entry.name)
+                        for gitignore, relative_dir in ignores
+                    ]
+                    yield from self._walk(filepath, st.st_dev, child_ignores)
+            elif not self.filename_patterns or any(
+                fnmatch.fnmatch(filepath, pattern) for pattern in self.filename_patterns
+            ):
+                if is_symlink:
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        # A broken symlink, reported as an unreadable file by the checker
+                        yield filepath
+                        continue
+
+                    key = (st.st_dev, st.st_ino)
+                else:
+                    # Entries of a directory share its device, so no extra `stat` is needed
+                    key = (device, entry.inode())
+
+                if self._first_visit(key):
+                    yield filepath
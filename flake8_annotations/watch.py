@@ -0,0 +1,393 @@
+from __future__ import annotations
+
+import fnmatch
+import math
+import os
+import sys
+import time
+import typing as t
+from dataclasses import dataclass, field
+
+from flake8.defaults import EXCLUDE
+
+from flake8_annotations.checker import TypeHintChecker
+from flake8_annotations.options import (
+    add_config_options,
+    add_discovery_options,
+    build_parser,
+    parse_args_with_config,
+)
+from flake8_annotations.source import (
+    RESULT,
+    SourceChecker,
+    content_digest,
+    is_excluded,
+    read_source,
+)
+from flake8_annotations.style_guide import StyleGuide, format_result
+
+# Stat signature of a source file: (modification time, size)
+SIGNATURE = t.Tuple[int, int]
+
+# Modification times within this window of a scan can't be trusted to change on a subsequent write,
+# e.g. for filesystems with a coarse timestamp granularity
+RACY_WINDOW_NS = 2_000_000_000
+
+# Number of recently modified files polled between full scans
+HOT_FILES = 64
+
+
+@dataclass(slots=True)
+class _DirectoryListing:
+    """Cached listing of a directory's non-excluded source files & subdirectories."""
+
+    mtime_ns: int
+    files: t.Tuple[str, ...]
+    directories: t.Tuple[str, ...]
+    is_racy: bool
+
+
+class StatIndex:
+    """
+    Track the stat signatures of the source files for the provided paths, by polling.
+
+    Each full scan stats every tracked file, but directories are only re-listed if their
+    modification time has changed since they were last listed, since adding, removing, or renaming
+    an entry updates the directory's modification time. Files are discovered as done by flake8,
+    using the provided exclude & filename patterns.
+
+    Entries modified within `RACY_WINDOW_NS` of the scan that observed them are considered racy &
+    are re-listed or reported as changed on the following scan, since a subsequent modification
+    may not change their timestamp.
+    """
+
+    def __init__(
+        self,
+        paths: t.Iterable[str],
+        exclude: t.Sequence[str] = EXCLUDE,
+        filename_patterns: t.Sequence[str] = ("*.py",),
+    ):
+        self.paths = tuple(paths)
+        self.exclude = exclude
+        self.filename_patterns = filename_patterns
+        self.signatures: t.Dict[str, SIGNATURE] = {}
+        self._racy: t.Set[str] = set()
+        self._listings: t.Dict[str, _DirectoryListing] = {}
+
+    def scan(self) -> t.Tuple[t.List[str], t.List[str]]:
+        """
+        Scan the tracked paths, returning the sorted `(changed, removed)` paths since the last scan.
+
+        New files are reported as changed.
+        """
+        racy_ns = time.time_ns() - RACY_WINDOW_NS
+        files = self._list_files(racy_ns)
+
+        previous, self.signatures = self.signatures, {}
+        changed = self._stat_files(files, previous, racy_ns)
+        removed = sorted(path for path in previous if path not in self.signatures)
+        self._racy.intersection_update(self.signatures)
+        return sorted(changed), removed
+
+    def rescan(self, paths: t.Iterable[str]) -> t.Tuple[t.List[str], t.List[str]]:
+        """
+        Re-stat the provided files & those of changed directories, returning `(changed, removed)`.
+
+        Directories are still stat'd & re-listed if they've changed, so files added to or removed
+        from a directory, including files replaced by an editor's atomic save, are found as soon as
+        the directory changes; other files aren't stat'd. Directories are usually far fewer than
+        files, so this allows recently modified & new files to be polled much more frequently than
+        the entire tree.
+        """
+        racy_ns = time.time_ns() - RACY_WINDOW_NS
+        previous_listings = self._listings
+        self._list_files(racy_ns)
+
+        # Unchanged directories keep their listing, so only re-listed directories are compared
+        relisted: t.List[str] = []
+        removed: t.List[str] = []
+        for dirpath in previous_listings.keys() | self._listings.keys():
+            previous, listing = previous_listings.get(dirpath), self._listings.get(dirpath)
+            if previous is listing:
+                continue
+
+            previous_files = set(previous.files) if previous is not None else set()
+            files = set(listing.files) if listing is not None else set()
+            relisted.extend(files)
+            removed.extend(path for path in previous_files - files if path in self.signatures)
+
+        tracked = [path for path in paths if path in self.signatures]
+        removed.extend(path for path in tracked if not os.path.exists(path))
+        for path in removed:
+            self.signatures.pop(path, None)
+            self._racy.discard(path)
+
+        candidates = dict.fromkeys(path for path in tracked if path in self.signatures)
+        candidates.update(dict.fromkeys(relisted))
+        changed = self._stat_files(list(candidates), self.signatures, racy_ns)
+        return sorted(changed), sorted(set(removed))
+
+    def _list_files(self, racy_ns: int) -> t.List[str]:
+        files: t.List[str] = []
+        listings: t.Dict[str, _DirectoryListing] = {}
+        for path in self.paths:
+            if os.path.isdir(path):
+                self._list_tree(path, racy_ns, files, listings)
+            elif not is_excluded(path, self.exclude):
+                files.append(path)
+
+        self._listings = listings
+        return files
+
+    def _stat_files(
+        self, paths: t.List[str], previous: t.Dict[str, SIGNATURE], racy_ns: int
+    ) -> t.List[str]:
+        # This is the hot loop of a full scan, so attribute lookups are hoisted
+        stat = os.stat
+        signatures = self.signatures
+        previous_racy, racy = self._racy, self._racy.copy()
+        previous_get = previous.get
+        changed = []
+        for path in paths:
+            try:
+                st = stat(path)
+            except OSError:
+                continue
+
+            signature = (st.st_mtime_ns, st.st_size)
+            if path in previous_racy or previous_get(path) != signature:
+                changed.append(path)
+
+            signatures[path] = signature
+            if st.st_mtime_ns >= racy_ns:
+                racy.add(path)
+            else:
+                racy.discard(path)
+
+        self._racy = racy
+        return changed
+
+    def _list_tree(
+        self,
+        root: str,
+        racy_ns: int,
+        files: t.List[str],
+        listings: t.Dict[str, _DirectoryListing],
+    ) -> None:
+        pending = [root]
+        while pending:
+            dirpath = pending.pop()
+            try:
+                mtime_ns = os.stat(dirpath).st_mtime_ns
+            except OSError:
+                continue
+
+            listing = self._listings.get(dirpath)
+            if listing is None or listing.is_racy or listing.mtime_ns != mtime_ns:
+                listing = self._list_directory(dirpath, mtime_ns, racy_ns)
+                if listing is None:
+                    continue
+
+            listings[dirpath] = listing
+            files.extend(listing.files)
+            pending.extend(reversed(listing.directories))
+
+    def _list_directory(
+        self, dirpath: str, mtime_ns: int, racy_ns: int
+    ) -> t.Optional[_DirectoryListing]:
+        files, directories = [], []
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    if is_excluded(entry.path, self.exclude):
+                        continue
+
+                    # Symlinked directories aren't walked, as with the flake8 runner, so a symlink
+                    # loop can't make a scan descend indefinitely
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif entry.is_file() and any(
+                        fnmatch.fnmatch(entry.path, pattern) for pattern in self.filename_patterns
+                    ):
+                        files.append(entry.path)
+        except OSError:
+            return None
+
+        return _DirectoryListing(
+            mtime_ns, tuple(sorted(files)), tuple(sorted(directories)), mtime_ns >= racy_ns
+        )
+
+
+@dataclass(slots=True)
+class ResultDelta:
+    """Represent the change in a single file's reported results between two polls."""
+
+    path: str
+    added: t.List[RESULT] = field(default_factory=list)
+    removed: t.List[RESULT] = field(default_factory=list)
+
+    def format(self) -> t.Iterator[str]:
+        """Format the delta's results using flake8's default output format, prefixed by `+`/`-`."""
+        for result in self.removed:
+            yield f"-{format_result(self.path, result)}"
+
+        for result in self.added:
+            yield f"+{format_result(self.path, result)}"
+
+
+class Watcher:
+    """
+    Keep the results for a set of source paths up to date, re-checking only changed files.
+
+    The stat index, each file's content digest & results, and the source checker's analyses are all
+    kept in memory between polls, so a poll only reads the files whose stat signature has changed &
+    only re-checks those whose contents have changed.
+
+    Since files that were just edited are likely to be edited again, the `HOT_FILES` most recently
+    modified files can be polled on their own, along with the files added to changed directories,
+    which is much cheaper than a full scan of a large tree (see: `StatIndex.rescan`).
+
+    NOTE: Checker options are assumed to have already been parsed by `TypeHintChecker`.
+    """
+
+    def __init__(
+        self,
+        paths: t.Iterable[str],
+        style_guide: t.Optional[StyleGuide] = None,
+        exclude: t.Sequence[str] = EXCLUDE,
+        filename_patterns: t.Sequence[str] = ("*.py",),
+    ):
+        self.index = StatIndex(paths, exclude, filename_patterns)
+        self.source_checker = SourceChecker(style_guide)
+        self.digests: t.Dict[str, str] = {}
+        self.results: t.Dict[str, t.List[RESULT]] = {}
+        self.hot: t.Dict[str, None] = {}
+
+    def poll(self, full: bool = True) -> t.List[ResultDelta]:
+        """
+        Re-check the files changed since the last poll, returning the result deltas by path.
+
+        If `full` is `False`, only the most recently modified files & new files are polled.
+        """
+        if full:
+            changed, removed = self.index.scan()
+        else:
+            changed, removed = self.index.rescan(list(self.hot))
+
+        deltas = []
+        for path in removed:
+            deltas.append(self._forget(path))
+
+        for path in changed:
+            try:
+                data = read_source(path)
+            except OSError:
+                # Removed between the scan & the read; picked up by the next scan
+                deltas.append(self._forget(path))
+                continue
+
+            digest = content_digest(data)
+            if self.digests.get(path) == digest:
+                continue
+
+            results = self.source_checker.check(path, data, digest=digest)
+            previous = self.results.get(path)
+            if previous is not None:
+                # Existing file was modified
+                self._mark_hot(path)
+            else:
+                previous = []
+
+            self.digests[path] = digest
+            self.results[path] = results
+            deltas.append(
+                ResultDelta(
+                    path,
+                    added=[result for result in results if result not in previous],
+                    removed=[result for result in previous if result not in results],
+                )
+            )
+
+        if removed or changed:
+            # Only keep the analyses of contents that can still be reused
+            self.source_checker.retain(set(self.digests.values()))
+
+        return sorted(
+            (delta for delta in deltas if delta.added or delta.removed),
+            key=lambda delta: delta.path,
+        )
+
+    def _mark_hot(self, path: str) -> None:
+        self.hot.pop(path, None)
+        self.hot[path] = None
+        if len(self.hot) > HOT_FILES:
+            del self.hot[next(iter(self.hot))]
+
+    def _forget(self, path: str) -> ResultDelta:
+        self.hot.pop(path, None)
+        self.digests.pop(path, None)
+        return ResultDelta(path, removed=self.results.pop(path, []))
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    """Watch the provided paths, printing the change in reported errors as files are modified."""
+    parser = build_parser(
+        prog="python -m flake8_annotations.watch",
+        description="Re-check changed files as they're modified, printing the change in errors.",
+    )
+    parser.add_argument("paths", nargs="*", default=["."], help="Files & directories to watch.")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.02,
+        help="Polling interval for recently modified files, in seconds. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--scan-interval",
+        type=float,
+        default=1.0,
+        help="Interval between full scans of the watched paths, in seconds. (Default: %(default)s)",
+    )
+    add_discovery_options(parser)
+    add_config_options(parser)
+    options = parse_args_with_config(parser, argv)
+    TypeHintChecker.parse_options(options)
+
+    watcher = Watcher(
+        options.paths,
+        StyleGuide(options),
+        [*options.exclude, *options.extend_exclude],
+        options.filename,
+    )
+    last_scan = -math.inf
+    try:
+        while True:
+            start = time.perf_counter()
+            full = start - last_scan >= options.scan_interval
+            if full:
+                last_scan = start
+
+            deltas = watcher.poll(full)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            for delta in deltas:
+                for line in delta.format():
+                    print(line)
+
+            if deltas:
+                n_errors = sum(len(results) for results in watcher.results.values())
+                print(
+                    f"{len(deltas)} files changed in {elapsed_ms:.1f} ms; "
+                    f"{n_errors} errors across {len(watcher.results)} files",
+                    file=sys.stderr,
+                    flush=True,
+                )
+
+            time.sleep(options.interval)
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
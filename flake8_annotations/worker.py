@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import sys
+import threading
+import time
+import typing as t
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+
+from flake8_annotations.archives import ARCHIVE_ERRORS, iter_archive_sources, member_path
+from flake8_annotations.checker import CheckerConfig
+from flake8_annotations.pool import MIB, RecyclingPool, rss_bytes
+from flake8_annotations.prefork import prepare_for_fork, uses_fork
+from flake8_annotations.records import ResultRecords
+from flake8_annotations.source import RESULT, RunStats, SourceChecker, read_source
+from flake8_annotations.style_guide import StyleGuide
+
+# Checker results for a single file, keyed by its display path
+FILE_RESULTS = t.Tuple[str, t.Sequence[RESULT]]
+
+# Checker results for each file of a work unit, along with the time taken to check each file
+UNIT_RESULTS = t.Tuple[ResultRecords, t.List[float]]
+
+# Checker results for the sources inside an archive, along with the display path of each source
+ARCHIVE_RESULTS = t.Tuple[t.List[str], ResultRecords]
+
+# Per-process checker state, initialized by `init_worker`: the options & immutable checker
+# configuration of each project being checked, usually only one (see: `check_project_files`). The
+# configurations are shared by every thread, but each thread checks files with its own
+# `SourceChecker` per project
+_projects: t.List[t.Tuple[argparse.Namespace, CheckerConfig]] = []
+_thread_state = threading.local()
+
+
+def init_worker(options: argparse.Namespace) -> None:
+    """Parse the provided options into the checker state of the current process."""
+    init_project_worker([options])
+
+
+def init_project_worker(project_options: t.Sequence[argparse.Namespace]) -> None:
+    """
+    Parse the options of each provided project into the checker state of the current process.
+
+    Files are checked with the options of the first project, unless checked for another project
+    (see: `check_project_files`).
+    """
+    global _projects, _thread_state
+
+    _projects = [(options, CheckerConfig.from_options(options)) for options in project_options]
+    _thread_state = threading.local()
+
+
+def uses_recycling(options: argparse.Namespace) -> bool:
+    """Determine whether any worker recycling limits have been configured."""
+    return any(
+        getattr(options, name, None) is not None
+        for name in ("max_worker_files", "max_worker_bytes", "max_worker_rss")
+    )
+
+
+def executor_backend(executor: str) -> str:
+    """
+    Determine the backend used for the provided `--executor` choice in the running interpreter.
+
+    Subinterpreters require Python 3.14+'s `InterpreterPoolExecutor`; where it isn't available,
+    worker processes are used instead.
+    """
+    if executor == "interpreter" and not hasattr(concurrent.futures, "InterpreterPoolExecutor"):
+        return "process"
+
+    return executor
+
+
+def create_worker_pool(
+    options: argparse.Namespace,
+    jobs: int,
+    project_options: t.Optional[t.Sequence[argparse.Namespace]] = None,
+) -> Executor:
+    """
+    Create a pool of `jobs` worker processes, each initialized with the provided options.
+
+    If the options of several projects are provided, each worker is instead initialized with every
+    project's options, so a single pool can check the files of all of them (see:
+    `check_project_files`). The pool itself is still configured by `options`.
+
+    If any worker recycling limits have been configured, workers are recycled once they reach them
+    (see: `RecyclingPool`). With `--executor thread`, a pool of `jobs` threads in the current
+    process is created instead, which only runs checks in parallel on free-threaded builds of
+    CPython. With `--executor interpreter`, each of the `jobs` threads runs checks in its own
+    subinterpreter, with its own GIL & module state, falling back to worker processes where
+    subinterpreters aren't available (see: `executor_backend`). Recycling limits only apply to
+    worker processes.
+
+    Where worker processes are forked, the current process is first prepared for sharing its memory
+    with them (see: `prepare_for_fork`).
+
+    NOTE: As with `ProcessPoolExecutor`, `ImportError`, `NotImplementedError`, or `OSError` may be
+    raised on platforms without working multiprocessing support.
+    """
+    if project_options is None:
+        project_options = [options]
+
+    backend = executor_backend(getattr(options, "executor", "process"))
+    initargs = (project_options,)
+    if backend == "thread":
+        init_project_worker(project_options)
+        return ThreadPoolExecutor(jobs, "flake8-annotations-checker")
+    elif backend == "interpreter":
+        # Each subinterpreter imports its own copy of the checker, initialized with the options
+        executor: Executor = concurrent.futures.InterpreterPoolExecutor(  # type: ignore[attr-defined]
+            jobs,
+            "flake8-annotations-interpreter",
+            initializer=init_project_worker,
+            initargs=initargs,
+        )
+        return executor
+
+    if uses_fork():
+        prepare_for_fork(CheckerConfig.from_options(project_options[0]))
+
+    if not uses_recycling(options):
+        return ProcessPoolExecutor(jobs, initializer=init_project_worker, initargs=initargs)
+
+    max_rss = options.max_worker_rss
+    return RecyclingPool(
+        jobs,
+        initializer=init_project_worker,
+        initargs=initargs,
+        should_retire=should_retire,
+        max_rss=max_rss * MIB if max_rss is not None else None,
+    )
+
+
+def try_create_worker_pool(
+    options: argparse.Namespace,
+    jobs: int,
+    project_options: t.Optional[t.Sequence[argparse.Namespace]] = None,
+) -> t.Optional[Executor]:
+    """
+    Create a pool of worker processes as `create_worker_pool` does, if the platform supports it.
+
+    `None` is returned if the pool can't be created, e.g. on platforms without a working
+    `sem_open`, in which case callers should check files serially in the current process instead.
+    """
+    try:
+        return create_worker_pool(options, jobs, project_options)
+    except (ImportError, NotImplementedError, OSError):
+        return None
+
+
+def should_retire() -> bool:
+    """
+    Determine whether the current worker has reached its configured limits & should be recycled.
+
+    Workers are limited by the number of files & bytes they've checked (`--max-worker-files` &
+    `--max-worker-bytes`) and by their resident set size (`--max-worker-rss`, in MiB).
+    """
+    options, source_checker = _worker_state()
+    stats = source_checker.stats
+    max_files = getattr(options, "max_worker_files", None)
+    if max_files is not None and stats.files_checked >= max_files:
+        return True
+
+    max_bytes = getattr(options, "max_worker_bytes", None)
+    if max_bytes is not None and stats.bytes_checked >= max_bytes:
+        return True
+
+    max_rss = getattr(options, "max_worker_rss", None)
+    if max_rss is not None:
+        rss = rss_bytes()
+        return rss is not None and rss >= max_rss * MIB
+
+    return False
+
+
+def read_error_results(e: Exception, style_guide: StyleGuide, path: str) -> t.List[RESULT]:
+    """Build the results reported for a file that can't be read, in the same manner as flake8."""
+    results: t.List[RESULT] = [(0, 0, f"E902 {type(e).__name__}: {e}")]
+    return style_guide.for_path(path).filter_results(results, [])
+
+
+def display_path(path: str, options: argparse.Namespace) -> str:
+    """Provide the path used to report errors for the provided path."""
+    return options.stdin_display_name if path == "-" else path
+
+
+def read_path(path: str) -> bytes:
+    """Read the raw contents of the provided path, where a path of `-` is read from stdin."""
+    return sys.stdin.buffer.read() if path == "-" else read_source(path)
+
+
+def _worker_state() -> t.Tuple[argparse.Namespace, SourceChecker]:
+    if not _projects:
+        raise RuntimeError("Worker state has not been initialized, see: init_worker")
+
+    project: int = getattr(_thread_state, "project", 0)
+    options, config = _projects[project]
+    source_checkers: t.Optional[t.Dict[int, SourceChecker]] = getattr(
+        _thread_state, "source_checkers", None
+    )
+    if source_checkers is None:
+        source_checkers = _thread_state.source_checkers = {}
+
+    source_checker = source_checkers.get(project)
+    if source_checker is None:
+        source_checker = source_checkers[project] = SourceChecker(
+            StyleGuide(options), config=config
+        )
+
+    return options, source_checker
+
+
+@contextmanager
+def _unit_stats() -> t.Iterator[RunStats]:
+    """
+    Keep track of the stats of a single work unit's checks, in the current thread.
+
+    The unit's stats are still added to the checker's running stats, which the worker recycling
+    limits are based on (see: `should_retire`).
+    """
+    _, source_checker = _worker_state()
+    running = source_checker.stats
+    unit_stats = source_checker.stats = RunStats()
+    try:
+        yield unit_stats
+    finally:
+        source_checker.stats = running
+        running.merge(unit_stats)
+
+
+def check_source(path: str, data: bytes, digest: t.Optional[str] = None) -> t.List[RESULT]:
+    """
+    Check the provided source contents, for the provided display path, in the current thread.
+
+    If provided, the digest identifies the contents instead of a digest of the contents.
+    """
+    _, source_checker = _worker_state()
+    return source_checker.check(path, data, digest=digest)
+
+
+def check_file(path: str) -> t.List[RESULT]:
+    """
+    Check the provided file using the current thread's checker state.
+
+    A path of `-` is read from stdin & reported under the configured display name.
+    """
+    options, source_checker = _worker_state()
+    try:
+        data = read_path(path)
+    except OSError as e:
+        style_guide = source_checker.style_guide or StyleGuide(options)
+        return read_error_results(e, style_guide, display_path(path, options))
+
+    return check_source(display_path(path, options), data)
+
+
+def check_sources(
+    sources: t.Sequence[t.Tuple[str, bytes]],
+    digests: t.Optional[t.Sequence[t.Optional[str]]] = None,
+) -> ResultRecords:
+    """
+    Check a work unit of `(display path, contents)` pairs, returning their encoded results.
+
+    If provided, each source is identified by its corresponding digest (see: `check_source`).
+    """
+    if digests is None:
+        digests = [None] * len(sources)
+
+    with _unit_stats() as stats:
+        records = ResultRecords.from_results(
+            check_source(path, data, digest)
+            for (path, data), digest in zip(sources, digests, strict=True)
+        )
+
+    records.stats = stats
+    return records
+
+
+def check_files(paths: t.Sequence[str]) -> UNIT_RESULTS:
+    """
+    Check a work unit of files, returning their encoded results.
+
+    The time taken to check each file is returned along with the batch, for use by the cost model.
+    """
+    batch, durations = [], []
+    with _unit_stats() as stats:
+        for path in paths:
+            start = time.perf_counter()
+            batch.append(check_file(path))
+            durations.append(time.perf_counter() - start)
+
+    records = ResultRecords.from_results(batch)
+    records.stats = stats
+    return records, durations
+
+
+def check_project_files(project: int, paths: t.Sequence[str]) -> UNIT_RESULTS:
+    """
+    Check a work unit of files of the provided project, using the project's options.
+
+    Projects are indexed in the order their options were provided to `init_project_worker`.
+    """
+    _thread_state.project = project
+    try:
+        return check_files(paths)
+    finally:
+        _thread_state.project = 0
+
+
+def check_archive(path: str) -> ARCHIVE_RESULTS:
+    """
+    Check the Python sources inside the provided archive, returning their encoded results.
+
+    Sources are read from the archive one at a time & checked in memory (see:
+    `iter_archive_sources`), each reported as `<archive>!<member>`. If the archive can't be read, in
+    whole or in part, the error is reported for the archive as an unreadable file, after the
+    results of any sources read before the error.
+    """
+    options, source_checker = _worker_state()
+    exclude = [*getattr(options, "exclude", ()), *getattr(options, "extend_exclude", ())]
+    paths: t.List[str] = []
+    batch: t.List[t.List[RESULT]] = []
+    with _unit_stats() as stats:
+        try:
+            for member, data in iter_archive_sources(path, exclude):
+                paths.append(member_path(path, member))
+                batch.append(source_checker.check(paths[-1], data))
+        except ARCHIVE_ERRORS as e:
+            style_guide = source_checker.style_guide or StyleGuide(options)
+            paths.append(path)
+            batch.append(read_error_results(e, style_guide, path))
+
+    records = ResultRecords.from_results(batch)
+    records.stats = stats
+    return paths, records
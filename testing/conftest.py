@@ -0,0 +1,15 @@
+import pytest
+
+from flake8_annotations.checker import TypeHintChecker
+
+
+@pytest.fixture
+def restore_default_config(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Restore the checker's class-level configuration once the test completes.
+
+    Tests parsing options, directly or through an entry point's `main`, set the configuration used
+    by every checker (see: `TypeHintChecker.parse_options`); registering it with `monkeypatch`
+    undoes any such change, so modules using this fixture don't leak options into other tests.
+    """
+    monkeypatch.setattr(TypeHintChecker, "default_config", TypeHintChecker.default_config)
@@ -1,16 +1,19 @@
 from __future__ import annotations
 
 import typing as t
+from argparse import Namespace
 
 from pytest_check import check_func
 
 from flake8_annotations.ast_walker import Function, FunctionVisitor, ast
 from flake8_annotations.checker import (
+    CheckerConfig,
     FORMATTED_ERROR,
     TypeHintChecker,
     _DEFAULT_DISPATCH_DECORATORS,
     _DEFAULT_OVERLOAD_DECORATORS,
 )
+from flake8_annotations.options import build_parser
 
 
 def parse_source(src: str) -> t.Tuple[ast.Module, t.List[str]]:
@@ -38,19 +41,34 @@ def check_source(
     checker_instance = TypeHintChecker(None, lines)
 
     # Manually set flake8 configuration options, as the test suite bypasses flake8's config parser
-    checker_instance.suppress_none_returning = suppress_none_returns
-    checker_instance.suppress_dummy_args = suppress_dummy_args
-    checker_instance.allow_untyped_defs = allow_untyped_defs
-    checker_instance.allow_untyped_nested = allow_untyped_nested
-    checker_instance.mypy_init_return = mypy_init_return
-    checker_instance.allow_star_arg_any = allow_star_arg_any
-    checker_instance.respect_type_ignore = respect_type_ignore
-    checker_instance.dispatch_decorators = dispatch_decorators
-    checker_instance.overload_decorators = overload_decorators
+    checker_instance.config = CheckerConfig(
+        suppress_none_returning=suppress_none_returns,
+        suppress_dummy_args=suppress_dummy_args,
+        allow_untyped_defs=allow_untyped_defs,
+        allow_untyped_nested=allow_untyped_nested,
+        mypy_init_return=mypy_init_return,
+        allow_star_arg_any=allow_star_arg_any,
+        respect_type_ignore=respect_type_ignore,
+        dispatch_decorators=frozenset(dispatch_decorators),
+        overload_decorators=frozenset(overload_decorators),
+    )
 
     return checker_instance.run()
 
 
+def parse_options(*args: str) -> Namespace:
+    """
+    Parse the provided standalone command line arguments & set them as the checker's options.
+
+    This mirrors flake8's config parser for code paths that rely on the class-level options set by
+    `TypeHintChecker.parse_options`.
+    """
+    options = build_parser("test", "test").parse_args(args)
+    TypeHintChecker.parse_options(options)
+
+    return options
+
+
 def functions_from_source(src: str) -> t.List[Function]:
     """Helper for obtaining a list of Function objects from the provided source code."""
     tree, lines = parse_source(src)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import typing as t
+from pathlib import Path
+
+import pytest
+
+from flake8_annotations.aio import AsyncChecker, check_source
+from flake8_annotations.runner import build_runner_parser
+from flake8_annotations.source import check_lines, decode_source
+
+SOURCE = "def foo(a, *args):\n    pass\n"
+
+
+@pytest.fixture
+def checker() -> t.Iterator[AsyncChecker]:
+    checker = AsyncChecker(build_runner_parser().parse_args(["--isolated"]), jobs=2)
+    yield checker
+    checker.close()
+
+
+def test_check_source(checker: AsyncChecker) -> None:
+    expected = check_lines(decode_source(SOURCE.encode()))
+    assert len(expected) == 3
+
+    async def run() -> list[list[t.Any]]:
+        return await asyncio.gather(*(checker.check_source(SOURCE) for _ in range(20)))
+
+    assert asyncio.run(run()) == [expected] * 20
+
+
+def test_module_level_api() -> None:
+    assert len(asyncio.run(check_source(SOURCE.encode(), "mod.py"))) == 3
+
+
+def test_check_paths(checker: AsyncChecker, tmp_path: Path) -> None:
+    for idx in range(30):
+        (tmp_path / f"mod_{idx:02}.py").write_text(SOURCE if idx % 2 else "x = 1\n")
+
+    missing = str(tmp_path / "missing.py")
+
+    async def run() -> list[tuple[str, t.Sequence[t.Any]]]:
+        return [item async for item in checker.check_paths([str(tmp_path), missing])]
+
+    results = dict(asyncio.run(run()))
+    assert list(results) == sorted(
+        [*(str(tmp_path / f"mod_{idx:02}.py") for idx in range(30)), missing]
+    )
+    assert results.pop(missing)[0][2].startswith("E902 FileNotFoundError")
+    assert [len(file_results) for file_results in results.values()] == [0, 3] * 15
+
+
+def test_timeout(checker: AsyncChecker, tmp_path: Path) -> None:
+    (tmp_path / "mod.py").write_text(SOURCE)
+
+    async def run() -> None:
+        async for _ in checker.check_paths([str(tmp_path)], timeout=0):
+            pass
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(checker.check_source(SOURCE, timeout=0))
+
+    # The shared pool is still usable by subsequent requests
+    assert len(asyncio.run(checker.check_source(SOURCE))) == 3
+
+
+def test_cancellation(checker: AsyncChecker) -> None:
+    async def run() -> list[t.Any]:
+        tasks = [asyncio.ensure_future(checker.check_source(SOURCE)) for _ in range(20)]
+        await asyncio.sleep(0)
+        for task in tasks[::2]:
+            task.cancel()
+
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    outcomes = asyncio.run(run())
+    assert all(isinstance(outcome, asyncio.CancelledError) for outcome in outcomes[::2])
+    assert all(len(outcome) == 3 for outcome in outcomes[1::2])
+    assert len(asyncio.run(checker.check_source(SOURCE))) == 3
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import io
+import tarfile
+import typing as t
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from flake8_annotations.archives import ARCHIVE_ERRORS, is_source_member, iter_archive_sources
+
+MEMBERS = {
+    "pkg/__init__.py": b"",
+    "pkg/mod.py": b"def foo(a):\n    pass\n",
+    "pkg/mod.pyi": b"def foo(a): ...\n",
+    "pkg/__pycache__/mod.py": b"",
+    "pkg/data.json": b"{}",
+}
+SOURCES = ["pkg/__init__.py", "pkg/mod.py", "pkg/mod.pyi"]
+
+
+def write_zip(path: Path, members: dict[str, bytes]) -> Path:
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("pkg/", "")
+        for name, data in members.items():
+            archive.writestr(name, data)
+
+    return path
+
+
+def write_tarball(path: Path, members: dict[str, bytes]) -> Path:
+    with tarfile.open(path, "w:gz") as tarball:
+        tarball.addfile(tarfile.TarInfo("pkg"), None)
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tarball.addfile(info, io.BytesIO(data))
+
+    return path
+
+
+MEMBER_CASES = (
+    ("pkg/mod.py", True),
+    ("pkg/mod.pyi", True),
+    ("pkg/mod.pyc", False),
+    ("pkg/.tox/mod.py", False),
+    ("pkg/__pycache__/mod.py", False),
+)
+
+
+@pytest.mark.parametrize(("name", "expected"), MEMBER_CASES)
+def test_is_source_member(name: str, expected: bool) -> None:
+    assert is_source_member(name, (".tox", "__pycache__")) == expected
+
+
+@pytest.mark.parametrize(
+    ("name", "write"),
+    (("dist.whl", write_zip), ("dist.zip", write_zip), ("dist.tar.gz", write_tarball)),
+)
+def test_iter_archive_sources(tmp_path: Path, name: str, write: t.Any) -> None:
+    archive = write(tmp_path / name, MEMBERS)
+    sources = list(iter_archive_sources(str(archive)))
+    assert sources == [(member, MEMBERS[member]) for member in SOURCES]
+
+
+def test_truncated_tarball(tmp_path: Path) -> None:
+    archive = write_tarball(tmp_path / "dist.tar.gz", {"big.py": b"a = 1\n" * 100_000})
+    archive.write_bytes(archive.read_bytes()[:-64])
+
+    with pytest.raises(ARCHIVE_ERRORS):
+        list(iter_archive_sources(str(archive)))
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from flake8_annotations.baseline import main, save_baseline
+from flake8_annotations.checker import (
+    CheckerConfig,
+    TypeHintChecker,
+    iter_baseline_entries,
+    load_baseline,
+)
+from testing.helpers import parse_source
+
+pytestmark = pytest.mark.usefixtures("restore_default_config")
+
+SAMPLE_SRC = dedent("""\
+    class Foo:
+        def bar(self, a: int, b):
+            pass
+
+    def baz(a):
+        pass
+    """)
+
+
+def fingerprints(src: str, filename: str = "mod.py") -> list[str]:
+    _, lines = parse_source(src)
+    checker_instance = TypeHintChecker(None, lines, filename)
+    return [
+        checker_instance.fingerprint(function, error)
+        for function, error in checker_instance.iter_errors()
+    ]
+
+
+def test_fingerprint_ignores_line_numbers() -> None:
+    shifted = f"import os\n\n\n{SAMPLE_SRC}"
+    assert fingerprints(shifted) == fingerprints(SAMPLE_SRC)
+
+
+def test_fingerprint_ignores_annotation_changes() -> None:
+    annotated = SAMPLE_SRC.replace("a: int, b", "a, b: int")
+    assert fingerprints(annotated)[-1] == fingerprints(SAMPLE_SRC)[-1]
+
+
+def test_fingerprint_is_unique() -> None:
+    sample_fingerprints = fingerprints(SAMPLE_SRC)
+    assert len(set(sample_fingerprints)) == len(sample_fingerprints)
+
+
+def test_fingerprint_depends_on_path_and_signature() -> None:
+    assert fingerprints(SAMPLE_SRC, "other.py") != fingerprints(SAMPLE_SRC)
+
+    renamed_arg = SAMPLE_SRC.replace("def baz(a)", "def baz(c)")
+    assert fingerprints(renamed_arg)[-2:] != fingerprints(SAMPLE_SRC)[-2:]
+
+
+def test_baseline_suppresses_errors() -> None:
+    accepted = fingerprints(SAMPLE_SRC)[:2]
+
+    _, lines = parse_source(SAMPLE_SRC)
+    checker_instance = TypeHintChecker(None, lines, "mod.py")
+    checker_instance.config = CheckerConfig(baseline=frozenset(accepted))
+    errors = list(checker_instance.run())
+    assert len(errors) == len(fingerprints(SAMPLE_SRC)) - 2
+
+
+def test_baseline_roundtrip(tmp_path: Path) -> None:
+    baseline_file = tmp_path / "baseline.txt"
+    save_baseline(baseline_file, {"c": "pkg/b.py", "b": "pkg/a.py", "a": "pkg/b.py", "d": None})
+
+    assert baseline_file.read_text().splitlines()[1:] == [
+        "d",
+        "b pkg/a.py",
+        "a pkg/b.py",
+        "c pkg/b.py",
+    ]
+    assert load_baseline(baseline_file) == {"a", "b", "c", "d"}
+    assert dict(iter_baseline_entries(baseline_file)) == {
+        "a": "pkg/b.py",
+        "b": "pkg/a.py",
+        "c": "pkg/b.py",
+        "d": None,
+    }
+
+
+def test_create_and_prune(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    Path("mod.py").write_text(SAMPLE_SRC)
+
+    main(["create", "--baseline", "baseline.txt", "."])
+    created = load_baseline("baseline.txt")
+    assert created == set(fingerprints(SAMPLE_SRC, "./mod.py"))
+
+    Path("mod.py").write_text(SAMPLE_SRC.replace("def baz(a):", "def baz(a: int) -> None:"))
+    main(["prune", "--baseline", "baseline.txt", "."])
+    assert load_baseline("baseline.txt") == created - set(fingerprints(SAMPLE_SRC)[-2:])
+
+
+def test_create_reads_config_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    any_src = "from typing import Any\n\ndef foo(a: Any) -> None:\n    pass\n"
+    Path("mod.py").write_text(any_src)
+    Path("vendor").mkdir()
+    Path("vendor/lib.py").write_text(SAMPLE_SRC)
+    Path("script.pyi").write_text(SAMPLE_SRC)
+    Path(".flake8").write_text(
+        "[flake8]\nextend-select = ANN401\nextend-exclude = vendor\nfilename = *.py,*.pyi\n"
+    )
+
+    main(["create", "--baseline", "baseline.txt"])
+    assert load_baseline("baseline.txt") == {
+        *fingerprints(any_src, "mod.py"),
+        *fingerprints(SAMPLE_SRC, "script.pyi"),
+    }
+
+    # ANN401 is ignored by default
+    main(["create", "--baseline", "baseline.txt", "--isolated"])
+    assert load_baseline("baseline.txt") == set(fingerprints(SAMPLE_SRC, "vendor/lib.py"))
+
+
+def test_prune_subset_of_paths(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    Path("pkg").mkdir()
+    for name in ("pkg/a.py", "pkg/b.py", "c.py"):
+        Path(name).write_text(SAMPLE_SRC)
+
+    main(["create", "--baseline", "baseline.txt"])
+    created = load_baseline("baseline.txt")
+    assert len(created) == 3 * len(fingerprints(SAMPLE_SRC))
+
+    # Only the entries of the checked file are pruned, though the other file was also fixed
+    fixed_src = SAMPLE_SRC.replace("def baz(a):", "def baz(a: int) -> None:")
+    Path("pkg/a.py").write_text(fixed_src)
+    Path("pkg/b.py").write_text(fixed_src)
+    main(["prune", "--baseline", "baseline.txt", "pkg/a.py"])
+    pruned = created - set(fingerprints(SAMPLE_SRC, "pkg/a.py")[-2:])
+    assert load_baseline("baseline.txt") == pruned
+
+    # Entries of deleted files are pruned along with the rest of the checked directory
+    Path("pkg/b.py").unlink()
+    main(["prune", "--baseline", "baseline.txt", "pkg"])
+    assert load_baseline("baseline.txt") == pruned - set(fingerprints(SAMPLE_SRC, "pkg/b.py"))
@@ -1,3 +1,5 @@
+import subprocess
+import sys
 from typing import Tuple
 
 import pytest
@@ -95,3 +97,11 @@ class TestArgumentClassifier:
         """Test missing argument annotation error codes."""
         test_function, test_argument, error_object = function_builder
         assert isinstance(classify_error(test_function, test_argument), error_object)
+
+
+@pytest.mark.parametrize("module", ("error_codes", "checker"))
+def test_import_order(module: str) -> None:
+    """The checker & its error codes import each other, so either can be imported first."""
+    subprocess.run(
+        [sys.executable, "-c", f"import flake8_annotations.{module}"], check=True, timeout=60
+    )
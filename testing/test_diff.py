@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from flake8_annotations.ast_walker import Function, FunctionStub, FunctionVisitor
+from flake8_annotations.checker import TypeHintChecker
+from flake8_annotations.diff import (
+    check_line_range,
+    git_changed_ranges,
+    main,
+    parse_unified_diff,
+)
+from testing.helpers import functions_from_source, parse_options, parse_source
+
+pytestmark = pytest.mark.usefixtures("restore_default_config")
+
+SAMPLE_DIFF = dedent("""\
+    diff --git a/pkg/mod.py b/pkg/mod.py
+    index 0000000..1111111 100644
+    --- a/pkg/mod.py
+    +++ b/pkg/mod.py
+    @@ -3,0 +4,2 @@ def foo():
+    +def bar(a):
+    +    pass
+    @@ -10,2 +12 @@ def baz():
+    --- a double dash line being removed
+    -    pass
+    +    return
+    @@ -20 +20,0 @@
+    -removed = True
+    diff --git a/pkg/new.py b/pkg/new.py
+    new file mode 100644
+    --- /dev/null
+    +++ b/pkg/new.py
+    @@ -0,0 +1,2 @@
+    +def new(a):
+    +    pass
+    diff --git a/pkg/gone.py b/pkg/gone.py
+    deleted file mode 100644
+    --- a/pkg/gone.py
+    +++ /dev/null
+    @@ -1 +0,0 @@
+    -def gone(a): ...
+    """)
+
+
+def test_parse_unified_diff() -> None:
+    changed = parse_unified_diff(SAMPLE_DIFF)
+
+    assert changed == {
+        "pkg/mod.py": [(4, 5), (11, 12), (20, 21)],
+        "pkg/new.py": [(1, 2)],
+    }
+
+
+def test_parse_unified_diff_strip() -> None:
+    changed = parse_unified_diff(SAMPLE_DIFF, strip=2)
+    assert set(changed) == {"mod.py", "new.py"}
+
+
+RANGE_SRC = dedent("""\
+    def outside(a):
+        pass
+
+    def inside(a):
+        def nested_outside(b):
+            pass
+
+        pass
+    """)
+
+
+def test_visitor_only_parses_overlapping_functions() -> None:
+    tree, lines = parse_source(RANGE_SRC)
+    checker_instance = TypeHintChecker(tree, lines)
+    checker_instance.line_ranges = [(8, 8)]
+
+    # Only the def enclosing line 8 is checked; the nested def doesn't overlap line 8
+    errors = {
+        message.split("'")[1] for _, _, message, _ in checker_instance.run() if "'" in message
+    }
+    assert errors == {"a"}
+
+
+def test_visitor_stubs_functions_outside_ranges() -> None:
+    tree, lines = parse_source(RANGE_SRC)
+    visitor = FunctionVisitor(lines, [(8, 8)])
+    visitor.visit(tree)
+
+    function_types = [type(function) for function in visitor.function_definitions]
+    assert function_types == [FunctionStub, Function, FunctionStub]
+    assert visitor.function_definitions[2].is_nested
+
+    unrestricted = [type(function) for function in functions_from_source(RANGE_SRC)]
+    assert unrestricted == [Function, Function, Function]
+
+
+def test_check_line_range() -> None:
+    results = check_line_range(RANGE_SRC, 1, 2)
+    assert [lineno for lineno, _, _ in results] == [1, 1]
+
+
+OVERLOAD_SRC = dedent("""\
+    from typing import overload
+
+    @overload
+    def foo(a: int) -> int:
+        ...
+
+    def foo(a):
+        ...
+    """)
+
+
+def test_check_line_range_respects_overload_series() -> None:
+    assert check_line_range(OVERLOAD_SRC, 7, 8) == []
+
+
+def test_check_line_range_respects_module_type_ignore() -> None:
+    parse_options("--respect-type-ignore")
+    src = "# type: ignore\n\ndef foo(a):\n    pass\n"
+    assert check_line_range(src, 3, 4) == []
+
+
+def test_function_stub_from_node() -> None:
+    tree, _ = parse_source("def untyped(a):\n    pass\n\ndef typed(*, b: int): ...\n")
+    untyped_stub = FunctionStub.from_function_node(tree.body[0])  # type: ignore[arg-type]
+    typed_stub = FunctionStub.from_function_node(tree.body[1])  # type: ignore[arg-type]
+
+    assert untyped_stub.name == "untyped"
+    assert untyped_stub.is_dynamically_typed()
+    assert not typed_stub.is_dynamically_typed()
+
+
+def test_git_changed_ranges(tmp_path: Path) -> None:
+    def git(*args: str) -> None:
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git("init", "-q")
+    (tmp_path / "mod.py").write_text("def foo(a: int) -> int:\n    return a\n")
+    git("add", "mod.py")
+    git("-c", "user.name=test", "-c", "user.email=test@test", "commit", "-qm", "init")
+    (tmp_path / "mod.py").write_text(
+        "def foo(a: int) -> int:\n    return a\n\ndef bar(b):\n    pass\n"
+    )
+
+    assert git_changed_ranges("HEAD", cwd=tmp_path) == {"mod.py": [(3, 5)]}
+
+
+def test_main_benchmark(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text("def foo(a):\n    pass\n\ndef bar(a):\n    pass\n")
+    (tmp_path / "pkg" / "new.py").write_text("def new(a):\n    pass\n")
+    diff_file = tmp_path / "changes.diff"
+    diff_file.write_text(SAMPLE_DIFF)
+    monkeypatch.chdir(tmp_path)
+
+    assert main(("--diff", str(diff_file), "--select=ANN001", "--benchmark")) == 1
+    assert capsys.readouterr().out.splitlines() == [
+        "pkg/mod.py:4:9: ANN001 Missing type annotation for function argument 'a'",
+        "pkg/new.py:1:9: ANN001 Missing type annotation for function argument 'a'",
+        "2 files checked, 2 distinct contents analyzed; deduplication skipped 0 files (0 bytes)",
+    ]
+
+
+def test_main_reads_config_file(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text("def foo(a):\n    pass\n\ndef bar(a):\n    pass\n")
+    (tmp_path / "pkg" / "new.py").write_text("def new(a):\n    pass\n")
+    (tmp_path / ".flake8").write_text("[flake8]\nextend-ignore = ANN201\n")
+    diff_file = tmp_path / "changes.diff"
+    diff_file.write_text(SAMPLE_DIFF)
+    monkeypatch.chdir(tmp_path)
+
+    assert main(("--diff", str(diff_file))) == 1
+    output = capsys.readouterr().out.splitlines()
+    assert output == [
+        "pkg/mod.py:4:9: ANN001 Missing type annotation for function argument 'a'",
+        "pkg/new.py:1:9: ANN001 Missing type annotation for function argument 'a'",
+    ]
+
+    assert main(("--diff", str(diff_file), "--isolated")) == 1
+    assert capsys.readouterr().out.splitlines() == [
+        *output[:1],
+        "pkg/mod.py:4:11: ANN201 Missing return type annotation for public function",
+        *output[1:],
+        "pkg/new.py:1:11: ANN201 Missing return type annotation for public function",
+    ]
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import typing as t
+from pathlib import Path
+
+import pytest
+
+from flake8_annotations import environment
+from flake8_annotations.environment import find_distributions, main, parse_record
+from flake8_annotations.source import CountsCache
+from testing.helpers import parse_options
+
+pytestmark = pytest.mark.usefixtures("restore_default_config")
+
+MODULES = {
+    "pkg/__init__.py": "",
+    "pkg/mod.py": "def foo(a, b: int):\n    pass\n",
+    "pkg/stub.pyi": "def bar(a) -> None: ...\n",
+}
+
+
+def install(site: Path, name: str, version: str, modules: dict[str, str]) -> Path:
+    """Install a distribution of the provided modules into the site directory."""
+    dist_info = site / f"{name}-{version}.dist-info"
+    dist_info.mkdir(parents=True)
+    (dist_info / "METADATA").write_text(
+        f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n"
+    )
+
+    record = []
+    for path, src in modules.items():
+        (site / path).parent.mkdir(parents=True, exist_ok=True)
+        (site / path).write_text(src)
+        record.append(f"{path},sha256=x,{len(src)}")
+
+    record.extend(
+        (f"{dist_info.name}/METADATA,,", "../../../bin/tool,,", f"{dist_info.name}/RECORD,,")
+    )
+    (dist_info / "RECORD").write_text("\n".join(record) + "\n")
+    return dist_info
+
+
+@pytest.fixture
+def site(tmp_path: Path) -> t.Iterator[Path]:
+    site = tmp_path / "site-packages"
+    install(site, "pkg", "1.0", MODULES)
+    install(site, "Other_Dist", "2.0", {"other.py": "def baz() -> None:\n    pass\n"})
+    yield site
+
+
+def test_parse_record() -> None:
+    record = 'pkg/mod.py,sha256=x,10\n"pkg/a,b.py",sha256=y,\npkg/data.json,,\n../../bin/x.py,,\n'
+    assert list(parse_record(record)) == [("pkg/mod.py", 10), ("pkg/a,b.py", 0)]
+
+
+def test_find_distributions(site: Path) -> None:
+    distributions = find_distributions([str(site)])
+    assert [dist.name for dist in distributions] == ["Other_Dist", "pkg"]
+    assert distributions[1].modules == [str(site / path) for path in MODULES]
+    assert distributions[1].cache_key.startswith("pkg==1.0#")
+
+
+@pytest.mark.parametrize("jobs", ("1", "2"))
+def test_environment_audit(
+    site: Path,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+    monkeypatch: pytest.MonkeyPatch,
+    jobs: str,
+) -> None:
+    args = (
+        "--isolated",
+        "--path",
+        str(site),
+        "--cache-file",
+        str(tmp_path / "cache.json"),
+        "-j",
+        jobs,
+    )
+    main(args)
+    output = capsys.readouterr().out.splitlines()
+    assert output == [
+        "Other_Dist 2.0: 1 modules, 0 errors",
+        "pkg 1.0: 3 modules, 3 errors (ANN001=2 ANN201=1)",
+        "2 distributions, 2 checked (4 modules), 0 reused from the cache",
+    ]
+
+    # Unchanged distributions aren't checked again
+    monkeypatch.setattr(environment, "count_errors", None)
+    main(args)
+    assert capsys.readouterr().out.splitlines() == [
+        *output[:2],
+        "2 distributions, 0 checked (0 modules), 2 reused from the cache",
+    ]
+
+
+def test_main_reads_config_file(
+    site: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (tmp_path / ".flake8").write_text("[flake8]\nextend-ignore = ANN201\n")
+    monkeypatch.chdir(tmp_path)
+    main(("--path", str(site), "-j", "1"))
+
+    output = capsys.readouterr().out.splitlines()
+    assert output[1] == "pkg 1.0: 3 modules, 2 errors (ANN001=2)"
+
+
+def test_changed_record_invalidates_cache(site: Path, tmp_path: Path) -> None:
+    cache = CountsCache("options")
+    distributions = find_distributions([str(site)])
+    environment.audit_distributions(distributions, parse_options(), cache)
+
+    record = site / "pkg-1.0.dist-info" / "RECORD"
+    record.write_text(record.read_text().replace("sha256=x", "sha256=y", 1))
+    changed = find_distributions([str(site)])
+    assert changed[0].cache_key in cache.counts
+    assert changed[1].cache_key not in cache.counts
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import subprocess
+import typing as t
+from pathlib import Path
+
+import pytest
+
+from flake8_annotations.gitobjects import (
+    Blob,
+    BlobFilter,
+    CatFile,
+    index_blobs,
+    range_blobs,
+    revision_blobs,
+)
+
+
+def git(repo: Path, *args: str) -> str:
+    p = subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@test", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+        encoding="utf-8",
+    )
+    return p.stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    git(tmp_path, "init", "-q")
+    for name, src in {"a.py": "a = 1\n", "pkg/b.py": "b = 2\n", "pkg/same.py": "a = 1\n"}.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(src)
+
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-qm", "init")
+    return tmp_path
+
+
+def _paths(entries: t.Iterable[t.Tuple[str, Blob]]) -> list[str]:
+    return [blob.path for _, blob in entries]
+
+
+def test_revision_blobs(repo: Path) -> None:
+    (repo / "a.py").write_text("changed = True\n")
+    entries = list(revision_blobs("HEAD", cwd=repo))
+    assert _paths(entries) == ["a.py", "pkg/b.py", "pkg/same.py"]
+
+    # Blobs of identical contents share an object name, & so a digest
+    blobs = {blob.path: blob for _, blob in entries}
+    assert blobs["a.py"].digest == blobs["pkg/same.py"].digest
+    assert blobs["a.py"].object_name == git(repo, "rev-parse", "HEAD:a.py")
+    assert _paths(revision_blobs("HEAD", ["pkg"], cwd=repo)) == ["pkg/b.py", "pkg/same.py"]
+
+
+def test_index_blobs(repo: Path) -> None:
+    (repo / "a.py").write_text("staged = True\n")
+    (repo / "new.py").write_text("")
+    git(repo, "add", "a.py", "new.py")
+    (repo / "a.py").write_text("unstaged = True\n")
+
+    blobs = {blob.path: blob for _, blob in index_blobs(cwd=repo)}
+    assert sorted(blobs) == ["a.py", "new.py", "pkg/b.py", "pkg/same.py"]
+    with CatFile(repo) as cat_file:
+        ((_, data),) = cat_file.iter_contents([blobs["a.py"]])
+
+    assert data == b"staged = True\n"
+
+
+def test_range_blobs(repo: Path) -> None:
+    old = git(repo, "rev-parse", "HEAD")
+    (repo / "pkg" / "b.py").write_text("b = 3\n")
+    (repo / "c.py").write_text("c = 3\n")
+    git(repo, "rm", "-q", "a.py")
+    git(repo, "add", ".")
+    git(repo, "commit", "-qm", "change")
+
+    assert _paths(range_blobs(f"{old}..HEAD", cwd=repo)) == ["c.py", "pkg/b.py"]
+    assert _paths(range_blobs(f"{'0' * 40}..HEAD", cwd=repo)) == [
+        "c.py",
+        "pkg/b.py",
+        "pkg/same.py",
+    ]
+    with pytest.raises(ValueError):
+        range_blobs("HEAD", cwd=repo)
+
+
+def test_cat_file_streams_contents(repo: Path) -> None:
+    blobs = [blob for _, blob in revision_blobs("HEAD", cwd=repo)] * 1000
+    with CatFile(repo) as cat_file:
+        contents = [data for _, data in cat_file.iter_contents(iter(blobs))]
+        assert contents == [b"a = 1\n", b"b = 2\n", b"a = 1\n"] * 1000
+
+        # The same process serves later requests
+        assert [data for _, data in cat_file.iter_contents(blobs[1:2])] == [b"b = 2\n"]
+
+
+def test_cat_file_abandoned(repo: Path) -> None:
+    blobs = [blob for _, blob in revision_blobs("HEAD", cwd=repo)] * 10_000
+    with CatFile(repo) as cat_file:
+        contents = cat_file.iter_contents(blobs)
+        next(contents)
+        contents.close()
+
+        assert cat_file.process.poll() is not None
+
+
+def test_cat_file_missing_object(repo: Path) -> None:
+    with CatFile(repo) as cat_file:
+        with pytest.raises(LookupError):
+            list(cat_file.iter_contents([Blob("gone.py", "1" * 40)]))
+
+
+def test_blob_filter() -> None:
+    entries = [
+        ("100644", Blob("mod.py", "1")),
+        ("100755", Blob("pkg/script.py", "2")),
+        ("120000", Blob("link.py", "3")),
+        ("100644", Blob("notes.txt", "4")),
+        ("100644", Blob("pkg/__pycache__/mod.py", "5")),
+        ("100644", Blob("build/gen.py", "6")),
+        ("100644", Blob("bin/tool", "7")),
+    ]
+    selected = BlobFilter(("__pycache__", "build"), explicit_paths=["./bin/tool"])(entries)
+    assert [blob.path for blob in selected] == ["mod.py", "pkg/script.py", "bin/tool"]
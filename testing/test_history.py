@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import subprocess
+import typing as t
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from flake8_annotations import runner
+from flake8_annotations.history import coverage_trend, list_history, main
+from flake8_annotations.source import CountsCache
+from testing.helpers import parse_options
+
+pytestmark = pytest.mark.usefixtures("restore_default_config")
+
+# Files written (or deleted, for `None`) by each commit
+COMMITS: t.List[t.Dict[str, t.Optional[str]]] = [
+    {"a.py": "def a(x):\n    pass\n", "pkg/b.py": "def b(x, y) -> None:\n    pass\n"},
+    {"a.py": "def a(x: int):\n    pass\n", "pkg/c.py": "def b(x, y) -> None:\n    pass\n"},
+    {"pkg/b.py": None, "notes.txt": "def not_python(x):\n"},
+    {},
+    {"pkg/b.py": "def b(x):\n    pass\n", "pkg/c.py": None},
+]
+
+
+def git(repo: Path, *args: str) -> str:
+    p = subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@test", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+        encoding="utf-8",
+    )
+    return p.stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> t.Iterator[Path]:
+    git(tmp_path, "init", "-q")
+    for idx, files in enumerate(COMMITS):
+        for name, src in files.items():
+            path = tmp_path / name
+            if src is None:
+                path.unlink()
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(src)
+
+        git(tmp_path, "add", "-A")
+        git(tmp_path, "commit", "-qm", f"commit {idx}", "--allow-empty")
+
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+
+
+def _revision_counts(revision: str, capsys: pytest.CaptureFixture[str]) -> dict[str, int]:
+    runner.main(("-j", "1", "--isolated", "--exit-zero", f"--git-rev={revision}"))
+    lines = capsys.readouterr().out.splitlines()
+    return dict(Counter(line.split(": ", 1)[1].split()[0] for line in lines))
+
+
+@pytest.mark.parametrize("max_count", (len(COMMITS), 2))
+def test_coverage_trend_matches_revisions(
+    repo: Path, capsys: pytest.CaptureFixture[str], max_count: int
+) -> None:
+    commits = list_history("HEAD", max_count)
+    assert len(commits) == max_count
+
+    cache = CountsCache("options")
+    trend = coverage_trend(commits, parse_options(), cache)
+    assert [point.commit for point in trend] == [commit.object_name for commit in commits]
+    for point in trend:
+        assert point.counts == _revision_counts(point.commit, capsys)
+
+
+def test_blobs_checked_once(repo: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    cache_file = str(repo / "cache.json")
+    main(("-j", "1", "--cache-file", cache_file))
+    captured = capsys.readouterr()
+    rows = captured.out.splitlines()
+    assert rows[0] == "commit,date,total,ANN001,ANN201"
+    assert [row.split(",")[2:] for row in rows[1:]] == [
+        ["4", "3", "1"],
+        ["5", "4", "1"],
+        ["3", "2", "1"],
+        ["3", "2", "1"],
+        ["3", "1", "2"],
+    ]
+
+    # `pkg/c.py` has the same contents as the first `pkg/b.py`
+    assert "4 blobs checked, 0 reused" in captured.err
+
+    main(("-j", "1", "--cache-file", cache_file))
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == rows
+    assert "0 blobs checked, 4 reused" in captured.err
+
+
+def test_main_reads_config_file(repo: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    (repo / ".flake8").write_text("[flake8]\nextend-ignore = ANN201\nextend-exclude = pkg\n")
+    main(("-j", "1", "--cache-file", str(repo / "cache.json")))
+
+    rows = capsys.readouterr().out.splitlines()
+    assert rows[0] == "commit,date,total,ANN001"
+    assert [row.split(",")[2:] for row in rows[1:]] == [["1", "1"], *[["0", "0"]] * 4]
+
+
+@pytest.mark.parametrize("config", (True, False))
+def test_per_file_ignores_rejected(repo: Path, config: bool) -> None:
+    if config:
+        (repo / ".flake8").write_text("[flake8]\nper-file-ignores = a.py:ANN001\n")
+        args: tuple[str, ...] = ("-j", "1")
+    else:
+        args = ("-j", "1", "--per-file-ignores=a.py:ANN001")
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(args)
+
+    assert exc_info.value.code == 2
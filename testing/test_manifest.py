@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import typing as t
+from pathlib import Path
+
+import pytest
+
+from flake8_annotations import runner
+from flake8_annotations.manifest import (
+    Project,
+    load_manifest,
+    main,
+    parse_project,
+    plan_work_units,
+)
+from testing.helpers import parse_options
+
+pytestmark = pytest.mark.usefixtures("restore_default_config")
+
+SOURCES = {
+    "pkg/mod.py": "def foo(a, *args, **kwargs):\n    pass\n",
+    "pkg/dummy.py": "def dummy(_) -> None:\n    pass\n",
+    "pkg/sub/nested.py": "def nested(a):\n    pass\n",
+}
+
+# Each project is checked with its own configuration file & arguments
+PROJECTS = {
+    "services/api": ("", ["--select=ANN"]),
+    "services/billing": (
+        "[flake8]\nextend-exclude = pkg/sub\nsuppress_dummy_args = true\nextend-ignore = ANN002\n",
+        ["--select=ANN", "pkg"],
+    ),
+    "tools": ("[flake8]\nsuppress-none-returning = true\n", ["--select=ANN,E9", "pkg/mod.py"]),
+}
+
+
+@pytest.fixture
+def manifest(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> t.Iterator[Path]:
+    for root, (config, _) in PROJECTS.items():
+        for name, src in SOURCES.items():
+            path = tmp_path / root / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(src)
+
+        if config:
+            (tmp_path / root / ".flake8").write_text(config)
+
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(
+        json.dumps([{"root": root, "args": args} for root, (_, args) in PROJECTS.items()])
+    )
+
+    monkeypatch.chdir(tmp_path)
+    yield manifest
+
+
+def _project_output(
+    root: str,
+    args: t.Sequence[str],
+    capsys: pytest.CaptureFixture[str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> list[str]:
+    """Check the project with the standalone runner, from its root directory."""
+    with monkeypatch.context() as m:
+        m.chdir(root)
+        runner.main(("-j", "1", *args))
+
+    return [
+        f"{root}/{line[2:] if line.startswith('./') else line}"
+        for line in capsys.readouterr().out.splitlines()
+    ]
+
+
+@pytest.mark.parametrize("jobs", ("1", "2"))
+def test_output_matches_runner(
+    manifest: Path,
+    capsys: pytest.CaptureFixture[str],
+    monkeypatch: pytest.MonkeyPatch,
+    jobs: str,
+) -> None:
+    exit_code = main(("-j", jobs, "--chunk-bytes=0", manifest.name))
+    captured = capsys.readouterr()
+    assert exit_code == 1
+
+    expected = [
+        line
+        for root, (_, args) in PROJECTS.items()
+        for line in _project_output(root, args, capsys, monkeypatch)
+    ]
+    assert captured.out.splitlines() == expected
+    assert captured.err.splitlines() == [
+        "services/api: 3 files, 7 errors",
+        "services/billing: 2 files, 3 errors",
+        "tools: 1 files, 3 errors",
+    ]
+
+
+def test_plan_work_units_interleaves_projects(tmp_path: Path) -> None:
+    small = Project("small", "small", parse_options(), ["a.py", "b.py"], [10, 10])
+    large = Project("large", "large", parse_options(), ["c.py", "d.py", "e.py"], [100, 5000, 50])
+    units = plan_work_units([small, large], chunk_bytes=0)
+    assert [(unit.project, unit.files) for unit in units] == [
+        (1, ["d.py"]),
+        (1, ["c.py"]),
+        (1, ["e.py"]),
+        (0, ["a.py"]),
+        (0, ["b.py"]),
+    ]
+
+
+def test_parse_project_relative_to_root(manifest: Path) -> None:
+    project = parse_project("billing", "services/billing", ["pkg"])
+    assert project.options.paths == ["services/billing/pkg"]
+    assert project.options.suppress_dummy_args
+    assert project.options.extend_exclude == [str(manifest.parent / "services/billing/pkg/sub")]
+
+    project = parse_project("billing", "services/billing", ["--extend-exclude=pkg/dummy.py"])
+    assert project.options.paths == ["services/billing"]
+    assert project.options.extend_exclude == [
+        str(manifest.parent / "services/billing/pkg/dummy.py")
+    ]
+
+
+@pytest.mark.parametrize(
+    "contents",
+    ({"root": "a"}, [{"args": []}], [{"root": "a", "args": "--select=ANN"}], [{"root": 1}]),
+)
+def test_invalid_manifest(tmp_path: Path, contents: t.Any) -> None:
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps(contents))
+    with pytest.raises(ValueError):
+        load_manifest(manifest)
+
+
+def test_manifest_roots_relative_to_manifest(tmp_path: Path) -> None:
+    manifest = tmp_path / "config" / "manifest.json"
+    manifest.parent.mkdir()
+    manifest.write_text(json.dumps([{"root": "../api", "name": "api"}, {"root": "."}]))
+    assert load_manifest(manifest) == [
+        ("api", str(tmp_path / "api"), []),
+        (".", str(tmp_path / "config"), []),
+    ]
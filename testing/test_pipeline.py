@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import argparse
+import typing as t
+from pathlib import Path
+
+import pytest
+
+from flake8_annotations.pipeline import CheckPipeline, UNITS_PER_JOB
+from flake8_annotations.runner import build_runner_parser
+
+
+@pytest.fixture
+def source_files(tmp_path: Path) -> list[str]:
+    paths = []
+    for idx in range(20):
+        path = tmp_path / f"mod_{idx:02}.py"
+        path.write_text(f"def foo_{idx}(a):\n    pass\n" if idx % 2 else "x = 1\n")
+        paths.append(str(path))
+
+    return paths
+
+
+@pytest.fixture
+def options() -> t.Iterator[argparse.Namespace]:
+    yield build_runner_parser().parse_args([])
+
+
+@pytest.mark.parametrize("chunk_bytes", (0, 2048))
+@pytest.mark.parametrize("jobs", (1, 2))
+def test_results_in_input_order(
+    source_files: list[str], options: argparse.Namespace, jobs: int, chunk_bytes: int
+) -> None:
+    pipeline = CheckPipeline(options, jobs, queue_size=4, chunk_bytes=chunk_bytes)
+    results = list(pipeline.run(reversed(source_files)))
+
+    assert [path for path, _ in results] == source_files[::-1]
+    assert [len(file_results) for _, file_results in results] == [
+        2 if idx % 2 else 0 for idx in reversed(range(20))
+    ]
+
+
+def test_unreadable_file_reported(tmp_path: Path, options: argparse.Namespace) -> None:
+    missing = str(tmp_path / "missing.py")
+    present = tmp_path / "present.py"
+    present.write_text("def foo(a):\n    pass\n")
+    results = list(CheckPipeline(options, 1).run([missing, str(present)]))
+
+    assert [path for path, _ in results] == [missing, str(present)]
+    assert results[0][1][0][2].startswith("E902 FileNotFoundError")
+    assert len(results[1][1]) == 2
+
+
+def test_back_pressure(source_files: list[str], options: argparse.Namespace) -> None:
+    n_queued = 0
+
+    def iter_paths() -> t.Iterator[str]:
+        nonlocal n_queued
+        for path in source_files:
+            n_queued += 1
+            yield path
+
+    results = CheckPipeline(options, 1, queue_size=4, chunk_bytes=0).run(iter_paths())
+    next(results)
+    # Only the files read ahead, the work units in flight, and the file waiting for space in the
+    # queue have been consumed
+    assert n_queued == 4 + UNITS_PER_JOB + 1
+
+    assert len(list(results)) == 19
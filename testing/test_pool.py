@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import signal
+import time
+import typing as t
+from pathlib import Path
+
+import pytest
+
+from flake8_annotations import pool, worker
+from flake8_annotations.pool import BrokenWorkerError, RecyclingPool, _Worker, rss_bytes
+from flake8_annotations.runner import build_runner_parser, check_units
+
+
+def _pid(_: int) -> int:
+    return os.getpid()
+
+
+def _crash_once(marker: str) -> int:
+    # Die on the first attempt only; the marker file records the attempt across processes
+    if not os.path.exists(marker):
+        Path(marker).touch()
+        os._exit(1)
+
+    return os.getpid()
+
+
+def _crash(_: int) -> int:
+    os._exit(1)
+
+
+def _hog_memory_once(marker: str) -> int:
+    if not os.path.exists(marker):
+        Path(marker).touch()
+        hog = bytearray(64 * 1024 * 1024)  # noqa: F841
+        while True:
+            pass
+
+    return 0
+
+
+def _retire_always() -> bool:
+    return True
+
+
+@pytest.fixture
+def source_units(tmp_path: Path) -> t.Iterator[list[list[str]]]:
+    paths = []
+    for idx in range(12):
+        path = tmp_path / f"mod_{idx:02}.py"
+        path.write_text(f"def foo_{idx}(a):\n    pass\n" if idx % 3 else "x = 1\n")
+        paths.append(str(path))
+
+    yield [paths[idx : idx + 2] for idx in range(0, len(paths), 2)]
+
+
+def test_rss_bytes() -> None:
+    rss = rss_bytes()
+    if rss is None:
+        pytest.skip("procfs is not available")
+
+    assert rss > 0
+
+
+@pytest.mark.parametrize("pid", (None, 0))
+def test_rss_bytes_missing_pid(pid: t.Optional[int]) -> None:
+    with pytest.raises(ValueError):
+        rss_bytes(pid)
+
+
+@pytest.mark.parametrize(
+    "limits",
+    (
+        ("--max-worker-files=1",),
+        ("--max-worker-bytes=1",),
+        ("--max-worker-rss=1",),
+        ("--max-worker-files=3", "--max-worker-bytes=100000"),
+    ),
+)
+def test_results_unchanged_by_recycling(
+    source_units: list[list[str]], limits: tuple[str, ...]
+) -> None:
+    parser = build_runner_parser()
+    expected = check_units(source_units, parser.parse_args([]), jobs=2)
+    recycled = check_units(source_units, parser.parse_args(list(limits)), jobs=2)
+
+    # Compare the result batches, ignoring the time taken to check each file
+    assert [(unit, batch) for unit, (batch, _) in recycled] == [
+        (unit, batch) for unit, (batch, _) in expected
+    ]
+    assert any(results for _, (batch, _) in expected for results in batch)
+
+
+def test_serial_fallback_without_pool(
+    source_units: list[list[str]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    options = build_runner_parser().parse_args([])
+    expected = check_units(source_units, options, jobs=1)
+
+    def unsupported(*args: t.Any, **kwargs: t.Any) -> t.NoReturn:
+        raise NotImplementedError("no working sem_open")
+
+    monkeypatch.setattr(worker, "ProcessPoolExecutor", unsupported)
+    assert worker.try_create_worker_pool(options, 2) is None
+
+    fallback = check_units(source_units, options, jobs=2)
+    assert [(unit, batch) for unit, (batch, _) in fallback] == [
+        (unit, batch) for unit, (batch, _) in expected
+    ]
+
+
+def test_workers_retired() -> None:
+    with RecyclingPool(2, should_retire=_retire_always) as pool:
+        pids = [future.result() for future in [pool.submit(_pid, idx) for idx in range(6)]]
+
+    assert len(set(pids)) == 6
+    assert pool.stats.workers_retired == 6
+
+
+def test_task_retried_after_worker_dies(tmp_path: Path) -> None:
+    with RecyclingPool(1) as pool:
+        first = pool.submit(_crash_once, str(tmp_path / "marker"))
+        second = pool.submit(_pid, 0)
+        assert first.result() == second.result()
+
+    assert pool.stats.workers_restarted == 1
+    assert pool.stats.tasks_retried == 1
+
+
+def test_task_fails_after_retries() -> None:
+    with RecyclingPool(1) as pool:
+        with pytest.raises(BrokenWorkerError):
+            pool.submit(_crash, 0).result()
+
+        assert pool.submit(_pid, 0).result() > 0
+
+
+def test_worker_over_memory_limit_restarted(tmp_path: Path) -> None:
+    if rss_bytes() is None:
+        pytest.skip("procfs is not available")
+
+    with RecyclingPool(1, max_rss=(rss_bytes() or 0) + 32 * 1024 * 1024) as pool:
+        assert pool.submit(_hog_memory_once, str(tmp_path / "marker")).result() == 0
+
+    assert pool.stats.tasks_retried == 1
+
+
+def test_task_exception_propagated() -> None:
+    with RecyclingPool(1) as pool:
+        with pytest.raises(ZeroDivisionError):
+            pool.submit(divmod, 1, 0).result()
+
+
+def test_stuck_worker_terminated(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(pool, "STOP_TIMEOUT_SECONDS", 0.1)
+    parent_conn, child_conn = multiprocessing.Pipe()
+
+    # The process never reads the stop message
+    process = multiprocessing.Process(target=time.sleep, args=(60,), daemon=True)
+    process.start()
+    RecyclingPool._stop(_Worker(process, parent_conn))
+    child_conn.close()
+
+    assert process.exitcode == -signal.SIGTERM
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import gc
+import subprocess
+import sys
+from argparse import Namespace
+
+import pytest
+from flake8.main.options import JobsArgument
+
+from flake8_annotations import prefork
+from flake8_annotations.checker import TypeHintChecker
+from flake8_annotations.records import CODES
+
+
+def test_warmup_source_covers_error_codes() -> None:
+    checker_instance = TypeHintChecker(None, prefork.WARMUP_SOURCE.splitlines(keepends=True))
+    codes = {error.to_flake8()[2].split()[0] for _, error in checker_instance.iter_errors()}
+    assert codes == set(CODES[1:])
+
+
+FORK_CASES = (
+    (Namespace(jobs=JobsArgument("4"), filenames=["."]), True),
+    (Namespace(jobs=JobsArgument("1"), filenames=["."]), False),
+    (Namespace(jobs=JobsArgument("4"), filenames=["-"]), False),
+    (Namespace(jobs="4", filenames=["."]), False),  # e.g. the standalone runner's options
+    (Namespace(), False),
+)
+
+
+@pytest.mark.parametrize(("options", "expected"), FORK_CASES)
+def test_flake8_forks_workers(
+    options: Namespace, expected: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(prefork, "uses_fork", lambda: True)
+    assert prefork.flake8_forks_workers(options) == expected
+
+
+def test_flake8_forks_workers_without_fork(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(prefork, "uses_fork", lambda: False)
+    assert not prefork.flake8_forks_workers(Namespace(jobs=JobsArgument("4"), filenames=["."]))
+
+
+def test_uses_fork_doesnt_set_start_method() -> None:
+    # The start method is process global, so it's checked in a fresh interpreter
+    script = (
+        "import multiprocessing\n"
+        "from flake8_annotations.prefork import uses_fork\n"
+        "assert uses_fork() == (multiprocessing.get_all_start_methods()[0] == 'fork')\n"
+        "assert multiprocessing.get_start_method(allow_none=True) is None\n"
+        "multiprocessing.set_start_method('spawn')\n"
+        "assert not uses_fork()\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+
+def test_prepare_for_fork_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    frozen = []
+    monkeypatch.setattr(gc, "freeze", lambda: frozen.append(True))
+    monkeypatch.setattr(prefork, "_prepared", False)
+
+    prefork.prepare_for_fork()
+    prefork.prepare_for_fork()
+    assert frozen == [True]
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import pickle
+
+import pytest
+
+from flake8_annotations.records import INLINE, ResultRecords, TEMPLATES, encode_message
+from flake8_annotations.source import RESULT
+
+BATCH: list[list[RESULT]] = [
+    [
+        (1, 8, "ANN001 Missing type annotation for function argument 'a'"),
+        (1, 12, "ANN002 Missing type annotation for *args"),
+        (1, 20, "ANN003 Missing type annotation for **kwargs"),
+        (1, 0, "ANN201 Missing return type annotation for public function"),
+    ],
+    [],
+    [(3, 4, "E999 SyntaxError: invalid syntax")],
+    [
+        (2, 8, "ANN001 Missing type annotation for function argument 'a'"),
+        (5, 8, "ANN001 Missing type annotation for function argument ''"),
+        (7, 0, "ANN401 Dynamically typed expressions (typing.Any) are disallowed"),
+    ],
+]
+
+
+def test_roundtrip() -> None:
+    records = pickle.loads(pickle.dumps(ResultRecords.from_results(BATCH)))
+
+    assert len(records) == len(BATCH)
+    assert [list(results) for results in records] == BATCH
+    assert [len(results) for results in records] == [len(results) for results in BATCH]
+    assert list(records)[3][1][2] == BATCH[3][1][2]
+
+
+@pytest.mark.parametrize("col_offset", (-1, -129, 255, 256, 1 << 16, 1 << 32))
+def test_column_range_roundtrip(col_offset: int) -> None:
+    batch = [[(1, col_offset, "ANN204 Missing return type annotation for special method")]]
+    assert [list(results) for results in ResultRecords.from_results(batch)] == batch
+
+
+def test_strings_interned() -> None:
+    records = ResultRecords.from_results(BATCH)
+    assert records.string_table == ["a", "args", "kwargs", "", "E999 SyntaxError: invalid syntax"]
+
+
+@pytest.mark.parametrize("code", sorted(TEMPLATES))
+def test_templates_encoded_by_reference(code: str) -> None:
+    message = TEMPLATES[code].format("arg")
+    code_id, text = encode_message(message)
+    assert code_id != INLINE
+    assert text == ("arg" if "{}" in TEMPLATES[code] else "")
+
+
+@pytest.mark.parametrize(
+    "message",
+    (
+        "E902 FileNotFoundError: [Errno 2] No such file or directory: 'missing.py'",
+        "ANN101 Missing type annotation for self in a method",
+        "ANN001 Missing type annotation",
+    ),
+)
+def test_unknown_messages_inlined(message: str) -> None:
+    assert encode_message(message) == (INLINE, message)
@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import io
+import json
+import shutil
+import subprocess
+import sys
+import typing as t
+from pathlib import Path
+
+import pytest
+
+from flake8_annotations.runner import job_count, main
+from flake8_annotations.worker import executor_backend
+
+SOURCES = {
+    "pkg/mod.py": "def foo(a, *args, **kwargs):\n    pass\n",
+    "pkg/noqa.py": "def bar(a):  # noqa: ANN001\n    pass\n",
+    "pkg/skipped.py": "# flake8: noqa\ndef baz(a):\n    pass\n",
+    "pkg/bad.py": "def broken(:\n",
+    "pkg/unclosed.py": "x = (\n",
+    "pkg/sub/overload.py": (
+        "from typing import overload\n\n"
+        "@overload\ndef f(a: int) -> int: ...\n"
+        "def f(a):\n    return a\n"
+    ),
+    "pkg/notes.txt": "def not_python(a):\n",
+    "script": "def explicit(a):\n    pass\n",
+}
+
+
+@pytest.fixture
+def source_tree(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> t.Iterator[Path]:
+    for name, src in SOURCES.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(src)
+
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+
+
+def _flake8_output(*args: str) -> list[str]:
+    p = subprocess.run(
+        [sys.executable, "-m", "flake8", *args], stdout=subprocess.PIPE, encoding="utf-8"
+    )
+    return p.stdout.splitlines()
+
+
+@pytest.mark.parametrize(
+    "mode",
+    (
+        (),
+        ("--chunk-bytes=0",),
+        ("--pipeline",),
+        ("--pipeline", "--chunk-bytes=0"),
+        ("--chunk-bytes=0", "--max-worker-files=1"),
+        ("--pipeline", "--max-worker-rss=1"),
+        ("--executor=thread",),
+        ("--pipeline", "--executor=thread"),
+        ("--executor=interpreter",),
+        ("--split-bytes=1",),
+        ("--gitignore", "--follow-symlinks"),
+    ),
+)
+@pytest.mark.parametrize("jobs", ("1", "2"))
+def test_output_matches_flake8(
+    source_tree: Path, capsys: pytest.CaptureFixture[str], jobs: str, mode: tuple[str, ...]
+) -> None:
+    args = ("--isolated", "--select=ANN,E9", "pkg", "script")
+    exit_code = main(("-j", jobs, *mode, *args))
+
+    output = capsys.readouterr().out.splitlines()
+    assert exit_code == 1
+    assert output == _flake8_output(*args)
+    assert output == sorted(output, key=lambda line: line.split(":", 1)[0])
+
+
+def _commit(repo: Path) -> None:
+    for args in (("init", "-q"), ("add", "."), ("commit", "-qm", "init")):
+        subprocess.run(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@test", *args],
+            cwd=repo,
+            check=True,
+            capture_output=True,
+        )
+
+
+NULL_OBJECT = "0" * 40
+
+
+@pytest.mark.parametrize(
+    "mode", (("--git-rev=HEAD",), ("--git-index",), (f"--git-range={NULL_OBJECT}..HEAD",))
+)
+@pytest.mark.parametrize("jobs", ("1", "2"))
+def test_git_objects(
+    source_tree: Path, capsys: pytest.CaptureFixture[str], jobs: str, mode: tuple[str, ...]
+) -> None:
+    args = ("--isolated", "--select=ANN,E9", "pkg", "script")
+    expected = _flake8_output(*args)
+    _commit(source_tree)
+
+    # The working tree isn't checked
+    (source_tree / "pkg" / "mod.py").write_text("def changed(a):\n    pass\n")
+    (source_tree / "pkg" / "untracked.py").write_text("def untracked(a):\n    pass\n")
+    main(("-j", jobs, *mode, *args))
+
+    assert capsys.readouterr().out.splitlines() == expected
+
+
+@pytest.mark.parametrize("suffix", (".whl", ".tar.gz"))
+@pytest.mark.parametrize("jobs", ("1", "2"))
+def test_archives(
+    source_tree: Path, capsys: pytest.CaptureFixture[str], jobs: str, suffix: str
+) -> None:
+    args = ("--isolated", "--select=ANN,E9")
+    expected = _flake8_output(*args, "pkg")
+
+    dist = source_tree / "dist"
+    dist.mkdir()
+    shutil.make_archive(
+        str(dist / "pkg"), "zip" if suffix == ".whl" else "gztar", source_tree, "pkg"
+    )
+    if suffix == ".whl":
+        (dist / "pkg.zip").rename(dist / "pkg.whl")
+
+    (dist / "corrupt.zip").write_bytes(b"not an archive")
+    main(("-j", jobs, "--archives", *args, "dist"))
+
+    output = capsys.readouterr().out.splitlines()
+    assert output[0].startswith("dist/corrupt.zip:0:1: E902 BadZipFile")
+    assert output[1:] == [line.replace("pkg/", f"dist/pkg{suffix}!pkg/", 1) for line in expected]
+
+
+@pytest.mark.parametrize(
+    "mode",
+    (
+        (),
+        ("--chunk-bytes=0",),
+        ("--pipeline",),
+        ("--split-bytes=1",),
+        ("--git-rev=HEAD",),
+        ("--cost-file=costs.json",),
+    ),
+)
+@pytest.mark.parametrize("jobs", ("1", "2"))
+def test_benchmark_aggregates_worker_stats(
+    source_tree: Path, capsys: pytest.CaptureFixture[str], jobs: str, mode: tuple[str, ...]
+) -> None:
+    (source_tree / "pkg" / "copy.py").write_text(SOURCES["pkg/mod.py"])
+    (source_tree / "pkg" / "constants.py").write_text("A = 1\n")
+    _commit(source_tree)
+
+    # Files without function definitions are only skipped if syntax errors aren't reported
+    args = ("--isolated", "--select=ANN", "--exit-zero", "--benchmark", "pkg", "script")
+    main(("-j", jobs, *mode, *args))
+    output = [line for line in capsys.readouterr().out.splitlines() if "files checked" in line]
+
+    # Which copies are deduplicated depends on how files are spread across the workers
+    assert len(output) == 1
+    assert output[0].startswith("9 files checked, ")
+    assert output[0].endswith("; triage skipped 2 files (12 bytes; no_functions=2)")
+    if jobs == "1":
+        assert f"deduplication skipped 1 files ({len(SOURCES['pkg/mod.py'])} bytes)" in output[0]
+
+
+def test_cost_model_scheduling(source_tree: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    args = ("--isolated", "--select=ANN,E9", "pkg", "script")
+    cost_file = source_tree / "costs.json"
+    for _ in range(2):
+        main(("--cost-file", str(cost_file), "--benchmark", *args))
+        output = capsys.readouterr().out.splitlines()
+
+        assert output[:-5] == _flake8_output(*args)
+        assert "predicted makespan" in output[-1]
+
+    assert set(json.loads(cost_file.read_text())["files"]) == {
+        "pkg/bad.py",
+        "pkg/mod.py",
+        "pkg/noqa.py",
+        "pkg/skipped.py",
+        "pkg/sub/overload.py",
+        "pkg/unclosed.py",
+        "script",
+    }
+
+
+def test_config_file_options(source_tree: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    (source_tree / ".flake8").write_text(
+        "[flake8]\nextend-exclude = pkg/sub\nsuppress_dummy_args = true\nextend-ignore = ANN002\n"
+    )
+    (source_tree / "pkg" / "dummy.py").write_text("def dummy(_) -> None:\n    pass\n")
+
+    main(("--select=ANN", "pkg"))
+    output = capsys.readouterr().out.splitlines()
+    assert output == _flake8_output("--select=ANN", "pkg")
+    assert not any(
+        "overload.py" in line or "ANN002" in line or "dummy.py" in line for line in output
+    )
+
+
+# Only the longest pattern matching a path applies, so `pkg/mod.py` still reports ANN001
+PER_FILE_IGNORES = "pkg/*.py:ANN001 pkg/mod.py:ANN201\n    overload.py,bad.py:E9 missing.py:E902"
+
+
+@pytest.mark.parametrize("mode", ((), ("--pipeline",), ("--chunk-bytes=0",)))
+@pytest.mark.parametrize("jobs", ("1", "2"))
+def test_per_file_ignores(
+    source_tree: Path, capsys: pytest.CaptureFixture[str], jobs: str, mode: tuple[str, ...]
+) -> None:
+    args = ("--select=ANN,E9", "pkg", "script", "missing.py")
+    main(("-j", jobs, *mode, "--isolated", f"--per-file-ignores={PER_FILE_IGNORES}", *args))
+    output = capsys.readouterr().out.splitlines()
+    assert output == _flake8_output("--isolated", f"--per-file-ignores={PER_FILE_IGNORES}", *args)
+    assert any("pkg/mod.py:1:9: ANN001" in line for line in output)
+    assert not any("ANN201" in line and "pkg/mod.py" in line for line in output)
+
+    (source_tree / ".flake8").write_text(f"[flake8]\nper-file-ignores = {PER_FILE_IGNORES}\n")
+    main(("-j", jobs, *mode, *args))
+    assert capsys.readouterr().out.splitlines() == output
+
+
+@pytest.mark.parametrize("config", (True, False))
+def test_invalid_per_file_ignores(source_tree: Path, config: bool) -> None:
+    if config:
+        (source_tree / ".flake8").write_text("[flake8]\nper-file-ignores = ANN001:pkg/mod.py\n")
+        args: tuple[str, ...] = ("pkg",)
+    else:
+        args = ("--isolated", "--per-file-ignores=pkg/mod.py", "pkg")
+
+    with pytest.raises(SystemExit) as exc_info:
+        main(args)
+
+    assert exc_info.value.code == 2
+
+
+@pytest.mark.parametrize("separator", ("\0", "\n"))
+@pytest.mark.parametrize("mode", ((), ("--pipeline",)))
+def test_files_from_stdin(
+    source_tree: Path,
+    capsys: pytest.CaptureFixture[str],
+    monkeypatch: pytest.MonkeyPatch,
+    separator: str,
+    mode: tuple[str, ...],
+) -> None:
+    args = ("--isolated", "--select=ANN,E9")
+    listed = separator.join(("pkg/sub", "pkg/mod.py", "script")) + separator
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(listed.encode())))
+    main(("-j", "2", "--files-from=-", *mode, *args))
+
+    output = capsys.readouterr().out.splitlines()
+    assert output == _flake8_output(*args, "pkg/sub", "pkg/mod.py", "script")
+
+
+def test_files_from_with_paths(source_tree: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    (source_tree / "files.txt").write_text("script\n")
+    main(("--isolated", "--files-from=files.txt", "pkg/mod.py"))
+
+    output = capsys.readouterr().out.splitlines()
+    assert output == _flake8_output("--isolated", "pkg/mod.py", "script")
+
+
+def test_unreadable_file_reported(source_tree: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    exit_code = main(("--isolated", "missing.py"))
+    assert exit_code == 1
+    assert capsys.readouterr().out.startswith("missing.py:0:1: E902 FileNotFoundError:")
+
+
+def test_exit_zero(source_tree: Path) -> None:
+    assert main(("--isolated", "--exit-zero", "pkg")) == 0
+
+
+JOB_COUNT_CASES = (
+    ("4", ["a.py", "b.py"], 2),
+    ("1", ["a.py", "b.py"], 1),
+    ("4", ["a.py", "-"], 1),
+    ("auto", ["a.py"], 1),
+)
+
+
+@pytest.mark.parametrize(("jobs", "paths", "expected"), JOB_COUNT_CASES)
+def test_job_count(jobs: str, paths: list[str], expected: int) -> None:
+    assert job_count(jobs, paths) == expected
+
+
+def test_job_count_split(tmp_path: Path) -> None:
+    path = tmp_path / "giant.py"
+    path.write_text("x = 1\n" * 100)
+    assert job_count("4", [str(path)], split_bytes=100) == 4
+    assert job_count("4", [str(path)], split_bytes=10_000) == 1
+
+
+def test_executor_backend() -> None:
+    assert executor_backend("process") == "process"
+    assert executor_backend("thread") == "thread"
+    expected = "interpreter" if sys.version_info >= (3, 14) else "process"
+    assert executor_backend("interpreter") == expected
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from flake8_annotations.scheduling import (
+    CostModel,
+    DEFAULT_SECONDS_PER_BYTE,
+    FILE_OVERHEAD_BYTES,
+    FILE_OVERHEAD_SECONDS,
+    MIN_FITTED_BYTES,
+    choose_workers,
+    lpt_makespan,
+    pack_by_cost,
+    pack_work_units,
+)
+
+PACKING_CASES = (
+    # Units are closed once they reach the chunk size, including the per-file overhead
+    ([100, 100, 100, 100], 2 * (100 + FILE_OVERHEAD_BYTES), [[100, 100], [100, 100]]),
+    # Large items get a unit to themselves
+    ([10, 100_000, 10], 50_000, [[10, 100_000], [10]]),
+    # Empty items are still bounded by their overhead
+    ([0] * 5, 2 * FILE_OVERHEAD_BYTES, [[0, 0], [0, 0], [0]]),
+    ([1, 2, 3], 0, [[1], [2], [3]]),
+    ([], 1024, []),
+)
+
+
+@pytest.mark.parametrize(("sizes", "chunk_bytes", "units"), PACKING_CASES)
+def test_pack_work_units(sizes: list[int], chunk_bytes: int, units: list[list[int]]) -> None:
+    assert list(pack_work_units(sizes, lambda size: size, chunk_bytes)) == units
+
+
+def test_pack_by_cost_longest_first() -> None:
+    costs = [0.1, 5.0, 0.2, 1.0, 0.3]
+    assert pack_by_cost(costs, 1.0) == [[1], [3], [4, 2, 0]]
+    assert pack_by_cost([], 1.0) == []
+
+
+LPT_CASES = (
+    # LPT is a 4/3 approximation: the optimal schedule here is [3, 3], [2, 2, 2]
+    ([3.0, 3.0, 2.0, 2.0, 2.0], 2, 7.0),
+    ([3.0, 3.0, 2.0, 2.0, 2.0], 1, 12.0),
+    ([10.0, 1.0, 1.0], 4, 10.0),
+    ([], 2, 0.0),
+)
+
+
+@pytest.mark.parametrize(("unit_costs", "workers", "makespan"), LPT_CASES)
+def test_lpt_makespan(unit_costs: list[float], workers: int, makespan: float) -> None:
+    assert lpt_makespan(unit_costs, workers) == pytest.approx(makespan)
+
+
+def test_choose_workers() -> None:
+    # Tiny runs aren't worth starting a pool for
+    assert choose_workers([0.001] * 10, 8) == 1
+
+    # The makespan is bounded by the most expensive unit, so extra workers don't help
+    assert choose_workers([10.0, 1.0, 1.0, 1.0], 8) == 2
+
+    assert choose_workers([1.0] * 8, 4) == 4
+
+
+def test_cost_model_predict() -> None:
+    model = CostModel()
+    unseen = model.predict("new.py", 1000)
+    assert unseen == pytest.approx(FILE_OVERHEAD_SECONDS + 1000 * DEFAULT_SECONDS_PER_BYTE)
+
+    model.record("known.py", 1000, 0.5)
+    assert model.predict("known.py", 1000) == 0.5
+    assert model.predict("known.py", 2000) == pytest.approx(1.0)
+
+
+def test_cost_model_fit() -> None:
+    model = CostModel()
+    model.record("big.py", 2 * MIN_FITTED_BYTES, 2.0 + FILE_OVERHEAD_SECONDS)
+    model.fit()
+
+    assert model.seconds_per_byte == pytest.approx(1 / MIN_FITTED_BYTES)
+
+
+def test_cost_model_roundtrip(tmp_path: Path) -> None:
+    model = CostModel()
+    model.record("known.py", 1000, 0.5)
+    model.save(tmp_path / "costs.json")
+
+    assert CostModel.load(tmp_path / "costs.json").files == {"known.py": (1000, 0.5)}
+    assert CostModel.load(tmp_path / "missing.json").files == {}
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import io
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from flake8_annotations.checker import (
+    CheckerConfig,
+    TypeHintChecker,
+    baseline_fingerprint,
+    normalize_path,
+)
+from flake8_annotations.source import (
+    SourceChecker,
+    SourceLines,
+    analyze_lines,
+    analyze_source,
+    check_lines,
+    decode_source,
+    iter_path_list,
+    iter_source_files,
+)
+
+SAMPLE_SRC = b"def foo(a):\n    pass\n"
+
+
+DECODE_CASES = (
+    (b"a = 1\r\nb = 2\r\n", ["a = 1\n", "b = 2\n"]),
+    (b"\xef\xbb\xbfa = 1\n", ["a = 1\n"]),
+    (b"# -*- coding: latin-1 -*-\na = '\xe9'\n", ["# -*- coding: latin-1 -*-\n", "a = 'é'\n"]),
+    (b"a = '\xe9'\n", ["a = 'é'\n"]),  # Invalid UTF-8 falls back to latin-1
+)
+
+
+@pytest.mark.parametrize(("data", "lines"), DECODE_CASES)
+def test_decode_source(data: bytes, lines: list[str]) -> None:
+    assert decode_source(data) == lines
+
+
+SOURCE_LINES_CASES = (
+    *(data for data, _ in DECODE_CASES[:3]),
+    b"a = 1\rb = 2\r\n\nc = 3",
+    b"\xef\xbb\xbfa = 1\r\nb = '\xc3\xa9'\r\n",
+    b"a = 1",
+    b"\n",
+    b"",
+)
+
+
+@pytest.mark.parametrize("data", SOURCE_LINES_CASES)
+def test_source_lines(data: bytes) -> None:
+    lines = decode_source(data)
+    source_lines = SourceLines.from_bytes(data)
+    if lines:
+        assert source_lines[0] == lines[0]
+
+    assert bool(source_lines) == bool(lines)
+    assert list(source_lines) == lines
+    assert source_lines[-1:] == lines[-1:]
+    with pytest.raises(IndexError):
+        source_lines[len(lines)]
+
+
+def test_checker_doesnt_index_source_lines() -> None:
+    source_lines = SourceLines.from_bytes(b"# mypy: ignore-errors\n" + SAMPLE_SRC)
+    checker_instance = TypeHintChecker(None, source_lines, source=source_lines.data)
+    assert checker_instance.has_module_level_ignore
+    assert source_lines._offsets is None
+
+
+def test_source_lines_may_have_noqa() -> None:
+    assert not SourceLines.from_bytes(SAMPLE_SRC).may_have_noqa()
+    assert SourceLines.from_bytes(b"def foo(a):  # NoQA: ANN001\n").may_have_noqa()
+    assert not SourceLines.from_bytes(b"\xef\xbb\xbfa = 1\n").may_have_noqa()
+
+
+ANALYZE_SOURCE_CASES = (
+    SAMPLE_SRC,
+    b"def foo(a):\r\n    pass\r\ndef bar(b) -> None: ...",
+    b"def foo(a):  # type: ignore\n    pass\n",
+    b"def foo(a:\n",  # E999
+    b"def foo(a='\xe9'):\n    pass\n",  # Invalid UTF-8 falls back to latin-1
+)
+
+
+@pytest.mark.parametrize("data", ANALYZE_SOURCE_CASES)
+def test_analyze_source_matches_lines(data: bytes) -> None:
+    analysis, lines = analyze_source(data, error_keys=True)
+    assert analysis == analyze_lines(decode_source(data), error_keys=True)
+    assert list(lines) == decode_source(data)
+
+
+def test_syntax_error_reported() -> None:
+    results = check_lines(["def foo(:\n"])
+    assert len(results) == 1
+    assert results[0][2].startswith("E999 SyntaxError")
+
+
+def test_analyze_error_keys() -> None:
+    lines = decode_source(SAMPLE_SRC)
+    assert {key for _, key in analyze_lines(lines)} == {""}
+    assert all(key for _, key in analyze_lines(lines, error_keys=True))
+
+
+def test_source_checker_deduplicates() -> None:
+    source_checker = SourceChecker()
+    first = source_checker.check("a.py", SAMPLE_SRC)
+    second = source_checker.check("b.py", SAMPLE_SRC)
+    source_checker.check("c.py", b"def bar() -> None: ...\n")
+
+    assert first == second
+    assert len(first) == 2
+    assert source_checker.stats.files_checked == 3
+    assert source_checker.stats.files_analyzed == 2
+    assert source_checker.stats.files_deduplicated == 1
+    assert "skipped 1 files" in source_checker.stats.describe()
+
+
+def test_source_checker_line_ranges_not_shared() -> None:
+    source_checker = SourceChecker()
+    assert source_checker.check("a.py", SAMPLE_SRC, [(5, 6)]) == []
+    assert len(source_checker.check("b.py", SAMPLE_SRC)) == 2
+    assert source_checker.stats.files_analyzed == 2
+
+
+def test_source_checker_applies_baseline_per_path() -> None:
+    lines = decode_source(SAMPLE_SRC)
+    keys = [key for _, key in analyze_lines(lines, error_keys=True)]
+    baseline = {baseline_fingerprint(normalize_path("a.py"), key) for key in keys}
+
+    source_checker = SourceChecker(config=CheckerConfig(baseline=frozenset(baseline)))
+    assert source_checker.check("a.py", SAMPLE_SRC) == []
+    assert len(source_checker.check("b.py", SAMPLE_SRC)) == 2
+    assert source_checker.stats.files_analyzed == 1
+
+
+def test_iter_source_files(tmp_path: Path) -> None:
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / ".git").mkdir()
+    (tmp_path / "pkg" / "mod.py").touch()
+    (tmp_path / "pkg" / "data.txt").touch()
+    (tmp_path / ".git" / "hook.py").touch()
+    explicit = tmp_path / "script"
+    explicit.touch()
+
+    found = list(iter_source_files([str(tmp_path), str(explicit)]))
+    assert found == [str(tmp_path / "pkg" / "mod.py"), str(explicit)]
+
+
+def test_concurrent_configurations() -> None:
+    src = "def foo(a, *args):\n    pass\n\n@overload\ndef bar(a):\n    pass\n"
+    lines = decode_source(src.encode())
+    configs = (
+        CheckerConfig(),
+        CheckerConfig(allow_untyped_defs=True),
+        CheckerConfig(overload_decorators=frozenset(("overload",)), suppress_none_returning=True),
+    )
+    expected = [analyze_lines(lines, config=config) for config in configs]
+    assert len({len(analysis) for analysis in expected}) == len(configs)
+
+    with ThreadPoolExecutor(4) as executor:
+        analyses = executor.map(
+            lambda idx: (idx, analyze_lines(lines, config=configs[idx % len(configs)])), range(60)
+        )
+        for idx, analysis in analyses:
+            assert analysis == expected[idx % len(configs)]
+
+
+PATH_LIST_CASES = (
+    (b"a.py\0b c.py\0\0d\n.py\0", None, ["a.py", "b c.py", "d\n.py"]),
+    (b"a.py\r\nb.py\n\nc.py", None, ["a.py", "b.py", "c.py"]),
+    (b"a.py\nb.py\0", True, ["a.py\nb.py"]),
+    (b"a.py\0b.py\n", False, ["a.py\0b.py"]),
+    (b"", None, []),
+)
+
+
+@pytest.mark.parametrize(("data", "null", "paths"), PATH_LIST_CASES)
+def test_iter_path_list(data: bytes, null: bool | None, paths: list[str]) -> None:
+    assert list(iter_path_list(io.BytesIO(data), null)) == paths
+
+
+class _ChunkedStream:
+    def __init__(self, chunks: list[bytes]):
+        self.chunks = chunks
+        self.reads = 0
+
+    def read1(self, size: int) -> bytes:
+        self.reads += 1
+        return self.chunks.pop(0) if self.chunks else b""
+
+
+def test_iter_path_list_streams() -> None:
+    stream = _ChunkedStream([b"a.py\0b.", b"py\0", b"c.py\0"])
+    paths = iter_path_list(stream)  # type: ignore[arg-type]
+
+    assert next(paths) == "a.py"
+    assert stream.reads == 1
+    assert list(paths) == ["b.py", "c.py"]
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from flake8_annotations import split
+from flake8_annotations.checker import CheckerConfig
+from flake8_annotations.source import analyze_lines
+from flake8_annotations.split import FileSplitter, has_line_one_type_ignore, split_points
+
+FUNCTIONS = "def foo{idx}(a, b: int):\n    x = 1\n    return x\n\n"
+
+# Overload series spanning the boundaries between chunks
+OVERLOADS = (
+    "from typing import overload\n\n"
+    + "@overload\ndef f(a: int) -> int: ...\n\n" * 40
+    + "def f(a):\n    return a\n\n"
+)
+
+# Statements continued at column 0, which look like top-level statements but aren't
+CONTINUED = (
+    "x = '''\ndef not_a_function(a):\n    pass\n'''\n\n"
+    "y = [\n1,\n2,\n]\n\n"
+    "if x:\n    def bar(a):\n        pass\nelse:\n    def bar(a):\n        pass\n\n"
+    "try:\n    pass\nexcept Exception:\n    def baz(a):\n        pass\n\n"
+    "@property\n\ndef decorated(a):\n    pass\n\n"
+)
+
+
+# A data table whose rows look like top-level statements, so chunks are split at false boundaries
+TABLE = "TABLE = [\n" + "(1, 'a'),\n" * 200 + "]\n\n"
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(split, "MIN_CHUNK_BYTES", 64)
+
+
+def _analyze_split(src: str, config: t.Optional[CheckerConfig] = None) -> t.Any:
+    lines = src.splitlines(keepends=True)
+    with ThreadPoolExecutor(2) as executor:
+        analysis = FileSplitter(executor, 2, split_bytes=1).analyze(lines, None, True, config)
+
+    return analysis, analyze_lines(lines, None, True, config)
+
+
+SOURCES = (
+    "".join(FUNCTIONS.format(idx=idx) for idx in range(50)),
+    OVERLOADS,
+    OVERLOADS + "".join(FUNCTIONS.format(idx=idx) for idx in range(10)) + OVERLOADS,
+    CONTINUED * 5,
+    "".join(FUNCTIONS.format(idx=idx) for idx in range(20)) + TABLE * 3 + FUNCTIONS.format(idx=20),
+    "".join(FUNCTIONS.format(idx=idx) for idx in range(20)) + "def broken(:\n",
+)
+
+
+@pytest.mark.parametrize("src", SOURCES)
+def test_split_matches_whole_file(src: str) -> None:
+    split_analysis, whole_analysis = _analyze_split(src)
+    assert split_analysis == whole_analysis
+
+
+@pytest.mark.parametrize("header", ("# type: ignore\n", "# mypy: ignore-errors\n", "x = 1\n"))
+def test_split_module_level_ignore(header: str) -> None:
+    src = header + "".join(FUNCTIONS.format(idx=idx) for idx in range(50))
+    split_analysis, whole_analysis = _analyze_split(src, CheckerConfig(respect_type_ignore=True))
+    assert split_analysis == whole_analysis
+
+
+def test_false_boundary_merges_chunk(monkeypatch: pytest.MonkeyPatch) -> None:
+    src = "".join(FUNCTIONS.format(idx=idx) for idx in range(20)) + TABLE + FUNCTIONS.format(idx=20)
+    lines = src.splitlines(keepends=True)
+    expected = analyze_lines(lines, None, True)
+    assert any(lines[idx].startswith("(1, 'a')") for idx in split_points(lines, 64))
+
+    # Only the chunks split at false boundaries are re-analyzed, rather than the whole module
+    monkeypatch.setattr(split, "analyze_lines", None)
+    with ThreadPoolExecutor(2) as executor:
+        assert FileSplitter(executor, 2, split_bytes=1).analyze(lines, None, True) == expected
+
+
+def test_split_points_skip_continuations() -> None:
+    lines = CONTINUED.splitlines(keepends=True)
+    points = split_points(lines, 1)
+    assert points
+    assert {lines[idx].split(None, 1)[0] for idx in points}.isdisjoint({"else:", "except", "]"})
+    assert not any(lines[idx].startswith("def decorated") for idx in points)
+
+
+TYPE_IGNORE_CASES = (
+    ("# type: ignore\n", True),
+    ("x = 1  # type: ignore[attr-defined]\n", True),
+    ("x = '# type: ignore'\n", False),
+    ("x = (  # type: ignore\n", True),
+    ("x = 1\n", False),
+)
+
+
+@pytest.mark.parametrize(("first_line", "expected"), TYPE_IGNORE_CASES)
+def test_has_line_one_type_ignore(first_line: str, expected: bool) -> None:
+    assert has_line_one_type_ignore([first_line, "1)\n"]) == expected
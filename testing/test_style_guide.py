@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import argparse
+from textwrap import dedent
+
+import pytest
+
+from flake8_annotations.options import build_parser
+from flake8_annotations.source import RESULT
+from flake8_annotations.style_guide import StyleGuide, format_result, is_inline_ignored
+
+
+def style_guide(*args: str) -> StyleGuide:
+    options: argparse.Namespace = build_parser("test", "test").parse_args(args)
+    return StyleGuide(options)
+
+
+SELECTION_CASES = (
+    ((), "ANN001", True),
+    ((), "ANN401", False),
+    ((), "E999", True),
+    (("--extend-select=ANN401",), "ANN401", True),
+    (("--select=ANN",), "E999", False),
+    (("--select=ANN",), "ANN401", True),
+    (("--ignore=ANN1",), "ANN401", True),
+    (("--ignore=ANN1",), "ANN101", False),
+    (("--extend-ignore=ANN1",), "ANN401", False),
+    (("--select=ANN", "--ignore=ANN001"), "ANN001", False),
+    (("--select=ANN001", "--ignore=ANN"), "ANN001", True),
+    (("--select=ANN001", "--ignore=ANN"), "ANN002", False),
+)
+
+
+@pytest.mark.parametrize(("args", "code", "is_selected"), SELECTION_CASES)
+def test_selection(args: tuple[str, ...], code: str, is_selected: bool) -> None:
+    assert style_guide(*args).is_selected(code) == is_selected
+
+
+PER_FILE_CASES = (
+    ("pkg/mod.py", "ANN001", False),
+    ("pkg/mod.py", "ANN002", True),
+    ("other/mod.py", "ANN002", False),
+    ("pkg/other.py", "ANN001", True),
+    ("pkg/other.py", "ANN002", False),
+    ("tests/test_mod.py", "ANN001", False),
+    ("tests/test_mod.py", "ANN401", False),
+    ("tests/test_mod.py", "E999", True),
+)
+
+
+@pytest.mark.parametrize(("path", "code", "is_selected"), PER_FILE_CASES)
+def test_per_file_ignores(path: str, code: str, is_selected: bool) -> None:
+    # Only the longest matching pattern applies, along with the configured ignores
+    guide = style_guide(
+        "--extend-ignore=ANN401",
+        "--per-file-ignores=pkg/*.py,mod.py:ANN002 pkg/mod.py:ANN001 tests/*:ANN",
+    )
+    assert guide.for_path(path).is_selected(code) == is_selected
+    assert guide.is_selected(code) == (code != "ANN401")
+
+
+NOQA_CASES = (
+    ("def foo(a):  # noqa", "ANN001", True),
+    ("def foo(a):  # NOQA:ANN001", "ANN001", True),
+    ("def foo(a):  # noqa: ANN0", "ANN001", True),
+    ("def foo(a):  # noqa: ANN201", "ANN001", False),
+    ("def foo(a):  # noqa: E501,ANN001", "ANN001", True),
+    ("def foo(a):", "ANN001", False),
+)
+
+
+@pytest.mark.parametrize(("line", "code", "is_ignored"), NOQA_CASES)
+def test_inline_noqa(line: str, code: str, is_ignored: bool) -> None:
+    assert is_inline_ignored(code, line) == is_ignored
+
+
+MULTILINE_SRC = dedent("""\
+    def foo(
+        a,  # noqa: ANN001
+        b,
+    ):
+        pass
+    """)
+
+MULTILINE_RESULTS: list[RESULT] = [
+    (4, 1, "ANN201 Missing return type annotation for public function"),
+    (3, 4, "ANN001 Missing type annotation for function argument 'b'"),
+    (2, 4, "ANN001 Missing type annotation for function argument 'a'"),
+]
+
+
+def test_filter_results_bracketed_noqa() -> None:
+    lines = MULTILINE_SRC.splitlines(keepends=True)
+    reported = style_guide().filter_results(MULTILINE_RESULTS, lines)
+
+    # Matches flake8, where the NL token ending each bracketed line bounds the noqa line mapping
+    assert reported == [MULTILINE_RESULTS[1], MULTILINE_RESULTS[0]]
+
+
+def test_filter_results_sorts() -> None:
+    lines = MULTILINE_SRC.splitlines(keepends=True)
+    reported = style_guide("--disable-noqa").filter_results(MULTILINE_RESULTS, lines)
+    assert reported == MULTILINE_RESULTS[::-1]
+
+
+def test_filter_results_file_noqa() -> None:
+    lines = ["# flake8: noqa\n", *MULTILINE_SRC.splitlines(keepends=True)]
+    assert style_guide().filter_results(MULTILINE_RESULTS, lines) == []
+
+
+def test_format_result() -> None:
+    assert format_result("a.py", MULTILINE_RESULTS[0]) == (
+        "a.py:4:2: ANN201 Missing return type annotation for public function"
+    )
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from flake8_annotations import summary
+from flake8_annotations.options import options_fingerprint
+from flake8_annotations.summary import (
+    DirectorySummary,
+    SummaryStats,
+    load_summary,
+    save_summary,
+    summarize_tree,
+)
+from testing.helpers import parse_options
+
+pytestmark = pytest.mark.usefixtures("restore_default_config")
+
+
+@pytest.fixture
+def source_tree(tmp_path: Path) -> Path:
+    (tmp_path / "pkg_a").mkdir()
+    (tmp_path / "pkg_b" / "sub").mkdir(parents=True)
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "top.py").write_text("def foo(a):\n    pass\n")
+    (tmp_path / "pkg_a" / "mod.py").write_text("def bar(a, b) -> None:\n    pass\n")
+    (tmp_path / "pkg_b" / "sub" / "mod.py").write_text("def baz() -> None:\n    pass\n")
+    (tmp_path / "pkg_b" / "notes.txt").write_text("def not_python(a):\n")
+    (tmp_path / "__pycache__" / "ignored.py").write_text("def ignored(a):\n")
+
+    return tmp_path
+
+
+def _touch_later(path: Path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_summary_counts(source_tree: Path) -> None:
+    summary = summarize_tree(source_tree)
+
+    assert summary.counts == {"ANN001": 3, "ANN201": 1}
+    assert summary.directories["pkg_a"].counts == {"ANN001": 2}
+    assert summary.directories["pkg_b"].total == 0
+    assert set(summary.files) == {"top.py"}
+    assert "__pycache__" not in summary.directories
+
+
+def test_unchanged_tree_is_reused(source_tree: Path) -> None:
+    first = summarize_tree(source_tree)
+
+    stats = SummaryStats()
+    second = summarize_tree(source_tree, first, stats=stats)
+
+    assert second is first
+    assert stats.files_checked == 0
+    assert stats.files_reused == 3
+
+
+def test_changed_file_only_rechecks_file(source_tree: Path) -> None:
+    first = summarize_tree(source_tree)
+
+    changed = source_tree / "pkg_a" / "mod.py"
+    changed.write_text("def bar(a: int, b) -> None:\n    pass\n")
+    _touch_later(changed)
+
+    stats = SummaryStats()
+    second = summarize_tree(source_tree, first, stats=stats)
+
+    assert stats.files_checked == 1
+    assert second.digest != first.digest
+    assert second.directories["pkg_a"].counts == {"ANN001": 1}
+    assert second.directories["pkg_b"] is first.directories["pkg_b"]
+
+
+def test_touched_file_is_not_rechecked(source_tree: Path) -> None:
+    first = summarize_tree(source_tree)
+    _touch_later(source_tree / "top.py")
+
+    stats = SummaryStats()
+    second = summarize_tree(source_tree, first, stats=stats)
+
+    assert stats.files_checked == 0
+    assert second.digest == first.digest
+
+
+def test_summary_roundtrip(source_tree: Path, tmp_path_factory: pytest.TempPathFactory) -> None:
+    summary = summarize_tree(source_tree)
+    summary_file = tmp_path_factory.mktemp("summary") / "summary.json"
+    fingerprint = options_fingerprint(parse_options())
+
+    save_summary(summary_file, summary, fingerprint)
+    loaded = load_summary(summary_file, fingerprint)
+
+    assert isinstance(loaded, DirectorySummary)
+    assert loaded.digest == summary.digest
+    assert loaded.counts == summary.counts
+
+
+def test_option_change_invalidates_summary(
+    source_tree: Path, tmp_path_factory: pytest.TempPathFactory
+) -> None:
+    summary = summarize_tree(source_tree)
+    summary_file = tmp_path_factory.mktemp("summary") / "summary.json"
+    save_summary(summary_file, summary, options_fingerprint(parse_options()))
+
+    changed_fingerprint = options_fingerprint(parse_options("--allow-untyped-defs"))
+    assert load_summary(summary_file, changed_fingerprint) is None
+
+
+def test_symlink_loop_not_followed(source_tree: Path) -> None:
+    (source_tree / "pkg_a" / "loop").symlink_to("..", target_is_directory=True)
+    summary = summarize_tree(source_tree)
+
+    assert summary.counts == {"ANN001": 3, "ANN201": 1}
+    assert "loop" not in summary.directories["pkg_a"].directories
+
+
+def test_unreadable_file_skipped(source_tree: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def read_source(path: str) -> bytes:
+        if path.endswith("top.py"):
+            raise PermissionError(13, "Permission denied")
+
+        return Path(path).read_bytes()
+
+    monkeypatch.setattr(summary, "read_source", read_source)
+    stats = SummaryStats()
+    tree_summary = summarize_tree(source_tree, stats=stats)
+
+    assert tree_summary.counts == {"ANN001": 2}
+    assert stats.unreadable == [str(source_tree / "top.py")]
+
+
+@pytest.fixture
+def trusted_mtimes(monkeypatch: pytest.MonkeyPatch) -> None:
+    # The test tree is created just before it's summarized, so its mtimes are all racy
+    monkeypatch.setattr(summary, "RACY_WINDOW_NS", 0)
+
+
+@pytest.mark.usefixtures("trusted_mtimes")
+def test_unchanged_directories_not_listed(source_tree: Path) -> None:
+    first = summarize_tree(source_tree)
+
+    stats = SummaryStats()
+    second = summarize_tree(source_tree, first, stats=stats)
+
+    assert second is first
+    assert stats.directories_listed == 0
+    assert stats.files_reused == 3
+
+
+@pytest.mark.usefixtures("trusted_mtimes")
+def test_added_file_lists_directory(source_tree: Path) -> None:
+    first = summarize_tree(source_tree)
+
+    (source_tree / "pkg_b" / "sub" / "new.py").write_text("def qux(a):\n    pass\n")
+    _touch_later(source_tree / "pkg_b" / "sub")
+
+    stats = SummaryStats()
+    second = summarize_tree(source_tree, first, stats=stats)
+
+    assert stats.directories_listed == 1
+    assert stats.files_checked == 1
+    assert second.directories["pkg_b"].counts == {"ANN001": 1, "ANN201": 1}
+    assert second.directories["pkg_a"] is first.directories["pkg_a"]
+
+
+@pytest.mark.usefixtures("trusted_mtimes")
+def test_modified_in_place_needs_stat_files(source_tree: Path) -> None:
+    first = summarize_tree(source_tree)
+
+    changed = source_tree / "pkg_a" / "mod.py"
+    changed.write_text("def bar(a: int, b) -> None:\n    pass\n")
+    _touch_later(changed)
+    assert summarize_tree(source_tree, first) is first
+
+    stats = SummaryStats()
+    second = summarize_tree(source_tree, first, stats=stats, stat_files=True)
+
+    assert stats.files_checked == 1
+    assert second.directories["pkg_a"].counts == {"ANN001": 1}
+
+
+def test_main_reads_config_file(
+    source_tree: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    (source_tree / ".flake8").write_text(
+        "[flake8]\nextend-ignore = ANN201\nextend-exclude = pkg_a\nfilename = *.py,*.txt\n"
+    )
+    monkeypatch.chdir(source_tree)
+    summary.main([".", "--summary-file", str(source_tree / "summary.json")])
+
+    output = capsys.readouterr().out.splitlines()
+    # `notes.txt` is missing a function body
+    assert output[:2] == [".: 2 (ANN001=1 E999=1)", "./pkg_b: 1 (E999=1)"]
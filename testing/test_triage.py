@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import ast
+import typing as t
+
+import pytest
+
+from flake8_annotations.checker import CheckerConfig, GENERATED_HEADER_BYTES, TypeHintChecker
+from flake8_annotations.enums import SkipReason
+from flake8_annotations.source import SourceChecker
+from flake8_annotations.style_guide import StyleGuide
+from testing.helpers import parse_options
+
+pytestmark = pytest.mark.usefixtures("restore_default_config")
+
+FUNCTION_SRC = "def foo(a):\n    pass\n"
+NON_ASCII_SRC = "def foo(a):\n    return 'é'\n"
+
+# Generated files are only skipped if markers are configured
+MARKERS = frozenset(("@generated", "DO NOT EDIT"))
+GENERATED = CheckerConfig(generated_markers=MARKERS)
+
+TRIAGE_CASES = (
+    (FUNCTION_SRC, CheckerConfig(), None),
+    ("CONSTANTS = {'a': 1}\nlambda a: a\n", CheckerConfig(), SkipReason.NO_FUNCTIONS),
+    # The scan is conservative, any occurrence of `def` means the source is checked
+    ("CONSTANTS = {'default': 1}\n", CheckerConfig(), None),
+    ("", CheckerConfig(), SkipReason.NO_FUNCTIONS),
+    (f"# @generated by protoc\n{FUNCTION_SRC}", GENERATED, SkipReason.GENERATED),
+    (
+        f"# Code generated by a tool. DO NOT EDIT.\n{FUNCTION_SRC}",
+        GENERATED,
+        SkipReason.GENERATED,
+    ),
+    # Markers are only matched in comments, delimited by non-word characters
+    (f'"""Code generated by a tool. DO NOT EDIT."""\n{FUNCTION_SRC}', GENERATED, None),
+    (f"@generated_cache\n{FUNCTION_SRC}", GENERATED, None),
+    (f"# see: @generated_cache\n{FUNCTION_SRC}", GENERATED, None),
+    (f"x = '# @generated'\n{FUNCTION_SRC}", GENERATED, None),
+    # Comments are searched up to the point the truncated header can't be tokenized
+    (
+        f"# @generated\nx = '''{'a' * GENERATED_HEADER_BYTES}'''\n",
+        GENERATED,
+        SkipReason.GENERATED,
+    ),
+    # Markers are only searched for in the file's header
+    (f"{'#' * GENERATED_HEADER_BYTES}\n# @generated\n{FUNCTION_SRC}", GENERATED, None),
+    # No markers are configured by default
+    (f"# @generated\n{FUNCTION_SRC}", CheckerConfig(), None),
+    (
+        f"# autogen\n{FUNCTION_SRC}",
+        CheckerConfig(generated_markers=frozenset(("autogen",))),
+        SkipReason.GENERATED,
+    ),
+    (FUNCTION_SRC, CheckerConfig(max_file_bytes=len(FUNCTION_SRC)), None),
+    (FUNCTION_SRC, CheckerConfig(max_file_bytes=len(FUNCTION_SRC) - 1), SkipReason.OVERSIZED),
+    # Decoded source is measured in bytes, not characters
+    (NON_ASCII_SRC, CheckerConfig(max_file_bytes=len(NON_ASCII_SRC)), SkipReason.OVERSIZED),
+    (NON_ASCII_SRC, CheckerConfig(max_file_bytes=len(NON_ASCII_SRC) + 1), None),
+)
+
+
+@pytest.mark.parametrize(("src", "config", "expected"), TRIAGE_CASES)
+@pytest.mark.parametrize("as_bytes", (False, True))
+def test_triage(
+    src: str, config: CheckerConfig, expected: t.Optional[SkipReason], as_bytes: bool
+) -> None:
+    source: t.Union[str, bytes] = src.encode() if as_bytes else src
+    assert TypeHintChecker.triage(source, config) == expected
+
+
+def test_skipped_source_not_parsed() -> None:
+    # Generated files aren't parsed, so even invalid source is skipped
+    lines = ["# @generated\n", "def broken(:\n"]
+    checker_instance = TypeHintChecker(None, lines, config=GENERATED)
+    assert checker_instance.skip_reason == SkipReason.GENERATED
+    assert list(checker_instance.run()) == []
+
+    with pytest.raises(SyntaxError):
+        TypeHintChecker(None, lines, config=GENERATED, triage=False)
+
+
+@pytest.mark.parametrize(
+    "src",
+    (
+        f'"""Utilities. DO NOT EDIT the cache by hand."""\n{FUNCTION_SRC}',
+        f"from functools import cache as generated_cache\n\n@generated_cache\n{FUNCTION_SRC}",
+    ),
+)
+def test_marker_outside_comment_still_checked(src: str) -> None:
+    checker_instance = TypeHintChecker(None, src.splitlines(keepends=True), config=GENERATED)
+    assert checker_instance.skip_reason is None
+    assert [error[2][:6] for error in checker_instance.run()] == ["ANN001", "ANN201"]
+
+
+def test_configured_options() -> None:
+    parse_options("--generated-markers=autogen", "--max-file-bytes=100")
+    assert TypeHintChecker.default_config.generated_markers == frozenset(("autogen",))
+    assert TypeHintChecker.default_config.max_file_bytes == 100
+    assert TypeHintChecker(None, ["# @generated\n", FUNCTION_SRC]).skip_reason is None
+
+
+def test_syntax_errors_reported_without_functions() -> None:
+    lines = ["x = (\n"]
+    assert TypeHintChecker.triage("".join(lines)) == SkipReason.NO_FUNCTIONS
+    with pytest.raises(SyntaxError):
+        TypeHintChecker(None, lines)
+
+    # flake8 only provides a tree for source it has parsed
+    TypeHintChecker(ast.Module(body=[], type_ignores=[]), lines)
+
+    assert SourceChecker().check("a.py", b"x = (\n") == [
+        (1, 5, "E999 SyntaxError: '(' was never closed")
+    ]
+    source_checker = SourceChecker(StyleGuide(parse_options("--select=ANN")))
+    assert source_checker.check("a.py", b"x = (\n") == []
+    assert source_checker.stats.files_skipped == {SkipReason.NO_FUNCTIONS: 1}
+
+
+def test_source_checker_reports_skipped_files() -> None:
+    source_checker = SourceChecker(
+        StyleGuide(parse_options("--select=ANN")),
+        config=CheckerConfig(generated_markers=MARKERS, max_file_bytes=100),
+    )
+    assert source_checker.check("a.py", FUNCTION_SRC.encode())
+    assert source_checker.check("b.py", b"# @generated\n" + FUNCTION_SRC.encode()) == []
+    assert source_checker.check("c.py", b"A = 1\n") == []
+    assert source_checker.check("d.py", b"A = 1\n") == []
+    assert source_checker.check("e.py", FUNCTION_SRC.encode() * 10) == []
+    assert source_checker.check("f.py", FUNCTION_SRC.encode())
+
+    stats = source_checker.stats
+    assert stats.files_checked == 6
+    assert stats.files_analyzed == 1
+    assert stats.files_deduplicated == 1
+    assert stats.files_skipped == {
+        SkipReason.GENERATED: 1,
+        SkipReason.NO_FUNCTIONS: 2,
+        SkipReason.OVERSIZED: 1,
+    }
+    assert stats.describe() == (
+        "6 files checked, 1 distinct contents analyzed; deduplication skipped 1 files (21 bytes); "
+        "triage skipped 4 files (256 bytes; generated=1 no_functions=2 oversized=1)"
+    )
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+import typing as t
+from pathlib import Path
+
+import pytest
+
+from flake8_annotations.source import iter_source_files
+from flake8_annotations.walk import GitIgnore, SourceWalker
+
+GITIGNORE_CASES = (
+    # pattern, path, is_dir, ignored
+    ("*.pyc", "a.pyc", False, True),
+    ("*.pyc", "pkg/sub/a.pyc", False, True),
+    ("*.py", "pkg/a.pyc", False, None),
+    ("build/", "build", True, True),
+    ("build/", "build", False, None),
+    ("build/", "pkg/build", True, True),
+    ("/build", "build", True, True),
+    ("/build", "pkg/build", True, None),
+    ("pkg/gen", "pkg/gen", True, True),
+    ("pkg/gen", "other/pkg/gen", True, None),
+    ("**/gen", "a/b/gen", True, True),
+    ("a/**/b", "a/b", True, True),
+    ("a/**/b", "a/x/y/b", True, True),
+    ("a/**", "a/x/y.py", False, True),
+    ("a/*.py", "a/b/c.py", False, None),
+    ("?.py", "a.py", False, True),
+    ("?.py", "ab.py", False, None),
+    ("[ab].py", "b.py", False, True),
+    ("[!ab].py", "b.py", False, None),
+    ("[!ab].py", "c.py", False, True),
+    ("\\#notes", "#notes", False, True),
+    ("\\!important", "!important", False, True),
+    ("# comment", "# comment", False, None),
+    ("trailing   ", "trailing", False, True),
+)
+
+
+@pytest.mark.parametrize(("pattern", "path", "is_dir", "ignored"), GITIGNORE_CASES)
+def test_gitignore_match(pattern: str, path: str, is_dir: bool, ignored: bool | None) -> None:
+    assert GitIgnore.parse(pattern).match(path, is_dir) == ignored
+
+
+def test_gitignore_last_match_wins() -> None:
+    gitignore = GitIgnore.parse("*.py\n!keep.py\n")
+    assert gitignore.match("drop.py", False)
+    assert gitignore.match("keep.py", False) is False
+    assert GitIgnore.parse("!keep.py\n*.py\n").match("keep.py", False)
+
+
+def _write(root: Path, files: dict[str, str]) -> None:
+    for name, contents in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(contents)
+
+
+@pytest.fixture
+def tree(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    _write(
+        tmp_path,
+        {
+            ".gitignore": "build/\n*_pb2.py\n/top.py\n",
+            "top.py": "",
+            "pkg/mod.py": "",
+            "pkg/top.py": "",
+            "pkg/mod_pb2.py": "",
+            "pkg/build/gen.py": "",
+            "pkg/vendor/.gitignore": "*.py\n!keep.py\n",
+            "pkg/vendor/drop.py": "",
+            "pkg/vendor/keep.py": "",
+            "pkg/vendor/keep_pb2.py": "",
+        },
+    )
+    (tmp_path / ".git").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_walk_gitignore(tree: Path) -> None:
+    walked = list(SourceWalker(gitignore=True).walk(["."]))
+    assert walked == ["./pkg/mod.py", "./pkg/top.py", "./pkg/vendor/keep.py"]
+
+
+def test_walk_gitignore_of_parents(tree: Path) -> None:
+    assert list(SourceWalker(gitignore=True).walk(["pkg/vendor"])) == ["pkg/vendor/keep.py"]
+
+
+def test_walk_explicit_files_not_ignored(tree: Path) -> None:
+    assert list(SourceWalker(gitignore=True).walk(["pkg/mod_pb2.py"])) == ["pkg/mod_pb2.py"]
+
+
+def test_ignored_directories_not_entered(tree: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    scanned = []
+    scandir = os.scandir
+
+    def recording_scandir(path: str) -> t.Any:
+        scanned.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", recording_scandir)
+    list(SourceWalker(gitignore=True).walk(["."]))
+    assert "./pkg/build" not in scanned
+
+
+def test_walk_matches_iter_source_files(tree: Path) -> None:
+    assert list(SourceWalker().walk(["."])) == list(iter_source_files(["."]))
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="Requires symlinks")
+def test_symlinks_deduplicated(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _write(tmp_path, {"real/mod.py": "", "real/sub/inner.py": ""})
+    (tmp_path / "linked").symlink_to(tmp_path / "real", target_is_directory=True)
+    (tmp_path / "real" / "sub" / "loop").symlink_to(tmp_path / "real", target_is_directory=True)
+    (tmp_path / "alias.py").symlink_to(tmp_path / "real" / "mod.py")
+    monkeypatch.chdir(tmp_path)
+
+    walked = list(SourceWalker(follow_symlinks=True).walk([".", "real"]))
+    assert walked == ["./alias.py", "./linked/sub/inner.py"]
+
+    # Without following symlinks, symlinked directories aren't walked, like flake8
+    assert list(SourceWalker().walk(["real", "."])) == [
+        "real/mod.py",
+        "real/sub/inner.py",
+    ]
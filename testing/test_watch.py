@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from flake8_annotations import watch
+from flake8_annotations.watch import StatIndex, Watcher
+
+pytestmark = pytest.mark.usefixtures("restore_default_config")
+
+
+@pytest.fixture
+def source_tree(tmp_path: Path) -> Path:
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "top.py").write_text("def foo(a):\n    pass\n")
+    (tmp_path / "pkg" / "mod.py").write_text("def bar() -> None:\n    pass\n")
+    (tmp_path / "pkg" / "notes.txt").write_text("def not_python(a):\n")
+    (tmp_path / "__pycache__" / "ignored.py").write_text("def ignored(a):\n")
+
+    return tmp_path
+
+
+@pytest.fixture
+def no_racy_window(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Trust all timestamps, so scans only report entries whose stat signature has changed
+    monkeypatch.setattr(watch, "RACY_WINDOW_NS", -(2**62))
+
+
+def _touch_later(path: Path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_stat_index_tracks_changes(source_tree: Path, no_racy_window: None) -> None:
+    index = StatIndex([str(source_tree)])
+    changed, removed = index.scan()
+    assert changed == [str(source_tree / "pkg" / "mod.py"), str(source_tree / "top.py")]
+    assert removed == []
+
+    assert index.scan() == ([], [])
+
+    (source_tree / "pkg" / "new.py").write_text("x = 1\n")
+    _touch_later(source_tree / "pkg")
+    (source_tree / "top.py").unlink()
+    _touch_later(source_tree)
+    assert index.scan() == ([str(source_tree / "pkg" / "new.py")], [str(source_tree / "top.py")])
+
+
+def test_symlink_loop_not_followed(source_tree: Path, no_racy_window: None) -> None:
+    (source_tree / "pkg" / "loop").symlink_to("..", target_is_directory=True)
+    index = StatIndex([str(source_tree)])
+    changed, _ = index.scan()
+    assert changed == [str(source_tree / "pkg" / "mod.py"), str(source_tree / "top.py")]
+    assert str(source_tree / "pkg" / "loop") not in index._listings
+
+
+def test_racy_entries_are_rescanned(source_tree: Path) -> None:
+    index = StatIndex([str(source_tree)])
+    index.scan()
+
+    # Files were just written, so they're reported until their timestamps can be trusted
+    changed, _ = index.scan()
+    assert str(source_tree / "top.py") in changed
+
+
+def test_watcher_reports_delta(source_tree: Path) -> None:
+    watcher = Watcher([str(source_tree)])
+    (initial,) = watcher.poll()
+    assert initial.path == str(source_tree / "top.py")
+    assert [result[2][:6] for result in initial.added] == ["ANN001", "ANN201"]
+    assert initial.removed == []
+
+    # Racy files are re-read, but unchanged contents aren't re-checked or reported
+    assert watcher.poll() == []
+
+    (source_tree / "top.py").write_text("def foo(a) -> None:\n    pass\n")
+    _touch_later(source_tree / "top.py")
+    (delta,) = watcher.poll()
+    assert delta.added == []
+    assert list(delta.format()) == [
+        f"-{source_tree / 'top.py'}:1:11: ANN201 Missing return type annotation for public function"
+    ]
+
+
+def test_watcher_forgets_removed_files(source_tree: Path) -> None:
+    watcher = Watcher([str(source_tree)])
+    watcher.poll()
+
+    (source_tree / "top.py").unlink()
+    _touch_later(source_tree)
+    (delta,) = watcher.poll()
+    assert delta.added == []
+    assert len(delta.removed) == 2
+    assert str(source_tree / "top.py") not in watcher.results
+    assert watcher.source_checker._analyses.keys() == {
+        (watcher.digests[str(source_tree / "pkg" / "mod.py")], None)
+    }
+
+
+def test_hot_files_polled_without_full_scan(source_tree: Path, no_racy_window: None) -> None:
+    watcher = Watcher([str(source_tree)])
+    watcher.poll()
+
+    top = source_tree / "top.py"
+    top.write_text("def foo(a) -> None:\n    pass\n")
+    _touch_later(top)
+    watcher.poll()
+    assert list(watcher.hot) == [str(top)]
+
+    # Files added to a changed directory are found without a full scan
+    (source_tree / "new.py").write_text("def new(a):\n    pass\n")
+    _touch_later(source_tree)
+    top.write_text("def foo(a: int) -> None:\n    pass\n")
+    _touch_later(top)
+    deltas = watcher.poll(full=False)
+    assert [delta.path for delta in deltas] == [str(source_tree / "new.py"), str(top)]
+
+    # As are files removed from a changed directory
+    (source_tree / "new.py").unlink()
+    _touch_later(source_tree)
+    (delta,) = watcher.poll(full=False)
+    assert delta.path == str(source_tree / "new.py")
+    assert len(delta.removed) == 2
+
+    # Files modified in place in unchanged directories are only found by a full scan
+    mod = source_tree / "pkg" / "mod.py"
+    mod.write_text("def bar(a) -> None:\n    pass\n")
+    _touch_later(mod)
+    assert watcher.poll(full=False) == []
+
+    (delta,) = watcher.poll()
+    assert delta.path == str(mod)
+
+
+def test_discovery_options(source_tree: Path, no_racy_window: None) -> None:
+    (source_tree / "pkg" / "stub.pyi").write_text("def stub(a): ...\n")
+    index = StatIndex(
+        [str(source_tree)], exclude=["__pycache__", "top.py"], filename_patterns=["*.py", "*.pyi"]
+    )
+    changed, _ = index.scan()
+    assert changed == [str(source_tree / "pkg" / "mod.py"), str(source_tree / "pkg" / "stub.pyi")]
+
+
+def test_main_reads_config_file(
+    source_tree: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    (source_tree / "pkg" / "other.py").write_text("def other(a):\n    pass\n")
+    (source_tree / ".flake8").write_text("[flake8]\nextend-ignore = ANN201\nextend-exclude = pkg\n")
+    monkeypatch.chdir(source_tree)
+
+    def interrupt(_: float) -> None:
+        raise KeyboardInterrupt
+
+    # Stop after the initial poll
+    monkeypatch.setattr(watch.time, "sleep", interrupt)
+    assert watch.main(()) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "+./top.py:1:9: ANN001 Missing type annotation for function argument 'a'"
+    ]